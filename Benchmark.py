@@ -0,0 +1,520 @@
+"""
+Benchmarks for the CSR compute paths on synthetic data.
+
+Each workload generates a dataset from a known quadratic CSR model and times the same
+entry points the app uses: fitting, extremum search, the response-surface grid, the
+pie-chart term contributions and OACD table generation. Results are compared with the
+stored baselines so slowdowns (or changed results) show up before a release.
+
+    python Benchmark.py                   # quick suite, compared with benchmark_baselines.json
+    python Benchmark.py --suite full      # adds the large factor/run/outcome counts
+    python Benchmark.py --save-baseline   # store the current results as the new baseline
+    python Benchmark.py --memory          # peak memory of a 50-outcome fit
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+import platform
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import CSRModel
+import Coefficients
+from OACD import OACD
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baselines.json")
+BASELINE_VERSION = 1
+
+# A stage is a regression when it is this much slower than its baseline (0.5 = 50%)...
+DEFAULT_TIME_TOLERANCE = 0.5
+# ...and slower by more than this many seconds (timer resolution and leftover noise)
+MIN_TIME_DIFFERENCE = 0.001
+# Every timing repeats a stage until the measurement lasts this long and reports the time
+# per call, so millisecond stages are not at the mercy of scheduling jitter
+MIN_MEASURE_S = 0.05
+# Relative change allowed in the checked results (R², extremum value, ...)
+DEFAULT_VALUE_TOLERANCE = 1e-4
+
+NORM_TYPE = "[0, 1]"
+OBJECTIVE = "Maximum"
+
+
+def _limit_factors(n_factors):
+    return list(range(min(3, n_factors)))
+
+
+# CSR limit configurations in original units; synthetic factors lie in [0, 10]
+LIMIT_CONFIGS = {
+    'none': lambda n: {},
+    'sum': lambda n: {'limit_1': {'factors': _limit_factors(n), 'value': 12.0, 'type': 'sum'}},
+    'sum_equality': lambda n: {'limit_1': {'factors': _limit_factors(n), 'value': 12.0, 'type': 'sum_equality'}},
+    'product': lambda n: {'limit_1': {'factors': _limit_factors(n)[:2], 'value': 20.0, 'type': 'product'}},
+    'mixed': lambda n: {
+        'limit_1': {'factors': _limit_factors(n), 'value': 15.0, 'type': 'sum'},
+        'limit_2': {'factors': _limit_factors(n)[:2], 'value': 30.0, 'type': 'product'},
+    },
+}
+
+
+def _workload(factors, runs, outcomes=1, limits='none', repeats=5):
+    return {
+        'name': f"f{factors}_r{runs}_o{outcomes}_{limits}",
+        'factors': factors,
+        'runs': runs,
+        'outcomes': outcomes,
+        'limits': limits,
+        'repeats': repeats,
+    }
+
+
+SUITES = {
+    'quick': [
+        _workload(2, 10),
+        _workload(3, 100, limits='sum'),
+        _workload(3, 100, limits='sum_equality'),
+        _workload(3, 100, limits='product'),
+        _workload(5, 1000),
+        _workload(5, 1000, outcomes=3, limits='mixed'),
+        _workload(8, 1000),
+        _workload(5, 100, outcomes=10),
+    ],
+}
+SUITES['full'] = SUITES['quick'] + [
+    _workload(12, 5000, repeats=1),
+    _workload(20, 10000, repeats=1),
+    _workload(20, 10000, limits='mixed', repeats=1),
+    _workload(5, 100_000, repeats=1),
+    _workload(5, 1_000_000, repeats=1),
+    _workload(5, 1000, outcomes=50, repeats=1),
+]
+
+# OACD tables exist for 2-5 factors
+OACD_WORKLOADS = [(n, size) for n in (2, 3, 4, 5) for size in ("Small", "Medium", "Large")]
+
+
+def synthetic_dataset(n_factors, n_runs, n_outcomes=1, noise=0.01, seed=0):
+    """
+    Factors uniform in [0, 10] and outcomes from known quadratic CSR models.
+
+    The true coefficients are defined in the [0, 1] scaling of the generated factors, so a
+    "[0, 1]" fit should recover them. Quadratic terms are negative, giving each outcome an
+    interior maximum. Returns (X, Y, true_coefficients) with Y of shape (n_runs, n_outcomes).
+    """
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(0, 10, size=(n_runs, n_factors))
+    X_scaled, _ = CSRModel.normalize_factors(X, NORM_TYPE)
+    bits_array = CSRModel.generate_bits_array(n_factors)
+    X_design = CSRModel.create_design_matrix(X_scaled, bits_array)
+
+    powers = bits_array.sum(axis=1)
+    is_quadratic = (bits_array == 2).any(axis=1)
+    true_coefficients = np.empty((n_outcomes, bits_array.shape[0]))
+    Y = np.empty((n_runs, n_outcomes))
+    for k in range(n_outcomes):
+        coefs = rng.normal(0, 1, bits_array.shape[0])
+        coefs[powers == 0] = 10 + k
+        coefs[powers == 1] = rng.uniform(1, 3, n_factors)
+        coefs[is_quadratic] = -rng.uniform(1, 3, n_factors)
+        coefs[(powers == 2) & ~is_quadratic] *= 0.2
+        true_coefficients[k] = coefs
+        Y[:, k] = X_design @ coefs + rng.normal(0, noise, n_runs)
+    return X, Y, true_coefficients
+
+
+def _best_time(func, repeats, min_duration=MIN_MEASURE_S):
+    """
+    Best-of-`repeats` wall time per call and the result of the last call. Each measurement
+    runs `func` in a loop of as many calls as it takes to last `min_duration` (doubling
+    from one call, as timeit's autorange), so short stages are averaged over many calls.
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            result = func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_duration:
+            break
+        loops *= 2
+    best = elapsed / loops
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            result = func()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best, result
+
+
+def _stage_time(func, repeats):
+    """
+    (time per call, calibration, result of the last call) of one stage. The machine speed
+    drifts during a run (frequency scaling, other load), so the calibration loop is timed
+    right before and after the stage and the faster of the two is kept with it.
+    """
+    calibration_s = calibrate(repeats=2)
+    time_s, result = _best_time(func, repeats)
+    return time_s, min(calibration_s, calibrate(repeats=2)), result
+
+
+def _fit_all(X, Y, bits_array):
+    """
+    Fit every outcome the way the app does: fit_csr_auto for a single outcome (alpha=1e-5),
+    one shared-design fit_outcomes for several (alpha=0.01). Returns ({'coefficients'
+    (n_outcomes x n_terms), 'r2' per outcome}, normalization).
+    """
+    X_scaled, normalization = CSRModel.normalize_factors(X, NORM_TYPE)
+    if Y.shape[1] == 1:
+        fit, _ = CSRModel.fit_csr_auto(X_scaled, bits_array, Y[:, 0], alpha=1e-5,
+                                       max_iter=None, tol=1e-4, random_state=42)
+        return {'coefficients': np.atleast_2d(fit['coefficients']), 'r2': np.array([fit['r2']])}, normalization
+    return CSRModel.fit_outcomes(X_scaled, bits_array, Y, alpha=0.01), normalization
+
+
+def run_workload(workload):
+    """
+    Time every stage of one workload; returns {stage: {'time_s': ..., 'calibration_s': ...,
+    'checks': {...}}}
+    """
+    n_factors = workload['factors']
+    repeats = workload['repeats']
+    X, Y, true_coefficients = synthetic_dataset(n_factors, workload['runs'], workload['outcomes'])
+    csr_limits = LIMIT_CONFIGS[workload['limits']](n_factors)
+    bits_array = CSRModel.generate_bits_array(n_factors)
+    results = {}
+
+    # Fit
+    fit_time, fit_calibration, (fit, normalization) = _stage_time(lambda: _fit_all(X, Y, bits_array), repeats)
+    coefficient_sets = fit['coefficients']
+    results['fit'] = {
+        'time_s': fit_time,
+        'calibration_s': fit_calibration,
+        'checks': {
+            'mean_r2': float(np.mean(fit['r2'])),
+            'max_coef_error': float(np.max(np.abs(coefficient_sets - true_coefficients))),
+        },
+    }
+
+    # Extremum search (single outcome in the fitting scale, several via the combined score)
+    if len(coefficient_sets) == 1:
+        coefficients = coefficient_sets[0]
+        bounds, x0 = normalization.search_bounds(X)
+        constraints = CSRModel.limit_constraints(csr_limits, n_factors, normalization)
+
+        def value_at(x_scaled):
+            return CSRModel.evaluate_csr(x_scaled, coefficients, bits_array)[0]
+
+        def search():
+            res = CSRModel.find_extremum(value_at, bounds, x0, 'maximum', constraints)
+            return normalization.inverse(res.x), value_at(res.x)
+
+        def surface_batch(points):
+            return CSRModel.evaluate_csr(normalization.forward(points), coefficients, bits_array)
+    else:
+        result_functions = {
+            f"outcome{k+1}": {
+                'coefficients': coefficients,
+                'bits_array': bits_array,
+                'normalization': normalization,
+                'r2': fit['r2'][k],
+                'min_val': Y[:, k].min(),
+                'max_val': Y[:, k].max(),
+                'polarity': 1,
+            }
+            for k, coefficients in enumerate(coefficient_sets)
+        }
+        comprehensive_function = CSRModel.make_comprehensive_function(result_functions, OBJECTIVE)
+        bounds = [(X[:, i].min(), X[:, i].max()) for i in range(n_factors)]
+        x0 = np.array([(lo + hi) / 2 for lo, hi in bounds])
+        constraints = CSRModel.limit_constraints(csr_limits, n_factors)
+
+        def search():
+            res = CSRModel.find_extremum(comprehensive_function, bounds, x0, 'maximum', constraints)
+            return res.x, comprehensive_function(res.x)
+
+        surface_batch = comprehensive_function.batch
+
+    extremum_time, extremum_calibration, (extremum_x, extremum_value) = _stage_time(search, repeats)
+    results['extremum'] = {
+        'time_s': extremum_time,
+        'calibration_s': extremum_calibration,
+        'checks': {'value': float(extremum_value)},
+    }
+
+    # Response surface for the first two factors, others held at the extremum; the whole
+    # grid is scored in one batch, as in the app
+    y_idx = 1 if n_factors > 1 else 0
+    surface_time, surface_calibration, (_, _, z_grid) = _stage_time(
+        lambda: CSRModel.surface_grid(None, X, 0, y_idx, extremum_x, resolution=30, batch_func=surface_batch),
+        repeats)
+    results['surface'] = {
+        'time_s': surface_time,
+        'calibration_s': surface_calibration,
+        'checks': {'mean_z': float(np.nanmean(z_grid))},
+    }
+
+    # Pie-chart contributions of every outcome at the extremum
+    x_eval_scaled = normalization.forward(extremum_x)
+    contrib_time, contrib_calibration, contributions = _stage_time(
+        lambda: [Coefficients.term_contributions(coefficients, bits_array, x_eval_scaled)
+                 for coefficients in coefficient_sets],
+        repeats)
+    results['contributions'] = {
+        'time_s': contrib_time,
+        'calibration_s': contrib_calibration,
+        'checks': {'linear_total': float(sum(c['linear_total'] for c in contributions))},
+    }
+    return results
+
+
+def run_oacd(n_factors, table_size, repeats=5):
+    """Time OACD table generation (build + limit normalization) for one design"""
+    def generate():
+        oacd = OACD()
+        oacd.set_factor_num(n_factors)
+        oacd.set_table_size(table_size)
+        oacd.set_factor_extrenum(pd.DataFrame([[0.0, 10.0]] * n_factors))
+        oacd.add_limit(list(range(n_factors)), 20)
+        if oacd.build_table() != 1:
+            raise RuntimeError(f"OACD table could not be built for {n_factors} factors ({table_size})")
+        oacd.normalize_table()
+        return oacd.table
+
+    oacd_time, oacd_calibration, table = _stage_time(generate, repeats)
+    return {'oacd': {'time_s': oacd_time, 'calibration_s': oacd_calibration,
+                     'checks': {'rows': float(table.shape[0])}}}
+
+
+def _fit_outcomes_separately(X, Y, bits_array, alpha):
+    """
+    Reference for the memory benchmark: the per-outcome pipeline the app used before
+    fit_outcomes (a DataFrame copy, normalization and design matrix per outcome, with the
+    design matrix, y, predictions and residuals kept for every outcome)
+    """
+    frame = pd.DataFrame(np.column_stack([X, Y]))
+    n_factors = X.shape[1]
+    kept = []
+    for k in range(Y.shape[1]):
+        temp_df = frame[list(range(n_factors)) + [n_factors + k]].copy()
+        X_fit, _ = CSRModel.normalize_factors(temp_df.iloc[:, :n_factors].values, NORM_TYPE)
+        y_fit = temp_df.iloc[:, n_factors].values
+        X_design = CSRModel.create_design_matrix(X_fit, bits_array)
+        fit = CSRModel.fit_csr(X_design, y_fit, alpha=alpha)
+        kept.append({'coefficients': fit['coefficients'], 'X_design': X_design, 'y': y_fit,
+                     'y_pred': fit['y_pred'], 'residuals': y_fit - fit['y_pred']})
+    return np.array([k['coefficients'] for k in kept])
+
+
+def _peak_memory(func):
+    """Peak of traced allocations (NumPy arrays included) while `func` runs, and its result"""
+    tracemalloc.start()
+    try:
+        result = func()
+        return tracemalloc.get_traced_memory()[1], result
+    finally:
+        tracemalloc.stop()
+
+
+def memory_benchmark(n_factors=6, n_runs=20000, n_outcomes=50, alpha=0.01):
+    """
+    Peak memory of a many-outcome fit: the shared-design fit (CSRModel.fit_outcomes) against
+    the per-outcome reference. Returns peaks in bytes, their ratio and the largest
+    coefficient difference between the two.
+    """
+    X, Y, _ = synthetic_dataset(n_factors, n_runs, n_outcomes)
+    bits_array = CSRModel.generate_bits_array(n_factors)
+
+    def shared():
+        X_scaled, _ = CSRModel.normalize_factors(X, NORM_TYPE)
+        return CSRModel.fit_outcomes(X_scaled, bits_array, Y, alpha=alpha)['coefficients']
+
+    separate_peak, separate_coefs = _peak_memory(lambda: _fit_outcomes_separately(X, Y, bits_array, alpha))
+    shared_peak, shared_coefs = _peak_memory(shared)
+    return {
+        'factors': n_factors, 'runs': n_runs, 'outcomes': n_outcomes,
+        'separate_peak': separate_peak, 'shared_peak': shared_peak,
+        'ratio': separate_peak / max(shared_peak, 1),
+        'max_coef_difference': float(np.max(np.abs(separate_coefs - shared_coefs))),
+    }
+
+
+def format_memory(result):
+    mb = 2.0 ** 20
+    return (f"{result['outcomes']} outcomes, {result['factors']} factors, {result['runs']} runs\n"
+            f"  per-outcome fits   {result['separate_peak'] / mb:10.1f} MB peak\n"
+            f"  shared design      {result['shared_peak'] / mb:10.1f} MB peak\n"
+            f"  reduction          {result['ratio']:10.1f}x (coefficients differ by {result['max_coef_difference']:.1e})")
+
+
+def calibrate(repeats=7):
+    """
+    Time a fixed reference loop (small NumPy operations driven from Python, like the app's
+    hot paths). Baseline times are scaled by the ratio of calibration times so a busy or
+    throttled machine does not show up as a regression. Kept independent of the app code.
+    """
+    rng = np.random.default_rng(0)
+    a = rng.random((30, 6))
+    b = rng.random(6)
+
+    def work():
+        total = 0.0
+        for _ in range(4000):
+            total += float(np.dot(a * b, b).sum())
+        return total
+
+    return _best_time(work, repeats)[0]
+
+
+def run_suite(suite='quick', include_oacd=True, progress=None):
+    """Run every workload of `suite`; returns {workload_name: {stage: result}}"""
+    results = {}
+    for workload in SUITES[suite]:
+        if progress:
+            progress(workload['name'])
+        results[workload['name']] = run_workload(workload)
+    if include_oacd:
+        for n_factors, table_size in OACD_WORKLOADS:
+            name = f"oacd_f{n_factors}_{table_size.lower()}"
+            if progress:
+                progress(name)
+            results[name] = run_oacd(n_factors, table_size)
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, calibration_s, path=BASELINE_PATH, time_tolerance=DEFAULT_TIME_TOLERANCE,
+                  value_tolerance=DEFAULT_VALUE_TOLERANCE, min_time_difference=MIN_TIME_DIFFERENCE):
+    baseline = {
+        'version': BASELINE_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'machine': {'platform': platform.platform(), 'python': platform.python_version(),
+                    'numpy': np.__version__},
+        'calibration_s': calibration_s,
+        'time_tolerance': time_tolerance,
+        'value_tolerance': value_tolerance,
+        'min_time_difference': min_time_difference,
+        'results': results,
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+
+
+def compare(results, baseline, calibration_s=None, time_tolerance=None, value_tolerance=None,
+            min_time_difference=None):
+    """
+    Compare results with a baseline. Returns one row per stage with a status of
+    'ok', 'slower' (time regression), 'changed' (a checked result moved) or 'new'.
+    Baseline times are scaled by the ratio of calibration times: per stage when both runs
+    timed the calibration next to it, else calibration_s / the baseline calibration.
+    A stage is 'slower' only when it exceeds the relative time tolerance and the absolute
+    noise floor (min_time_difference seconds).
+    """
+    time_tolerance = baseline.get('time_tolerance', DEFAULT_TIME_TOLERANCE) if time_tolerance is None else time_tolerance
+    value_tolerance = baseline.get('value_tolerance', DEFAULT_VALUE_TOLERANCE) if value_tolerance is None else value_tolerance
+    if min_time_difference is None:
+        min_time_difference = baseline.get('min_time_difference', MIN_TIME_DIFFERENCE)
+    speed_factor = 1.0
+    if calibration_s and baseline.get('calibration_s'):
+        speed_factor = calibration_s / baseline['calibration_s']
+    rows = []
+    for name, stages in results.items():
+        for stage, current in stages.items():
+            reference = baseline['results'].get(name, {}).get(stage)
+            row = {'workload': name, 'stage': stage, 'time_s': current['time_s'],
+                   'baseline_s': None, 'ratio': None, 'status': 'new', 'detail': ''}
+            if reference is not None:
+                stage_factor = speed_factor
+                if current.get('calibration_s') and reference.get('calibration_s'):
+                    stage_factor = current['calibration_s'] / reference['calibration_s']
+                expected_s = reference['time_s'] * stage_factor
+                row['baseline_s'] = expected_s
+                row['ratio'] = current['time_s'] / expected_s if expected_s > 0 else np.inf
+                changed = []
+                for key, ref_value in reference.get('checks', {}).items():
+                    value = current['checks'].get(key)
+                    if value is None or not np.isclose(value, ref_value, rtol=value_tolerance, atol=value_tolerance):
+                        changed.append(f"{key}: {ref_value:.6g} -> {value if value is None else format(value, '.6g')}")
+                slower = (current['time_s'] > expected_s * (1 + time_tolerance)
+                          and current['time_s'] - expected_s > min_time_difference)
+                if changed:
+                    row['status'] = 'changed'
+                    row['detail'] = "; ".join(changed)
+                elif slower:
+                    row['status'] = 'slower'
+                else:
+                    row['status'] = 'ok'
+            rows.append(row)
+    return rows
+
+
+def format_rows(rows):
+    lines = [f"{'workload':<28}{'stage':<15}{'time (s)':>10}{'expected':>10}{'ratio':>8}  status"]
+    for row in rows:
+        baseline = "-" if row['baseline_s'] is None else f"{row['baseline_s']:.4f}"
+        ratio = "-" if row['ratio'] is None else f"{row['ratio']:.2f}"
+        line = f"{row['workload']:<28}{row['stage']:<15}{row['time_s']:>10.4f}{baseline:>10}{ratio:>8}  {row['status']}"
+        if row['detail']:
+            line += f" ({row['detail']})"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the CSR fitting, optimization and plotting paths.")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--time-tolerance", type=float, default=None,
+                        help="allowed slowdown as a fraction (default: from the baseline file)")
+    parser.add_argument("--value-tolerance", type=float, default=None,
+                        help="allowed relative change of checked results (default: from the baseline file)")
+    parser.add_argument("--min-time-difference", type=float, default=None,
+                        help="slowdowns up to this many seconds are timing noise (default: from the baseline file)")
+    parser.add_argument("--no-oacd", action="store_true", help="skip the OACD table workloads")
+    parser.add_argument("--memory", action="store_true",
+                        help="only compare the peak memory of a 50-outcome fit with the per-outcome pipeline")
+    args = parser.parse_args(argv)
+
+    if args.memory:
+        print(format_memory(memory_benchmark()))
+        return 0
+
+    calibration_s = calibrate()
+    results = run_suite(args.suite, include_oacd=not args.no_oacd,
+                        progress=lambda name: print(f"running {name}...", file=sys.stderr))
+    # Calibrate again afterwards and keep the faster one, in case the load changed mid-run
+    calibration_s = min(calibration_s, calibrate())
+
+    if args.save_baseline:
+        save_baseline(results, calibration_s, args.baseline,
+                      args.time_tolerance if args.time_tolerance is not None else DEFAULT_TIME_TOLERANCE,
+                      args.value_tolerance if args.value_tolerance is not None else DEFAULT_VALUE_TOLERANCE,
+                      args.min_time_difference if args.min_time_difference is not None else MIN_TIME_DIFFERENCE)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        baseline = {'results': {}}
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.", file=sys.stderr)
+    rows = compare(results, baseline, calibration_s, args.time_tolerance, args.value_tolerance,
+                   args.min_time_difference)
+    print(format_rows(rows))
+
+    failures = [row for row in rows if row['status'] in ('slower', 'changed')]
+    if failures:
+        print(f"\n{len(failures)} regression(s) against the baseline.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
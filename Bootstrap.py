@@ -0,0 +1,162 @@
+"""
+Bootstrap / jackknife uncertainty of a CSR fit and its extremum.
+
+OACD designs often have fewer runs than a quadratic model has comfortable degrees of
+freedom, so the coefficients and the optimum carry real uncertainty. Every replicate
+refits the Ridge model on resampled rows; a resample is a row-count weighting of the
+design rows, so all replicate fits are batched normal-equation solves over design blocks,
+without building any resampled (or full) design matrix. Each replicate's extremum is then
+searched again (with the analytic gradient of the quadratic model), in blocks over worker
+processes.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy.stats import norm
+import CSRModel
+import Log
+import Profiling
+
+log = Log.get_logger("fit")
+
+METHODS = ("bootstrap", "jackknife")
+DEFAULT_REPLICATES = 1000
+
+# Replicate normal equations solved per batch (memory: batch * n_terms² floats)
+SOLVE_BATCH = 256
+
+
+def replicate_weights(n_rows, n_replicates=DEFAULT_REPLICATES, method="bootstrap", seed=0):
+    """
+    Row multiplicities of every replicate, shape (n_replicates, n_rows): multinomial counts
+    for the bootstrap, leave-one-out for the jackknife (n_rows replicates).
+    """
+    if method == "jackknife":
+        return 1.0 - np.eye(n_rows)
+    if method != "bootstrap":
+        raise ValueError(f"Unknown resampling method: {method}")
+    rng = np.random.default_rng(seed)
+    return rng.multinomial(n_rows, np.full(n_rows, 1.0 / n_rows), size=n_replicates).astype(float)
+
+
+def ridge_replicates(X_input_scaled, bits_array, y, alpha, weights):
+    """
+    Ridge coefficients (no intercept, as CSRModel.fit_csr) for every row weighting:
+    (Xᵀ W X + αI) β = Xᵀ W y, solved in batches. The design rows are expanded one block
+    at a time (CSRModel.iter_design_blocks), never as a full design matrix.
+    Returns (n_replicates, n_terms).
+    """
+    y = np.asarray(y, dtype=float)
+    n_terms = len(bits_array)
+    ridge = alpha * np.eye(n_terms)
+    # A batch's weighted block (batch x rows x n_terms) stays within one design block's size
+    block_rows = CSRModel.design_block_rows(SOLVE_BATCH * n_terms)
+    coefficients = np.empty((len(weights), n_terms))
+    for start in range(0, len(weights), SOLVE_BATCH):
+        W = weights[start:start + SOLVE_BATCH]
+        gram = np.repeat(ridge[None], len(W), axis=0)
+        rhs = np.zeros((len(W), n_terms))
+        for row, block in CSRModel.iter_design_blocks(X_input_scaled, bits_array, block_rows):
+            W_block = W[:, row:row + len(block)]
+            gram += (W_block[:, :, None] * block).transpose(0, 2, 1) @ block
+            rhs += (W_block * y[row:row + len(block)]) @ block
+        coefficients[start:start + SOLVE_BATCH] = np.linalg.solve(gram, rhs[..., None])[..., 0]
+    return coefficients
+
+
+def _replicate_model(coefficients, bits_array):
+    """Value and gradient functions of one replicate in the fitting scale"""
+    form = CSRModel.quadratic_form(coefficients, bits_array)
+    if form is None:
+        return lambda x: CSRModel.evaluate_csr(x, coefficients, bits_array)[0], None
+    constant, linear, Q = form
+    return (lambda x: constant + linear @ x + x @ Q @ x), (lambda x: linear + 2 * Q @ x)
+
+
+def _optimize_block(coefficient_block, bits_array, bounds, x0, extremum_type, csr_limits, normalization):
+    """Extremum (fitting scale) and value of every replicate in a block; NaN where the search failed"""
+    constraints = CSRModel.limit_constraints(csr_limits or {}, len(bounds), normalization)
+    lower = np.array([low for low, _ in bounds], dtype=float)
+    upper = np.array([high for _, high in bounds], dtype=float)
+    X = np.full((len(coefficient_block), len(bounds)), np.nan)
+    values = np.full(len(coefficient_block), np.nan)
+    for i, coefficients in enumerate(coefficient_block):
+        func, jac = _replicate_model(coefficients, bits_array)
+        try:
+            res = CSRModel.find_extremum(func, bounds, x0, extremum_type, constraints, jac=jac)
+        except (ValueError, np.linalg.LinAlgError):
+            continue
+        X[i] = np.clip(res.x, lower, upper)
+        values[i] = func(X[i])
+    return X, values
+
+
+def replicate_extrema(coefficient_replicates, bits_array, bounds, x0, extremum_type,
+                      csr_limits=None, normalization=None, workers=None):
+    """
+    Re-run the extremum search for every coefficient replicate, starting from `x0`
+    (bounds and x0 in the fitting scale). workers > 1 spreads blocks over processes.
+    Returns (X_fitting_scale, values) with NaN rows for failed searches.
+    """
+    args = (bits_array, bounds, x0, extremum_type, csr_limits, normalization)
+    if not workers or workers <= 1 or len(coefficient_replicates) < 2 * workers:
+        return _optimize_block(coefficient_replicates, *args)
+    # A few blocks per worker keep the processes busy when searches differ in length
+    blocks = np.array_split(coefficient_replicates, 4 * workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_optimize_block, blocks, *[[arg] * len(blocks) for arg in args]))
+    return np.vstack([X for X, _ in results]), np.concatenate([values for _, values in results])
+
+
+def interval(estimate, replicates, method="bootstrap", level=0.95):
+    """
+    Confidence interval per column of `replicates` (NaN rows ignored): percentile interval
+    for the bootstrap, normal interval from the jackknife standard error otherwise.
+    """
+    replicates = np.asarray(replicates, dtype=float)
+    tail = (1 - level) / 2
+    if method == "jackknife":
+        n = np.sum(~np.isnan(replicates), axis=0)
+        spread = replicates - np.nanmean(replicates, axis=0)
+        std_error = np.sqrt((n - 1) / n * np.nansum(spread ** 2, axis=0))
+        half_width = norm.ppf(1 - tail) * std_error
+        return estimate - half_width, estimate + half_width
+    return (np.nanpercentile(replicates, 100 * tail, axis=0),
+            np.nanpercentile(replicates, 100 * (1 - tail), axis=0))
+
+
+@Profiling.timed("Bootstrap.confidence_intervals")
+def confidence_intervals(X_input_scaled, y, alpha, coefficients, bits_array, normalization, bounds, x0,
+                         extremum_type, csr_limits=None, n_replicates=DEFAULT_REPLICATES,
+                         method="bootstrap", level=0.95, workers=None, seed=0):
+    """
+    Confidence intervals of a fitted CSR model and its extremum.
+
+    X_input_scaled (the factors in the fitting scale), y, alpha: the fit; coefficients: the
+    reported fit; bounds and x0 (the reported extremum works best) are in the fitting scale
+    of `normalization`.
+    Returns a dict with 'coefficients', 'extremum_x' (original units) and 'extremum_value',
+    each {'estimate', 'lower', 'upper'}, plus the raw 'replicates', 'method', 'level',
+    'n_replicates' and 'n_failed' (replicates whose extremum search failed).
+    """
+    weights = replicate_weights(len(y), n_replicates, method, seed)
+    coefficient_replicates = ridge_replicates(X_input_scaled, bits_array, y, alpha, weights)
+    Profiling.count_eval("bootstrap", len(weights))
+    X_reps, value_reps = replicate_extrema(coefficient_replicates, bits_array, bounds, x0, extremum_type,
+                                           csr_limits, normalization, workers)
+    X_reps_orig = normalization.inverse(X_reps)
+    n_failed = int(np.isnan(value_reps).sum())
+    log.debug('%s: %s replicates, %s failed extremum searches', method, len(weights), n_failed)
+
+    x_estimate = normalization.inverse(np.asarray(x0, dtype=float))
+    func, _ = _replicate_model(coefficients, bits_array)
+    value_estimate = func(np.asarray(x0, dtype=float))
+    results = {}
+    for key, estimate, replicates in (('coefficients', np.asarray(coefficients, dtype=float), coefficient_replicates),
+                                      ('extremum_x', x_estimate, X_reps_orig),
+                                      ('extremum_value', value_estimate, value_reps)):
+        lower, upper = interval(estimate, replicates, method, level)
+        results[key] = {'estimate': estimate, 'lower': lower, 'upper': upper}
+    results.update(replicates={'coefficients': coefficient_replicates, 'extremum_x': X_reps_orig,
+                               'extremum_value': value_reps},
+                   method=method, level=level, n_replicates=len(weights), n_failed=n_failed)
+    return results
@@ -0,0 +1,567 @@
+"""
+Headless CSR computations shared by the app and the benchmarks: term generation,
+design matrices, normalization, Ridge fitting, extremum search and surface evaluation.
+Nothing in here touches Tk, so every function can be called from scripts.
+"""
+import numpy as np
+from scipy.optimize import minimize
+from scipy.linalg import cho_factor, cho_solve
+from sklearn.linear_model import Ridge
+import Profiling
+import Constraints
+from Normalization import Normalization
+
+def generate_bits_array(n_factors):
+    """Exponent matrix of the full quadratic model: constant, linear, quadratic, then interaction rows"""
+    if n_factors <= 0:
+        return np.array([])
+
+    bits = []
+    # Constant term (all zeros)
+    bits.append(np.zeros(n_factors, dtype=int))
+
+    # Linear terms (f1, f2, f3,...)
+    for i in range(n_factors):
+        term = np.zeros(n_factors, dtype=int)
+        term[i] = 1
+        bits.append(term)
+
+    # Quadratic terms (f1², f2², f3²,...)
+    for i in range(n_factors):
+        term = np.zeros(n_factors, dtype=int)
+        term[i] = 2
+        bits.append(term)
+
+    # Interaction terms (f1*f2, f1*f3,..., f2*f3, f2*f4,...)
+    if n_factors > 1:
+        for i in range(n_factors):
+            for j in range(i + 1, n_factors):
+                term = np.zeros(n_factors, dtype=int)
+                term[i] = 1
+                term[j] = 1
+                bits.append(term)
+
+    # Convert to numpy array (no need to sort, order is enforced above)
+    return np.array(bits, dtype=int)
+
+
+# Design matrix entries per row block when it is built or reduced piecewise (32 MB of
+# float64), so block memory does not grow with the term count either
+DESIGN_BLOCK_ELEMENTS = 2**22
+
+# Fits whose dense float64 design matrix would exceed this are solved from XᵀX and Xᵀy
+# accumulated over row blocks instead (see fit_csr_blocked)
+DESIGN_MEMORY_LIMIT = 256 * 2**20
+
+
+def design_matrix_bytes(n_samples, n_terms, dtype=np.float64):
+    return n_samples * n_terms * np.dtype(dtype).itemsize
+
+
+def design_block_rows(n_terms, block_rows=None):
+    """`block_rows`, or by default the rows of DESIGN_BLOCK_ELEMENTS entries"""
+    return block_rows or max(1, DESIGN_BLOCK_ELEMENTS // max(1, n_terms))
+
+
+def _term_pairs(bits_array):
+    """
+    For models up to second order, the two columns of [1, X] whose product is each term
+    (0 is the constant, i + 1 factor i); None for higher orders.
+    """
+    if bits_array.min() < 0 or bits_array.sum(axis=1).max() > 2:
+        return None
+    nonzero = bits_array > 0
+    has_factor = nonzero.any(axis=1)
+    first = np.where(has_factor, nonzero.argmax(axis=1) + 1, 0)
+    last = np.where(has_factor, bits_array.shape[1] - nonzero[:, ::-1].argmax(axis=1), 0)
+    # x_i² pairs factor i with itself, x_i·x_j the first and last factor, x_i and 1 with the constant
+    second = np.where(bits_array.sum(axis=1) == 2, last, 0)
+    return first, second
+
+
+@Profiling.timed()
+def create_design_matrix(X_input_scaled, bits_array, dtype=np.float64, block_rows=None):
+    """
+    Design matrix of the terms in `bits_array` for every row of X_input_scaled, stored as
+    `dtype` (float32 halves the memory). Second-order models are built a row block at a
+    time (design_block_rows) from products of column pairs, so the temporaries stay small.
+    """
+    if X_input_scaled.size == 0 or bits_array.size == 0:
+        return np.array([[]])
+    bits_array = np.asarray(bits_array)
+    n_samples = X_input_scaled.shape[0]
+    n_terms = bits_array.shape[0]
+    if n_terms == 0:
+        return np.array([[]])
+    X_design = np.empty((n_samples, n_terms), dtype=dtype)
+    pairs = _term_pairs(bits_array)
+    if pairs is not None:
+        first, second = pairs
+        block_rows = design_block_rows(n_terms, block_rows)
+        for start in range(0, n_samples, block_rows):
+            block = X_input_scaled[start:start + block_rows]
+            extended = np.hstack([np.ones((len(block), 1)), block])
+            np.multiply(extended[:, first], extended[:, second], out=X_design[start:start + block_rows],
+                        casting='same_kind')
+        return X_design
+    for term_idx, bits_row in enumerate(bits_array):
+        current_term_values_for_all_samples = np.ones(n_samples)
+        for factor_idx in np.flatnonzero(bits_row):
+            power = bits_row[factor_idx]
+            if power == 1:
+                current_term_values_for_all_samples *= X_input_scaled[:, factor_idx]
+            else:
+                current_term_values_for_all_samples *= X_input_scaled[:, factor_idx]**power
+        X_design[:, term_idx] = current_term_values_for_all_samples
+    return X_design
+
+
+def iter_design_blocks(X_input_scaled, bits_array, block_rows=None, dtype=np.float64):
+    """(start row, design matrix of rows start:start + block_rows) for every row block"""
+    block_rows = design_block_rows(len(bits_array), block_rows)
+    for start in range(0, X_input_scaled.shape[0], block_rows):
+        yield start, create_design_matrix(X_input_scaled[start:start + block_rows], bits_array,
+                                          dtype=dtype, block_rows=block_rows)
+
+
+@Profiling.timed()
+def design_gram(X_input_scaled, bits_array, y=None, block_rows=None, dtype=np.float64):
+    """
+    XᵀX (and Xᵀy when y is given) of the design matrix without building all of it: the
+    rows are expanded one block at a time and the products summed in float64, so memory
+    goes with block_rows x n_terms instead of the row count. Returns (XᵀX, Xᵀy or None).
+    """
+    n_terms = len(bits_array)
+    gram = np.zeros((n_terms, n_terms))
+    xty = None if y is None else np.zeros((n_terms,) + np.shape(y)[1:])
+    for start, block in iter_design_blocks(X_input_scaled, bits_array, block_rows, dtype):
+        block = block.astype(np.float64, copy=False)
+        gram += block.T @ block
+        if y is not None:
+            xty += block.T @ y[start:start + len(block)]
+    return gram, xty
+
+
+def predict_blocked(X_input_scaled, coefficients, bits_array, block_rows=None, dtype=np.float64):
+    """Model values for every row, expanding the design matrix one row block at a time"""
+    return np.concatenate([block @ coefficients
+                           for _, block in iter_design_blocks(X_input_scaled, bits_array, block_rows, dtype)])
+
+
+def normalize_factors(X, norm_type):
+    """
+    Scale factor columns for fitting.
+    Returns (X_scaled, normalization); the Normalization maps points both ways later on.
+    """
+    normalization = Normalization.fit(X, norm_type)
+    return normalization.forward(X), normalization
+
+
+def fit_csr(X_design, y, alpha=1e-5, **ridge_options):
+    """
+    Ridge fit of the CSR coefficients (no intercept, the constant is the first term).
+    Returns a dict with coefficients, y_pred, r2 and whether the solver converged.
+    """
+    ridge_options.setdefault('fit_intercept', False)
+    model = Ridge(alpha=alpha, **ridge_options)
+    model.fit(X_design, y)
+    n_iter = model.n_iter_
+    converged = not (n_iter is not None and model.max_iter is not None and np.max(n_iter) >= model.max_iter)
+    return {
+        'coefficients': model.coef_,
+        'y_pred': model.predict(X_design),
+        'r2': model.score(X_design, y),
+        'converged': converged,
+    }
+
+
+@Profiling.timed()
+def fit_csr_blocked(X_input_scaled, bits_array, y, alpha=1e-5, block_rows=None, dtype=np.float64):
+    """
+    The fit_csr Ridge solution (no intercept, Cholesky of XᵀX + αI) from XᵀX and Xᵀy
+    accumulated over row blocks (design_gram), for fits too large for one design matrix.
+    Same result dict as fit_csr, plus the 'gram' for prediction_variance.
+    """
+    y = np.asarray(y, dtype=float)
+    gram, xty = design_gram(X_input_scaled, bits_array, y, block_rows, dtype)
+    coefficients = cho_solve(cho_factor(gram + alpha * np.eye(len(gram))), xty)
+    y_pred = predict_blocked(X_input_scaled, coefficients, bits_array, block_rows, dtype)
+    total = np.sum((y - y.mean()) ** 2)
+    r2 = 1 - np.sum((y - y_pred) ** 2) / total if total > 0 else 0.0
+    return {
+        'coefficients': coefficients,
+        'y_pred': y_pred,
+        'r2': r2,
+        'converged': True,
+        'gram': gram,
+    }
+
+
+def fit_csr_auto(X_input_scaled, bits_array, y, alpha=1e-5, memory_limit=None, **ridge_options):
+    """
+    fit_csr on the full design matrix when it fits in `memory_limit` bytes (default
+    DESIGN_MEMORY_LIMIT), else fit_csr_blocked. Returns (fit, X_design), X_design None
+    for a blocked fit.
+    """
+    if memory_limit is None:
+        memory_limit = DESIGN_MEMORY_LIMIT
+    if design_matrix_bytes(X_input_scaled.shape[0], len(bits_array)) <= memory_limit:
+        X_design = create_design_matrix(X_input_scaled, bits_array)
+        return fit_csr(X_design, y, alpha=alpha, **ridge_options), X_design
+    return fit_csr_blocked(X_input_scaled, bits_array, y, alpha=alpha), None
+
+
+def outcome_residuals(X_input_scaled, bits_array, Y, coefficients, block_rows=None, dtype=np.float64):
+    """
+    Fit statistics of several outcomes on one set of factors, one design block at a time:
+    Y is (n_samples, n_outcomes), coefficients (n_outcomes, n_terms). Returns a dict of
+    per-outcome 'r2' and 'rmse' plus 'residual_mean', the residual of every row averaged
+    over the outcomes. Nothing of size n_samples x n_terms outlives a block.
+    """
+    return _residual_stats(iter_design_blocks(X_input_scaled, bits_array, block_rows, dtype), Y, coefficients)
+
+
+def _residual_stats(design_blocks, Y, coefficients):
+    Y = np.asarray(Y, dtype=float)
+    ss_res = np.zeros(Y.shape[1])
+    residual_mean = np.empty(Y.shape[0])
+    for start, block in design_blocks:
+        residuals = block @ coefficients.T
+        np.subtract(Y[start:start + len(block)], residuals, out=residuals)
+        ss_res += np.einsum('ij,ij->j', residuals, residuals)
+        residual_mean[start:start + len(block)] = residuals.mean(axis=1)
+    ss_tot = ((Y - Y.mean(axis=0)) ** 2).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = np.where(ss_tot > 0, 1 - ss_res / ss_tot, 0.0)
+    return {'r2': r2, 'rmse': np.sqrt(ss_res / max(len(Y), 1)), 'residual_mean': residual_mean}
+
+
+@Profiling.timed()
+def fit_outcomes(X_input_scaled, bits_array, Y, alpha=1e-5, memory_limit=None, **ridge_options):
+    """
+    Every outcome (column of Y) fitted on the same factors with one shared design matrix
+    (blockwise XᵀX past `memory_limit`, as fit_csr_auto) and a single multi-target Ridge
+    solve. Per outcome only the results are kept: 'coefficients' (n_outcomes x n_terms),
+    'r2' and 'rmse', plus 'residual_mean' per row and 'converged' (see outcome_residuals).
+    """
+    Y = np.asarray(Y, dtype=float)
+    if memory_limit is None:
+        memory_limit = DESIGN_MEMORY_LIMIT
+    if design_matrix_bytes(X_input_scaled.shape[0], len(bits_array)) <= memory_limit:
+        X_design = create_design_matrix(X_input_scaled, bits_array)
+        ridge_options.setdefault('fit_intercept', False)
+        model = Ridge(alpha=alpha, **ridge_options).fit(X_design, Y)
+        n_iter = model.n_iter_
+        converged = not (n_iter is not None and model.max_iter is not None and np.max(n_iter) >= model.max_iter)
+        coefficients = np.atleast_2d(model.coef_)
+        # The design matrix is already whole: one "block"
+        stats = _residual_stats([(0, X_design)], Y, coefficients)
+    else:
+        gram, xty = design_gram(X_input_scaled, bits_array, Y)
+        coefficients = cho_solve(cho_factor(gram + alpha * np.eye(len(gram))), xty).T
+        converged = True
+        stats = outcome_residuals(X_input_scaled, bits_array, Y, coefficients)
+    stats.update(coefficients=coefficients, converged=converged)
+    return stats
+
+
+def evaluate_csr(X_scaled, coefficients, bits_array):
+    """CSR values for every row of X_scaled (fitting scale)"""
+    X_design = create_design_matrix(np.atleast_2d(X_scaled), bits_array)
+    if X_design.shape[1] == 0:
+        return np.zeros(np.atleast_2d(X_scaled).shape[0])
+    return X_design @ coefficients
+
+
+def quadratic_form(coefficients, bits_array):
+    """
+    The model as (constant, linear, Q) with f(x) = constant + linear @ x + x @ Q @ x and Q
+    symmetric (fitting scale). None when a term is above second order.
+    """
+    bits_array = np.asarray(bits_array)
+    n_factors = bits_array.shape[1]
+    constant = 0.0
+    linear = np.zeros(n_factors)
+    Q = np.zeros((n_factors, n_factors))
+    for coef, bits in zip(np.asarray(coefficients, dtype=float), bits_array):
+        factors = np.flatnonzero(bits)
+        order = bits.sum()
+        if order == 0:
+            constant += coef
+        elif order == 1:
+            linear[factors[0]] += coef
+        elif order == 2 and len(factors) == 1:
+            Q[factors[0], factors[0]] += coef
+        elif order == 2 and len(factors) == 2:
+            Q[factors[0], factors[1]] += coef / 2
+            Q[factors[1], factors[0]] += coef / 2
+        else:
+            return None
+    return constant, linear, Q
+
+
+def objective_for(func, extremum_type):
+    """Wrap `func` so that minimizing the result finds the requested extremum"""
+    if extremum_type == 'maximum':
+        return lambda x_vals: -func(x_vals)
+    if extremum_type == 'maximum_absolute_value':
+        return lambda x_vals: -np.abs(func(x_vals))
+    if extremum_type == 'minimum_absolute_value':
+        return lambda x_vals: np.abs(func(x_vals))
+    return func
+
+
+def gradient_for(func, jac, extremum_type):
+    """Gradient of objective_for(func, extremum_type), given the gradient `jac` of func"""
+    if extremum_type == 'maximum':
+        return lambda x_vals: -jac(x_vals)
+    if extremum_type == 'maximum_absolute_value':
+        return lambda x_vals: -np.sign(func(x_vals)) * jac(x_vals)
+    if extremum_type == 'minimum_absolute_value':
+        return lambda x_vals: np.sign(func(x_vals)) * jac(x_vals)
+    return jac
+
+
+def limit_constraints(csr_limits, n_factors, normalization=None):
+    """
+    SLSQP constraint dicts (with Jacobians) for the CSR limits. Limits are stated in original
+    units and compiled for the fitting scale; pass normalization=None for original-scale search.
+    """
+    return Constraints.compile_limits(csr_limits, n_factors, normalization).slsqp_constraints()
+
+
+def find_extremum(func, bounds, x0, extremum_type, constraints=None, jac=None):
+    """
+    Local extremum of `func` within `bounds`: SLSQP when there are constraints, L-BFGS-B otherwise.
+    `jac` (gradient of func) is optional; without it the gradient is finite-differenced.
+    Returns the scipy result; `func(res.x)` is the extremum value.
+    """
+    objective_to_minimize = objective_for(func, extremum_type)
+    gradient = None if jac is None else gradient_for(func, jac, extremum_type)
+    if constraints:
+        return minimize(objective_to_minimize, x0, bounds=bounds, jac=gradient,
+                        method='SLSQP', constraints=constraints, options={'disp': False})
+    return minimize(objective_to_minimize, x0, bounds=bounds, jac=gradient, method='L-BFGS-B')
+
+
+def to_fitting_scale(x, func_data):
+    """Map original-scale point(s) into the fitting scale of one fitted outcome"""
+    return func_data['normalization'].forward(x)
+
+
+def outcome_score(raw_val, func_data, objective):
+    """
+    Score of one outcome's CSR value: mapped onto its observed data range, signed by its
+    polarity and shaped by `objective` (the Extremum Objective label). Works on arrays too.
+    """
+    # Only clip if it's extremely unreasonable, so the polynomial shape still shows
+    data_min, data_max = func_data['min_val'], func_data['max_val']
+    data_range = data_max - data_min
+    reasonable_min = data_min - 2 * data_range  # Allow some extrapolation
+    reasonable_max = data_max + 2 * data_range
+
+    bounded_val = np.clip(raw_val, reasonable_min, reasonable_max)
+
+    # Normalize using data range but don't force to [0,1]
+    if data_range > 1e-9:
+        normalized_val = (bounded_val - data_min) / data_range
+    else:
+        normalized_val = np.full_like(bounded_val, 0.5, dtype=float)
+
+    polarity = func_data.get('polarity', 1)
+    if objective == "Maximum":
+        return polarity * normalized_val
+    if objective == "Minimum":
+        return polarity * (1 - normalized_val)
+    if objective == "Maximum absolute value":
+        return polarity * np.abs(normalized_val)
+    return polarity * (1 - np.abs(normalized_val))  # Minimum absolute value
+
+
+def outcome_weight(func_data):
+    """Weight of an outcome in the comprehensive score; better-fitting models count more"""
+    return max(0.1, func_data['r2'])
+
+
+# Keys of a fitted outcome needed to evaluate it; the rest (fit statistics, extremum)
+# stays behind when models are shipped to worker processes
+MODEL_KEYS = ('coefficients', 'bits_array', 'normalization', 'r2', 'min_val', 'max_val', 'polarity')
+
+
+def outcome_models(result_functions):
+    """Just the parts of `result_functions` needed for evaluation"""
+    return {name: {key: func_data.get(key) for key in MODEL_KEYS}
+            for name, func_data in result_functions.items()}
+
+
+def outcome_predictions(result_functions):
+    """
+    Batched CSR predictions of several fitted outcomes.
+    Returns predict(X) mapping an (n_points, n_factors) original-scale array to
+    (n_points, n_outcomes) values. Outcomes that share normalization and terms share
+    one design matrix, so each call costs a single matrix product per group.
+    """
+    groups = {}
+    for idx, func_data in enumerate(result_functions.values()):
+        normalization = func_data['normalization']
+        key = (normalization.norm_type, normalization.scale.tobytes(), normalization.offset.tobytes(),
+               func_data['bits_array'].tobytes(), func_data['bits_array'].shape)
+        groups.setdefault(key, (func_data, []))[1].append(idx)
+
+    n_outcomes = len(result_functions)
+    funcs = list(result_functions.values())
+    group_list = [(func_data, idxs, np.column_stack([funcs[i]['coefficients'] for i in idxs]))
+                  for func_data, idxs in groups.values()]
+
+    def predict(X):
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        values = np.empty((X.shape[0], n_outcomes))
+        for func_data, idxs, coef_matrix in group_list:
+            X_scaled = to_fitting_scale(X, func_data)
+            if X.shape[0] > design_block_rows(len(coef_matrix)):
+                # Many rows (fitted values for all the data): expand the design in blocks
+                values[:, idxs] = predict_blocked(X_scaled, coef_matrix, func_data['bits_array'])
+            else:
+                values[:, idxs] = create_design_matrix(X_scaled, func_data['bits_array']) @ coef_matrix
+        return values
+
+    return predict
+
+
+def outcome_scores(result_functions, objective):
+    """
+    Batched per-outcome scores (see `outcome_score`): score(X) -> (n_points, n_outcomes).
+    Higher is better for every column, whatever the objective and polarity.
+    """
+    predict = outcome_predictions(result_functions)
+    funcs = list(result_functions.values())
+
+    def score(X):
+        values = predict(X)
+        for k, func_data in enumerate(funcs):
+            values[:, k] = outcome_score(values[:, k], func_data, objective)
+        return values
+
+    return score
+
+
+def make_comprehensive_function(result_functions, objective):
+    """
+    Combined score of several fitted outcomes at an original-scale point.
+
+    Each outcome is evaluated in its own fitting scale, scored by `outcome_score` and
+    averaged with weights max(0.1, R²). The returned function has a `batch` attribute
+    scoring an (n_points, n_factors) array in one call, and the `objective` it was built for.
+    """
+    def comprehensive_func(x):
+        total_score = 0.0
+        weight_sum = 0.0
+
+        for func_data in result_functions.values():
+            # Evaluate individual CSR function in its normalized space
+            x_norm = to_fitting_scale(x, func_data)
+            design_row = create_design_matrix(x_norm.reshape(1, -1), func_data['bits_array'])
+            raw_val = np.dot(design_row[0], func_data['coefficients'])
+
+            weight = outcome_weight(func_data)
+            total_score += weight * outcome_score(raw_val, func_data, objective)
+            weight_sum += weight
+
+        return total_score / weight_sum if weight_sum > 0 else 0.0
+
+    scores = outcome_scores(result_functions, objective)
+    weights = np.array([outcome_weight(f) for f in result_functions.values()])
+
+    def comprehensive_batch(X):
+        if weights.sum() <= 0:
+            return np.zeros(np.atleast_2d(X).shape[0])
+        return scores(X) @ weights / weights.sum()
+
+    comprehensive_func.batch = comprehensive_batch
+    comprehensive_func.objective = objective
+    return comprehensive_func
+
+
+def surface_points(X_original, x_idx, y_idx, fixed_point, resolution=30):
+    """
+    Grid over the data range of factors x_idx and y_idx, other factors held at `fixed_point`.
+    Returns (x_grid, y_grid, points) with points of shape (resolution², n_factors), row-major.
+    """
+    x_axis = np.linspace(X_original[:, x_idx].min(), X_original[:, x_idx].max(), resolution)
+    y_axis = np.linspace(X_original[:, y_idx].min(), X_original[:, y_idx].max(), resolution)
+    x_grid, y_grid = np.meshgrid(x_axis, y_axis)
+    points = np.tile(np.asarray(fixed_point, dtype=float), (x_grid.size, 1))
+    points[:, x_idx] = x_grid.ravel()
+    points[:, y_idx] = y_grid.ravel()
+    return x_grid, y_grid, points
+
+
+def surface_grid(point_func, X_original, x_idx, y_idx, fixed_point, resolution=30, batch_func=None):
+    """
+    Evaluate `point_func` (original-scale point -> value) on a resolution x resolution grid
+    over the data range of factors x_idx and y_idx, other factors held at `fixed_point`.
+    With `batch_func` (points -> values) the whole grid is scored in one call.
+    Returns (x_grid, y_grid, z_grid).
+    """
+    x_grid, y_grid, points = surface_points(X_original, x_idx, y_idx, fixed_point, resolution)
+    if batch_func is not None:
+        return x_grid, y_grid, np.asarray(batch_func(points), dtype=float).reshape(x_grid.shape)
+    z_grid = np.array([point_func(point) for point in points], dtype=float).reshape(x_grid.shape)
+    return x_grid, y_grid, z_grid
+
+
+def prediction_variance(X_design, y, y_pred, alpha, gram=None):
+    """
+    Variance of Ridge predictions from one factorization of XᵀX + αI.
+
+    Returns variance(design_rows, include_noise=False) -> σ² · dᵀ(XᵀX + αI)⁻¹d per row
+    (the fitted surface's variance), plus σ² with include_noise=True (a new observation).
+    σ² is the residual variance over the effective residual degrees of freedom
+    n - tr(hat matrix); `.sigma2` and `.dof` are attached to the function.
+    `gram` (XᵀX) can stand in for X_design, which may then be None; it is attached as
+    `.gram` too, so the function can be rebuilt without the data (restore_prediction_variance).
+    """
+    if gram is None:
+        X_design = np.asarray(X_design, dtype=float)
+        gram = X_design.T @ X_design
+    solve = _ridge_solver(gram, alpha)
+    # tr(X (XᵀX + αI)⁻¹ Xᵀ) = tr((XᵀX + αI)⁻¹ XᵀX): no pass over the rows
+    hat_trace = np.trace(solve(gram))
+    dof = max(len(y) - hat_trace, 1.0)
+    sigma2 = float(np.sum((np.asarray(y) - np.asarray(y_pred)) ** 2) / dof)
+    return _variance_function(solve, gram, sigma2, dof)
+
+
+def restore_prediction_variance(gram, alpha, sigma2, dof):
+    """The prediction_variance function from its saved XᵀX, σ² and degrees of freedom"""
+    gram = np.asarray(gram, dtype=float)
+    return _variance_function(_ridge_solver(gram, alpha), gram, float(sigma2), float(dof))
+
+
+def _ridge_solver(gram, alpha):
+    """
+    solve(B) -> (XᵀX + αI)⁻¹B for 2D B: a Cholesky factorization, or where that fails
+    numerically (rank-deficient, badly scaled designs) the pseudo-inverse from an
+    eigendecomposition, dropping eigenvalues below the rounding level of the largest
+    """
+    matrix = gram + alpha * np.eye(len(gram))
+    try:
+        factor = cho_factor(matrix)
+        return lambda b: cho_solve(factor, b)
+    except np.linalg.LinAlgError:
+        eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+        keep = eigenvalues > len(matrix) * np.finfo(float).eps * max(eigenvalues.max(), 0.0)
+        eigenvalues, eigenvectors = eigenvalues[keep], eigenvectors[:, keep]
+        return lambda b: eigenvectors @ ((eigenvectors.T @ b) / eigenvalues[:, None])
+
+
+def _variance_function(solve, gram, sigma2, dof):
+    def variance(design_rows, include_noise=False):
+        design_rows = np.atleast_2d(design_rows)
+        leverage = np.sum(design_rows * solve(design_rows.T).T, axis=1)
+        return sigma2 * (leverage + 1.0) if include_noise else sigma2 * leverage
+
+    variance.sigma2 = sigma2
+    variance.dof = dof
+    variance.gram = gram
+    return variance
@@ -3,7 +3,7 @@ import sys
 import pandas as pd
 import numpy as np
 from scipy.optimize import minimize
-from sklearn.linear_model import Ridge
+from scipy.stats import t as t_dist
 # from sklearn.model_selection import cross_val_score # Removed
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, font as tkFont
@@ -14,6 +14,9 @@ import matplotlib.colors as mcolors
 import matplotlib.patches # For Wedge
 from PIL import Image, ImageDraw, ImageFont
 import math
+import logging
+import multiprocessing
+import queue
 
 class _SilentStream:
     def write(self, _msg=None):
@@ -28,8 +31,43 @@ if sys.stdout is None:
 if sys.stderr is None:
     sys.stderr = _SilentStream()
 
+# Response-surface overlays for single-outcome fits
+SURFACE_UNCERTAINTY = ("No uncertainty", "95% prediction interval", "Standard error colours")
+# The 3D surface is drawn at SURFACE_RESOLUTION first (shared with the pairs matrix), then refined
+SURFACE_RESOLUTION = 30
+SURFACE_FINE_RESOLUTION = 60
+SURFACE_REFINE_DELAY_MS = 150
+
 # Force refresh of OACD module
 from OACD import OACD
+import DataSource
+import DatasetStore
+import ModelArtifact
+from Normalization import Normalization
+from ResultCache import ResultCache, default_cache_dir, disk_usage as cache_disk_usage, clear_disk as clear_cache_disk
+import Log
+import Profiling
+import CSRModel
+import Coefficients
+import Pareto
+import GlobalSearch
+import Constraints
+import Sensitivity
+import Bootstrap
+import Screening
+import Surfaces
+from PlotCanvas import PlotCanvas
+from VirtualTable import VirtualTable
+import RoleEditor
+import ChartExport
+
+log_io = Log.get_logger("io")
+log_fit = Log.get_logger("fit")
+log_opt = Log.get_logger("optimize")
+log_plot = Log.get_logger("plot")
+log_coef = Log.get_logger("coefficients")
+log_oacd = Log.get_logger("oacd")
+log_ui = Log.get_logger("ui")
 
 class CSRApp:
     def __init__(self, root):
@@ -98,8 +136,16 @@ class CSRApp:
         self.extremum_point = None
         self.x_min_orig = None
         self.x_max_orig = None
-        self.norm_x_min = None
-        self.norm_x_max = None
+        self.normalization = None
+        self.fit_alpha = None
+        self.prediction_variance = None
+        self.fit_gram = None
+        self.train_r2 = None
+        self.train_rmse = None
+        self.loaded_model = None
+        self.surface_slices = Surfaces.SliceCache()
+        self._surface_generation = 0
+        self._surface_refine_job = None
 
         self.term_type_colors = {
             'Constant': '#800080',    # Matplotlib Blue
@@ -113,7 +159,12 @@ class CSRApp:
         # Initialize CSR limits (similar to OACD limits)
         self.csr_limits = {}
         self.csr_limit_names = {}
-        self.csr_factor_checkboxes = {}
+
+        # Last factor screening (scores of the candidate parameters), see compute_screening
+        self.screening = None
+
+        # Fits and extremum searches are cached by content hash of data + settings
+        self.result_cache = ResultCache(max_entries=32, cache_dir=default_cache_dir())
 
         self.notebook = ttk.Notebook(self.root, style="TNotebook")
 
@@ -205,7 +256,11 @@ class CSRApp:
         
         self.style.configure("Accent.TButton", font=self.button_font, foreground="white", background="#0078D7")
         self.style.map("Accent.TButton", background=[('active', '#005A9E'), ('pressed', '!disabled', '#004C8A')])
-        ttk.Button(left_frame, text="Select Data File", command=self.select_file, style="Accent.TButton").pack(pady=(0,15), padx=5, fill='x')
+        ttk.Button(left_frame, text="Select Data File", command=self.select_file, style="Accent.TButton").pack(pady=(0,5), padx=5, fill='x')
+        model_file_frame = ttk.Frame(left_frame, style="App.TFrame")
+        model_file_frame.pack(fill='x', padx=5, pady=(0,15))
+        ttk.Button(model_file_frame, text="Save Model...", command=self.save_model).pack(side='left', expand=True, fill='x')
+        ttk.Button(model_file_frame, text="Load Model...", command=self.load_model).pack(side='left', expand=True, fill='x', padx=(5,0))
 
         ttk.Label(left_frame, text="Project Name / File:").pack(anchor='w', padx=5)
         self.project_name_entry = ttk.Entry(left_frame, font=self.entry_font)
@@ -267,11 +322,75 @@ class CSRApp:
         ttk.Label(self.factor_limits_frame, text="Select parameters for limits (will be applied during optimization):", 
                 font=self.label_font).pack(anchor='w', pady=(0,5))
         
-        # Container for factor limit checkboxes
+        # One multi-select list (Shift/Ctrl-click) instead of a checkbox per parameter
         self.factor_limits_container = ttk.Frame(self.factor_limits_frame, style="App.TFrame")
         self.factor_limits_container.pack(fill='x', pady=5)
+        limits_scroll = ttk.Scrollbar(self.factor_limits_container, orient='vertical')
+        limits_scroll.pack(side='right', fill='y')
+        self.csr_factor_listbox = tk.Listbox(self.factor_limits_container, height=6, selectmode='extended',
+                                             exportselection=False, font=self.entry_font,
+                                             yscrollcommand=limits_scroll.set)
+        self.csr_factor_listbox.pack(fill='x', expand=True)
+        limits_scroll.config(command=self.csr_factor_listbox.yview)
+        self.csr_factor_listbox.shown = []
+
+        # === Result Cache Options ===
+        cache_frame = ttk.Frame(left_frame, style="App.TFrame")
+        cache_frame.pack(fill='x', pady=(5,0), padx=5)
+        self.disk_cache_var = tk.BooleanVar(value=True)
+        self.disk_cache_check = ttk.Checkbutton(cache_frame, variable=self.disk_cache_var,
+                                                command=self._update_disk_cache)
+        self.disk_cache_check.pack(side='left')
+        ttk.Button(cache_frame, text="Clear Cache", command=self._clear_result_cache, width=10).pack(side='right')
+        self._update_disk_cache_label()
+        # Off by default: every copy takes as much disk space as the data itself
+        store_frame = ttk.Frame(left_frame, style="App.TFrame")
+        store_frame.pack(fill='x', padx=5)
+        self.dataset_store_var = tk.BooleanVar(value=False)
+        self.dataset_store_check = ttk.Checkbutton(store_frame, variable=self.dataset_store_var,
+                                                   command=self._update_dataset_store_label)
+        self.dataset_store_check.pack(side='left')
+        ttk.Button(store_frame, text="Clear Copies", command=self._clear_dataset_stores, width=10).pack(side='right')
+        self._update_dataset_store_label()
+
+        self.global_search_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(left_frame, text="Global search for the extremum (differential evolution, slower)",
+                        variable=self.global_search_var).pack(anchor='w', pady=(5,0), padx=5)
+
+        # === Factor Screening (wide data) ===
+        screening_frame = ttk.Frame(left_frame, style="App.TFrame")
+        screening_frame.pack(fill='x', pady=(5,0), padx=5)
+        self.screen_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(screening_frame, text="Screen parameters first, keep top",
+                        variable=self.screen_var).pack(side='left')
+        self.screen_k_var = tk.IntVar(value=Screening.DEFAULT_TOP_K)
+        tk.Spinbox(screening_frame, from_=1, to=500, textvariable=self.screen_k_var, width=4,
+                   font=self.entry_font).pack(side='left', padx=(2,4))
+        ttk.Label(screening_frame, text="by").pack(side='left')
+        self.screen_method_combo = ttk.Combobox(screening_frame, values=Screening.METHODS, state='readonly', width=16)
+        self.screen_method_combo.current(0)
+        self.screen_method_combo.pack(side='left', padx=(4,0))
+        ttk.Button(left_frame, text="Screening Scores...",
+                   command=self.show_screening_scores).pack(anchor='w', pady=(5,0), padx=5)
 
         ttk.Button(left_frame, text="Run Fitting Process", command=self.run_fitting).pack(pady=15, padx=5, fill='x', ipady=5)
+        ttk.Button(left_frame, text="Pareto Front (multiple outcomes)...",
+                   command=self.show_pareto_front).pack(pady=(0,5), padx=5, fill='x')
+        ttk.Button(left_frame, text="Confidence Intervals (bootstrap)...",
+                   command=self.show_confidence_intervals).pack(pady=(0,10), padx=5, fill='x')
+
+        # === Performance Panel (collapsed by default) ===
+        self.perf_toggle_button = ttk.Button(left_frame, text="▸ Performance", command=self._toggle_performance_panel)
+        self.perf_toggle_button.pack(anchor='w', padx=5)
+        self.perf_frame = ttk.LabelFrame(left_frame, text="Performance", padding=(10,5,10,10))
+        self.perf_text = tk.Text(self.perf_frame, height=12, width=48, wrap='none', font=self.text_widget_font,
+                                 relief=tk.SOLID, borderwidth=1, state='disabled')
+        self.perf_text.pack(fill='x', pady=(0,5))
+        perf_button_frame = ttk.Frame(self.perf_frame, style="App.TFrame")
+        perf_button_frame.pack(fill='x')
+        ttk.Button(perf_button_frame, text="Refresh", command=self._refresh_performance_panel, width=8).pack(side='left')
+        ttk.Button(perf_button_frame, text="Reset", command=self._reset_performance_stats, width=8).pack(side='left', padx=(5,0))
+        ttk.Button(perf_button_frame, text="Export JSON", command=self._export_performance_report, width=12).pack(side='right')
 
         # === Center Panel Contents ===
         center_frame = ttk.Frame(center_scrollable_frame, padding=(5,15,15,15), style="App.TFrame")
@@ -284,13 +403,12 @@ class CSRApp:
         self.factor_selection_frame = ttk.Frame(factor_frame, style="App.TFrame")
         self.factor_selection_frame.pack(fill='both', expand=True)
         
-        # Initialize selection dictionary
-        self.factor_checkboxes = {}
-        self.factor_selection = {}
-        
         # Add a label for the factor and result selection
         ttk.Label(self.factor_selection_frame, text="Select parameters and outcomes to include in analysis:", 
                 font=self.label_font).pack(anchor='w', pady=(0,10))
+
+        # One table row per column; roles can be set per row or in bulk by pattern
+        self.role_editor = RoleEditor.RoleEditor(self.factor_selection_frame, height=10, font=self.entry_font)
         
         # Key Results Frame (now contains CSR Equation and Parameter Definitions)
         results_frame = ttk.LabelFrame(center_frame, text="Key Results", padding=(10,5,10,10))
@@ -406,7 +524,13 @@ class CSRApp:
         ttk.Label(factor_control_frame, text="Y-axis:").pack(side='left', padx=(0,3))
         self.y_factor_combo = ttk.Combobox(factor_control_frame, state='readonly', width=12, font=self.entry_font)
         self.y_factor_combo.pack(side='left', padx=(0,10))
+        self.surface_uncertainty_combo = ttk.Combobox(factor_control_frame, state='readonly', width=22, font=self.entry_font,
+                                                      values=SURFACE_UNCERTAINTY)
+        self.surface_uncertainty_combo.current(0)
+        self.surface_uncertainty_combo.pack(side='left', padx=(0,10))
+        self.surface_uncertainty_combo.bind("<<ComboboxSelected>>", lambda _event: self.update_3d_plot())
         ttk.Button(factor_control_frame, text="Update", command=self.update_3d_plot, width=8).pack(side='left', padx=5)
+        ttk.Button(factor_control_frame, text="Pairs Matrix...", command=self.show_pair_matrix).pack(side='left', padx=5)
 
         self.figure2 = Figure(figsize=(5, 4), dpi=100, facecolor='#F0F0F0')
         self.figure2.subplots_adjust(bottom=0.18, left=0.1, right=0.85, top=0.9)
@@ -416,6 +540,8 @@ class CSRApp:
         toolbar2.update()
         toolbar2.configure(background='#F0F0F0')
         for child_widget in toolbar2.winfo_children(): child_widget.configure(background='#F0F0F0')
+        self.results_plot = PlotCanvas(self.figure1, self.canvas1)
+        self.surface_plot = PlotCanvas(self.figure2, self.canvas2)
 
         # Update the UI after initial setup
         self._update_csr_factor_limits_ui()
@@ -432,11 +558,8 @@ class CSRApp:
             messagebox.showwarning("Invalid Value", "Limit value must be positive.")
             return
             
-        # Get selected factors from checkboxes
-        selected_factors = []
-        for i, var in self.csr_factor_checkboxes.items():
-            if var.get():  # Checkbox is checked
-                selected_factors.append(i)
+        # Get selected factors from the list (indices into factor_cols)
+        selected_factors = list(self.csr_factor_listbox.curselection())
         
         if not selected_factors:
             messagebox.showwarning("No Selection", "Please select at least one factor for the limit.")
@@ -486,31 +609,548 @@ class CSRApp:
             self.csr_limits_listbox.insert(tk.END, name)
 
     def _update_csr_factor_limits_ui(self):
-        """Update the factor limits selection UI when factors are loaded"""
-        # Clear existing widgets
-        for widget in self.factor_limits_container.winfo_children():
-            widget.destroy()
-        
-        self.csr_factor_checkboxes = {}  # Change from combos to checkboxes
-        
-        if not hasattr(self, 'factor_cols') or not self.factor_cols:
+        """Update the factor limits selection list when factors are loaded"""
+        names = [self.col_name_mapping.get(factor, factor) for factor in getattr(self, 'factor_cols', None) or []]
+        # The list (and its selection) only changes when the parameters do
+        if names == self.csr_factor_listbox.shown:
             return
-            
-        # Create factor selection checkboxes using pack
-        for i, factor in enumerate(self.factor_cols):
-            display_name = self.col_name_mapping.get(factor, factor)
-            
-            # Create frame for this factor
-            factor_frame = ttk.Frame(self.factor_limits_container, style="App.TFrame")
-            factor_frame.pack(fill='x', pady=2)
-            
-            # Create checkbox instead of combobox
-            var = tk.BooleanVar(value=False)
-            checkbox = ttk.Checkbutton(factor_frame, text=display_name, variable=var)
-            checkbox.pack(side='left', padx=(0,10))
-            
-            self.csr_factor_checkboxes[i] = var  # Store by index
+        self.csr_factor_listbox.delete(0, tk.END)
+        if names:
+            self.csr_factor_listbox.insert(tk.END, *names)
+        self.csr_factor_listbox.shown = names
     
+    def _update_disk_cache(self):
+        """Enable or disable the on-disk part of the result cache"""
+        self.result_cache.set_cache_dir(default_cache_dir() if self.disk_cache_var.get() else None)
+        self._update_disk_cache_label()
+
+    @staticmethod
+    def _format_disk_size(size):
+        """Disk space in MB, or KB below a megabyte"""
+        return f"{size / 1e6:.1f} MB" if size >= 1e6 else f"{size / 1e3:.0f} KB"
+
+    def _update_disk_cache_label(self):
+        """Show how many results are cached on disk and the space they take"""
+        count, size = cache_disk_usage()
+        text = "Keep cached results between sessions"
+        if count:
+            text += f" ({count} kept, {self._format_disk_size(size)})"
+        self.disk_cache_check.config(text=text)
+
+    def _clear_result_cache(self):
+        """Drop all cached fits and extremum searches"""
+        _, size = cache_disk_usage()
+        self.result_cache.clear(disk=False)
+        # Also when caching between sessions is switched off, the entries already on disk go
+        clear_cache_disk()
+        self._update_disk_cache_label()
+        messagebox.showinfo("Cache Cleared", f"All cached fitting results were removed "
+                                             f"({self._format_disk_size(size)} freed).")
+
+    def _update_dataset_store_label(self):
+        """Show how many dataset copies are kept and the disk space they take"""
+        count, size = DatasetStore.store_usage()
+        text = "Keep a fast memory-mapped copy of loaded files"
+        if count:
+            text += f" ({count} kept, {self._format_disk_size(size)})"
+        self.dataset_store_check.config(text=text)
+
+    def _clear_dataset_stores(self):
+        """Delete the memory-mapped copies of loaded files"""
+        freed = DatasetStore.clear_stores()
+        self._update_dataset_store_label()
+        messagebox.showinfo("Copies Cleared", f"Memory-mapped copies of data files were removed "
+                                              f"({self._format_disk_size(freed)} freed).")
+
+    def _toggle_performance_panel(self):
+        """Show or hide the Performance panel"""
+        if self.perf_frame.winfo_ismapped():
+            self.perf_frame.pack_forget()
+            self.perf_toggle_button.config(text="▸ Performance")
+        else:
+            self.perf_frame.pack(fill='x', pady=(5,10), padx=5, after=self.perf_toggle_button)
+            self.perf_toggle_button.config(text="▾ Performance")
+            self._refresh_performance_panel()
+
+    def _refresh_performance_panel(self):
+        """Show the timings of the current run"""
+        if not hasattr(self, 'perf_text'):
+            return
+        try:
+            self.perf_text.config(state='normal')
+            self.perf_text.delete(1.0, tk.END)
+            self.perf_text.insert(tk.END, Profiling.recorder.format_report())
+            self.perf_text.config(state='disabled')
+        except tk.TclError as e:
+            log_ui.warning('Error updating performance panel: %s', e)
+
+    def _reset_performance_stats(self):
+        Profiling.recorder.reset()
+        self._refresh_performance_panel()
+
+    def _export_performance_report(self):
+        """Save the timings of every run this session as JSON"""
+        path = filedialog.asksaveasfilename(defaultextension=".json",
+                                            filetypes=[("JSON files", "*.json")],
+                                            initialfile="csr_performance.json")
+        if not path:
+            return
+        try:
+            Profiling.recorder.export_json(path)
+        except OSError as e:
+            messagebox.showerror("Export Error", f"Could not save performance report: {str(e)}")
+
+    def show_pareto_front(self):
+        """Compute the Pareto front of the fitted outcomes and open it in a browser window"""
+        if not hasattr(self, 'result_functions') or len(self.result_functions) < 2:
+            messagebox.showinfo("Pareto Front",
+                                "The Pareto front needs two or more outcomes. Mark several columns as "
+                                "outcome and run the fitting process first.")
+            return
+        bounds_opt = self._factor_bounds()
+        try:
+            self.root.config(cursor="watch")
+            self.root.update_idletasks()
+            self.pareto_result = Pareto.pareto_front(self.result_functions, self.weight_combo.get(),
+                                                     bounds_opt, self.csr_limits)
+        except Exception as e:
+            log_opt.exception('Pareto front failed')
+            messagebox.showerror("Pareto Front Error", f"Could not compute the Pareto front: {str(e)}")
+            return
+        finally:
+            self.root.config(cursor="")
+        self._refresh_performance_panel()
+        if len(self.pareto_result['x']) == 0:
+            messagebox.showwarning("Pareto Front", "No feasible point satisfies the current limits.")
+            return
+        self._open_pareto_window(self.pareto_result)
+
+    def _open_pareto_window(self, front):
+        """Table and scatter plot of the Pareto front; a selected point can replace the extremum"""
+        window = tk.Toplevel(self.root)
+        window.title(f"Pareto Front - {len(front['x'])} non-dominated points")
+        window.geometry("1100x700")
+
+        factor_names = [self.col_name_mapping.get(f, f) for f in self.factor_cols]
+        outcome_names = []
+        for result_col in front['outcomes']:
+            polarity_symbol = "(+)" if self.result_functions[result_col].get('polarity', 1) == 1 else "(-)"
+            outcome_names.append(f"{self.col_name_mapping.get(result_col, result_col)}{polarity_symbol}")
+
+        # Scatter of two chosen outcomes
+        plot_frame = ttk.Frame(window, style="App.TFrame")
+        plot_frame.pack(side='top', fill='both', expand=True, padx=10, pady=(10,5))
+        axis_frame = ttk.Frame(plot_frame, style="App.TFrame")
+        axis_frame.pack(fill='x')
+        ttk.Label(axis_frame, text="X axis:", font=self.label_font).pack(side='left')
+        x_combo = ttk.Combobox(axis_frame, values=outcome_names, state='readonly', width=20)
+        x_combo.pack(side='left', padx=(5,15))
+        ttk.Label(axis_frame, text="Y axis:", font=self.label_font).pack(side='left')
+        y_combo = ttk.Combobox(axis_frame, values=outcome_names, state='readonly', width=20)
+        y_combo.pack(side='left', padx=5)
+        x_combo.current(0)
+        y_combo.current(1)
+
+        figure = Figure(figsize=(6, 3.5), dpi=100)
+        figure.patch.set_facecolor('#F0F0F0')
+        canvas = FigureCanvasTkAgg(figure, master=plot_frame)
+        canvas.get_tk_widget().pack(fill='both', expand=True)
+
+        # Table of all front points, best comprehensive score first
+        table_frame = ttk.Frame(window, style="App.TFrame")
+        table_frame.pack(side='top', fill='both', expand=True, padx=10)
+        columns = ["#", "Score"] + factor_names + outcome_names
+        tree = ttk.Treeview(table_frame, columns=columns, show='headings', height=10)
+        y_scroll = ttk.Scrollbar(table_frame, orient='vertical', command=tree.yview)
+        tree.configure(yscrollcommand=y_scroll.set)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=60 if col == "#" else 110, anchor='center')
+        for i in range(len(front['x'])):
+            row = [i + 1, f"{front['combined'][i]:.4f}"]
+            row += [f"{v:.4f}" for v in front['x'][i]]
+            row += [f"{v:.4f}" for v in front['values'][i]]
+            tree.insert('', 'end', iid=str(i), values=row)
+        tree.pack(side='left', fill='both', expand=True)
+        y_scroll.pack(side='right', fill='y')
+
+        def selected_index():
+            selection = tree.selection()
+            return int(selection[0]) if selection else None
+
+        def redraw(_event=None):
+            figure.clf()
+            ax = figure.add_subplot(111, facecolor='#ffffff')
+            ax.grid(True, linestyle=':', alpha=0.6, color='gray')
+            x_idx, y_idx = x_combo.current(), y_combo.current()
+            ax.scatter(front['values'][:, x_idx], front['values'][:, y_idx], c=front['combined'],
+                       cmap='viridis', s=30, picker=5)
+            idx = selected_index()
+            if idx is not None:
+                ax.scatter([front['values'][idx, x_idx]], [front['values'][idx, y_idx]], s=120,
+                           facecolors='none', edgecolors='red', linewidths=2)
+            ax.set_xlabel(outcome_names[x_idx])
+            ax.set_ylabel(outcome_names[y_idx])
+            ax.set_title("Non-dominated points (colour: comprehensive score)", fontsize=10)
+            figure.tight_layout()
+            canvas.draw_idle()
+
+        def on_pick(event):
+            if len(event.ind):
+                idx = str(event.ind[0])
+                tree.selection_set(idx)
+                tree.see(idx)
+
+        def use_selected():
+            idx = selected_index()
+            if idx is None:
+                messagebox.showinfo("Pareto Front", "Select a point in the table first.")
+                return
+            self._apply_pareto_point(front['x'][idx])
+
+        def export_csv():
+            path = filedialog.asksaveasfilename(defaultextension=".csv",
+                                                filetypes=[("CSV files", "*.csv")],
+                                                initialfile="pareto_front.csv")
+            if not path:
+                return
+            table = pd.DataFrame(front['x'], columns=factor_names)
+            for k, name in enumerate(outcome_names):
+                table[name] = front['values'][:, k]
+            table['Comprehensive score'] = front['combined']
+            try:
+                table.to_csv(path, index=False)
+            except OSError as e:
+                messagebox.showerror("Export Error", f"Could not save Pareto front: {str(e)}")
+
+        button_frame = ttk.Frame(window, style="App.TFrame")
+        button_frame.pack(side='bottom', fill='x', padx=10, pady=10)
+        ttk.Button(button_frame, text="Use Selected Point", command=use_selected).pack(side='left')
+        ttk.Button(button_frame, text="Export CSV...", command=export_csv).pack(side='right')
+
+        x_combo.bind("<<ComboboxSelected>>", redraw)
+        y_combo.bind("<<ComboboxSelected>>", redraw)
+        tree.bind("<<TreeviewSelect>>", redraw)
+        canvas.mpl_connect('pick_event', on_pick)
+        redraw()
+
+    def _apply_pareto_point(self, x_point):
+        """Make a Pareto point the current extremum and refresh results, plots and pie charts"""
+        self.extremum_point = {'x': np.array(x_point, dtype=float),
+                               'value': self.comprehensive_function(np.array(x_point, dtype=float))}
+        self.all_extremum_results = [{'active_factors': len(self.factor_cols), 'result': self.extremum_point}]
+        result_min_max = {result_col: {'min': func_data['min_val'], 'max': func_data['max_val']}
+                          for result_col, func_data in self.result_functions.items()}
+        self.update_comprehensive_results_display(result_min_max)
+        n_factors = len(self.factor_cols)
+        self.plot_results(n_factors)
+        self.update_coefficient_pie_charts()
+        self.update_3d_plot()
+
+    @Profiling.timed()
+    def compute_confidence_intervals(self, method="bootstrap", n_replicates=Bootstrap.DEFAULT_REPLICATES,
+                                     level=0.95, workers=None):
+        """Bootstrap / jackknife intervals of the single-outcome fit and its extremum"""
+        bounds_opt, _ = self.normalization.search_bounds(self.X_original_scale)
+        x0 = self.normalization.forward(np.asarray(self.extremum_point['x'], dtype=float))
+        lower = np.array([low for low, _ in bounds_opt], dtype=float)
+        upper = np.array([high for _, high in bounds_opt], dtype=float)
+        return Bootstrap.confidence_intervals(
+            self.X, self.y, self.fit_alpha or 1e-5,
+            self.coefficients, self.bits_array, self.normalization, bounds_opt, np.clip(x0, lower, upper),
+            self.weight_combo.get().lower().replace(" ", "_"), self.csr_limits,
+            n_replicates=n_replicates, method=method, level=level, workers=workers)
+
+    def _screening_k(self):
+        try:
+            k = int(self.screen_k_var.get())
+        except (tk.TclError, ValueError):
+            k = 0
+        if k < 1:
+            raise ValueError("Screening must keep at least one parameter.")
+        return k
+
+    @Profiling.timed()
+    def compute_screening(self, factor_cols, result_cols, method="correlation", k=Screening.DEFAULT_TOP_K):
+        """Screening scores of the candidate parameters for the outcomes and the top-k of them"""
+        X = self.df[factor_cols].to_numpy(dtype=float)
+        Y = self.df[result_cols].to_numpy(dtype=float)
+        scores = Screening.screening_scores(X, Y, method)
+        kept = Screening.top_k(scores, k)
+        return {'method': method, 'k': k, 'factor_cols': list(factor_cols), 'result_cols': list(result_cols),
+                'scores': scores, 'ranks': Screening.ranks(scores),
+                'kept': [factor_cols[i] for i in kept]}
+
+    def _apply_screening(self, screening):
+        """Set the screened-out parameters to 'ignore' in the role editor"""
+        dropped = [col for col in screening['factor_cols'] if col not in screening['kept']]
+        self.role_editor.set_roles(dropped, "ignore")
+        return dropped
+
+    def _screen_parameters(self):
+        """
+        Before fitting: with screening on and more than k parameters, keep the top-k as
+        parameters and set the rest to 'ignore' (visible and reversible in the role editor).
+        """
+        if not self.screen_var.get():
+            return
+        k = self._screening_k()
+        if len(self.factor_cols) <= k:
+            return
+        if self.csr_limits:
+            # Limits refer to parameters by position, screening would shift them
+            messagebox.showwarning("Screening Skipped",
+                                   "Parameter limits are set, so all parameters are fitted. "
+                                   "Clear the limits, fit once with screening, then add the limits again.")
+            return
+        self.screening = self.compute_screening(self.factor_cols, self.result_cols,
+                                                self.screen_method_combo.get(), k)
+        dropped = self._apply_screening(self.screening)
+        self.factor_cols = self.screening['kept']
+        log_fit.info('Screening (%s) kept %s of %s parameters', self.screening['method'],
+                     len(self.factor_cols), len(self.factor_cols) + len(dropped))
+
+    def show_screening_scores(self):
+        """Window with the screening score and rank of every parameter"""
+        if self.df is None:
+            messagebox.showinfo("Factor Screening", "Load data first.")
+            return
+        result_cols = [col for col, role in self.role_editor.roles.items() if role.startswith("outcome")]
+        if not result_cols:
+            messagebox.showinfo("Factor Screening", "Select at least one outcome first.")
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title("Factor Screening")
+        window.geometry("700x600")
+
+        controls = ttk.Frame(window, style="App.TFrame")
+        controls.pack(side='top', fill='x', padx=10, pady=(10,5))
+        ttk.Label(controls, text="Method:", font=self.label_font).pack(side='left')
+        method_combo = ttk.Combobox(controls, values=Screening.METHODS, state='readonly', width=18)
+        method_combo.pack(side='left', padx=(5,15))
+        method_combo.set(self.screen_method_combo.get())
+        ttk.Label(controls, text="Keep top:", font=self.label_font).pack(side='left')
+        tk.Spinbox(controls, from_=1, to=500, textvariable=self.screen_k_var, width=5,
+                   font=self.entry_font).pack(side='left', padx=5)
+        status_label = ttk.Label(window, text="", font=self.label_font)
+        status_label.pack(side='top', fill='x', padx=10)
+
+        table_frame = ttk.Frame(window, style="App.TFrame")
+        table_frame.pack(side='top', fill='both', expand=True, padx=10, pady=5)
+        columns = ["Rank", "Parameter", "Column", "Score", "Kept"]
+        y_scroll = ttk.Scrollbar(table_frame, orient='vertical')
+        y_scroll.pack(side='right', fill='y')
+        tree = ttk.Treeview(table_frame, columns=columns, show='headings', height=18, yscrollcommand=y_scroll.set)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=200 if col == "Parameter" else 90, anchor='center')
+        tree.pack(fill='both', expand=True)
+        y_scroll.config(command=tree.yview)
+
+        current = {}
+
+        def recompute(_event=None):
+            # The last screening of a fit is shown as it was; anything else is scored now
+            # over the parameters and outcomes currently set in the role editor
+            factor_cols = [col for col, role in self.role_editor.roles.items() if role == "parameter"]
+            if self.screening is not None and not current and self.screening['method'] == method_combo.get():
+                screening = self.screening
+            else:
+                if not factor_cols:
+                    messagebox.showinfo("Factor Screening", "Select at least one parameter first.", parent=window)
+                    return
+                try:
+                    window.config(cursor="watch")
+                    window.update_idletasks()
+                    screening = self.compute_screening(factor_cols, result_cols, method_combo.get(), self._screening_k())
+                except Exception as e:
+                    log_fit.exception('Factor screening failed')
+                    messagebox.showerror("Screening Error", f"Could not score the parameters: {str(e)}", parent=window)
+                    return
+                finally:
+                    window.config(cursor="")
+            current['screening'] = screening
+
+            outcomes = ", ".join(self.col_name_mapping.get(col, col) for col in screening['result_cols'])
+            status_label.config(text=f"{len(screening['factor_cols'])} parameters scored by {screening['method']} "
+                                     f"for {outcomes}; the top {len(screening['kept'])} are kept.")
+            tree.delete(*tree.get_children())
+            kept = set(screening['kept'])
+            for i in np.argsort(screening['ranks']):
+                col = screening['factor_cols'][i]
+                tree.insert('', 'end', values=[screening['ranks'][i], self.col_name_mapping.get(col, col), col,
+                                               f"{screening['scores'][i]:.4f}", "yes" if col in kept else ""])
+
+        def export_csv():
+            if 'screening' not in current:
+                return
+            path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")],
+                                                initialfile="screening_scores.csv", parent=window)
+            if not path:
+                return
+            screening = current['screening']
+            kept = set(screening['kept'])
+            table = pd.DataFrame({'parameter': [self.col_name_mapping.get(c, c) for c in screening['factor_cols']],
+                                  'column': screening['factor_cols'],
+                                  'method': screening['method'],
+                                  'score': screening['scores'],
+                                  'rank': screening['ranks'],
+                                  'kept': [c in kept for c in screening['factor_cols']]}).sort_values('rank')
+            try:
+                table.to_csv(path, index=False)
+            except OSError as e:
+                messagebox.showerror("Export Error", f"Could not save screening scores: {str(e)}", parent=window)
+
+        def apply_roles():
+            if 'screening' not in current:
+                return
+            dropped = self._apply_screening(current['screening'])
+            status_label.config(text=f"{len(dropped)} parameters set to 'ignore'; run the fitting process to fit the rest.")
+
+        button_frame = ttk.Frame(window, style="App.TFrame")
+        button_frame.pack(side='bottom', fill='x', padx=10, pady=10)
+        ttk.Button(button_frame, text="Recompute", command=recompute).pack(side='left')
+        ttk.Button(button_frame, text="Keep Top Parameters", command=apply_roles).pack(side='left', padx=(5,0))
+        ttk.Button(button_frame, text="Export CSV...", command=export_csv).pack(side='right')
+
+        method_combo.bind("<<ComboboxSelected>>", recompute)
+        recompute()
+
+    def show_confidence_intervals(self):
+        """Window with resampling confidence intervals for the coefficients and the extremum"""
+        if hasattr(self, 'result_functions') or self.coefficients is None or self.X is None \
+                or not self.extremum_point or self.extremum_point.get('x') is None:
+            messagebox.showinfo("Confidence Intervals",
+                                "Confidence intervals are available after fitting a single outcome "
+                                "with an extremum. Run the fitting process first.")
+            return
+        if self.y is None:
+            messagebox.showinfo("Confidence Intervals",
+                                "Confidence intervals resample the data. Load the data and run the "
+                                "fitting process (a model loaded from a file has no data rows).")
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title("Confidence Intervals")
+        window.geometry("900x700")
+
+        controls = ttk.Frame(window, style="App.TFrame")
+        controls.pack(side='top', fill='x', padx=10, pady=(10,5))
+        ttk.Label(controls, text="Method:", font=self.label_font).pack(side='left')
+        method_combo = ttk.Combobox(controls, values=list(Bootstrap.METHODS), state='readonly', width=12)
+        method_combo.pack(side='left', padx=(5,15))
+        method_combo.current(0)
+        ttk.Label(controls, text="Replicates:", font=self.label_font).pack(side='left')
+        replicates_var = tk.IntVar(value=Bootstrap.DEFAULT_REPLICATES)
+        ttk.Spinbox(controls, from_=50, to=20000, increment=50, textvariable=replicates_var, width=8).pack(side='left', padx=(5,15))
+        ttk.Label(controls, text="Level:", font=self.label_font).pack(side='left')
+        level_combo = ttk.Combobox(controls, values=["0.90", "0.95", "0.99"], state='readonly', width=6)
+        level_combo.pack(side='left', padx=5)
+        level_combo.set("0.95")
+        status_label = ttk.Label(window, text="", font=self.label_font)
+        status_label.pack(side='top', fill='x', padx=10)
+
+        figure = Figure(figsize=(7, 2.5), dpi=100)
+        figure.patch.set_facecolor('#F0F0F0')
+        canvas = FigureCanvasTkAgg(figure, master=window)
+        canvas.get_tk_widget().pack(side='top', fill='both', expand=True, padx=10)
+
+        table_frame = ttk.Frame(window, style="App.TFrame")
+        table_frame.pack(side='top', fill='both', expand=True, padx=10, pady=5)
+        columns = ["Quantity", "Estimate", "Lower", "Upper"]
+        tree = ttk.Treeview(table_frame, columns=columns, show='headings', height=12)
+        y_scroll = ttk.Scrollbar(table_frame, orient='vertical', command=tree.yview)
+        tree.configure(yscrollcommand=y_scroll.set)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=200 if col == "Quantity" else 130, anchor='center')
+        tree.pack(side='left', fill='both', expand=True)
+        y_scroll.pack(side='right', fill='y')
+
+        factor_names = [self.col_name_mapping.get(f, f) for f in self.factor_cols]
+        term_names = Coefficients.term_groups(self.bits_array).term_names()
+        current = {}
+
+        def rows(result):
+            yield "Extremum value", result['extremum_value']['estimate'], result['extremum_value']['lower'], result['extremum_value']['upper']
+            for i, name in enumerate(factor_names):
+                ci = result['extremum_x']
+                yield f"Extremum: {name}", ci['estimate'][i], ci['lower'][i], ci['upper'][i]
+            for i, name in enumerate(term_names):
+                ci = result['coefficients']
+                yield f"Coefficient: {name}", ci['estimate'][i], ci['lower'][i], ci['upper'][i]
+
+        def run():
+            try:
+                n_replicates = max(10, int(replicates_var.get()))
+            except (tk.TclError, ValueError):
+                n_replicates = Bootstrap.DEFAULT_REPLICATES
+            try:
+                window.config(cursor="watch")
+                window.update_idletasks()
+                result = self.compute_confidence_intervals(method_combo.get(), n_replicates, float(level_combo.get()),
+                                                           workers=os.cpu_count())
+            except Exception as e:
+                log_fit.exception('Confidence intervals failed')
+                messagebox.showerror("Confidence Interval Error", f"Could not compute confidence intervals: {str(e)}")
+                return
+            finally:
+                window.config(cursor="")
+            current['result'] = result
+            self._refresh_performance_panel()
+
+            status = f"{result['method'].capitalize()}: {result['n_replicates']} refits, {result['level']:.0%} intervals"
+            if result['n_failed']:
+                status += f" ({result['n_failed']} extremum searches failed and were left out)"
+            status_label.config(text=status)
+
+            tree.delete(*tree.get_children())
+            for name, estimate, lower, upper in rows(result):
+                tree.insert('', 'end', values=[name, f"{estimate:.4f}", f"{lower:.4f}", f"{upper:.4f}"])
+
+            figure.clf()
+            ax = figure.add_subplot(111, facecolor='#ffffff')
+            values = result['replicates']['extremum_value']
+            ax.hist(values[~np.isnan(values)], bins=40, color=self.term_type_colors['Interaction'], alpha=0.8)
+            for key, style in (('estimate', '-'), ('lower', '--'), ('upper', '--')):
+                ax.axvline(result['extremum_value'][key], color='red', linestyle=style, linewidth=1.2)
+            ax.set_xlabel("Extremum value of the refitted models")
+            ax.set_ylabel("Replicates")
+            figure.tight_layout()
+            canvas.draw_idle()
+
+        def export_csv():
+            if 'result' not in current:
+                return
+            path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")],
+                                                initialfile="confidence_intervals.csv")
+            if not path:
+                return
+            table = pd.DataFrame(list(rows(current['result'])), columns=['quantity', 'estimate', 'lower', 'upper'])
+            try:
+                table.to_csv(path, index=False)
+            except OSError as e:
+                messagebox.showerror("Export Error", f"Could not save confidence intervals: {str(e)}")
+
+        button_frame = ttk.Frame(window, style="App.TFrame")
+        button_frame.pack(side='bottom', fill='x', padx=10, pady=10)
+        ttk.Button(button_frame, text="Run", command=run).pack(side='left')
+        ttk.Button(button_frame, text="Export CSV...", command=export_csv).pack(side='right')
+        run()
+
+    def _result_cache_key(self, X_original, Y, kind, alpha, **options):
+        """Cache key covering the data and every setting that changes a fit or extremum"""
+        return self.result_cache.make_key(
+            X_original, Y,
+            kind=kind,
+            alpha=alpha,
+            norm_select=self.norm_select.get(),
+            weight_combo=self.weight_combo.get(),
+            csr_limits=self.csr_limits,
+            global_search=self.global_search_var.get(),
+            **options)
+
     # Add this helper method
     def _update_show_all_combinations(self):
         """Update the display when the show all combinations option changes"""
@@ -530,13 +1170,8 @@ class CSRApp:
                 n_factors = len(self.factor_cols)
                 equation_str, function_defs_str, factor_defs_str = self.generate_equation_and_definitions(
                     self.coefficients, self.bits_array, n_factors)
-                # Get R² value
-                if hasattr(self, 'X') and self.X is not None:
-                    X_design = self.create_design_matrix(self.X, self.bits_array)
-                    train_r2 = np.corrcoef(self.y, self.y_pred)[0,1]**2 if hasattr(self, 'y_pred') and self.y_pred is not None else 0
-                else:
-                    train_r2 = 0
-                self.update_results_display(equation_str, function_defs_str, factor_defs_str, train_r2)
+                # The R² of the fit (or saved with a loaded model); no pass over the data
+                self.update_results_display(equation_str, function_defs_str, factor_defs_str, self.train_r2 or 0)
 
     def create_coefficient_analysis_tab(self):
             # Main container frame
@@ -570,6 +1205,14 @@ class CSRApp:
             self.download_all_button.grid(row=0, column=3, padx=10, pady=5, ipady=2) # Added to the right
             # --- End Single Download Button ---
 
+            self.contribution_profile_button = ttk.Button(controls_frame, text="Contribution Profile...",
+                                                          command=self.show_contribution_profile)
+            self.contribution_profile_button.grid(row=0, column=4, padx=10, pady=5, ipady=2)
+
+            self.sensitivity_button = ttk.Button(controls_frame, text="Sensitivity (Sobol)...",
+                                                 command=self.show_sensitivity_analysis)
+            self.sensitivity_button.grid(row=0, column=5, padx=10, pady=5, ipady=2)
+
             controls_frame.columnconfigure(1, weight=1) # Ensure combobox expands if needed
 
 
@@ -637,6 +1280,13 @@ class CSRApp:
         self.X_original_scale = None
         self.y = None
         self.y_pred = None
+        self.prediction_variance = None
+        self.fit_gram = None
+        self.train_r2 = None
+        self.train_rmse = None
+        self.loaded_model = None
+        self.surface_slices.clear()
+        self.screening = None
         self.extremum_point = None
         if hasattr(self, 'result_functions'):
             del self.result_functions
@@ -645,15 +1295,21 @@ class CSRApp:
 
     def select_file(self):
         try:
-            file_path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx *.xls")])
+            file_path = filedialog.askopenfilename(filetypes=DataSource.filetypes())
             if not file_path:
                 return
 
             # Clear previous state completely
             self.clear_state()
 
-            # Rest of the method remains the same...
-            self.df = pd.read_excel(file_path, header=0)
+            # Excel, CSV, Parquet/Feather and NumPy inputs all go through the data source layer;
+            # with the dataset store on, only the first load of a file parses it
+            if self.dataset_store_var.get():
+                self.df, store = DatasetStore.open_or_import(file_path)
+                log_io.info('Data file %s opened from dataset store %s', file_path, store.path)
+                self._update_dataset_store_label()
+            else:
+                self.df = DataSource.load_table(file_path)
             if self.df.empty:
                 raise ValueError("The file is empty")
 
@@ -662,18 +1318,18 @@ class CSRApp:
                 raise ValueError("Data must have at least 2 columns (factors + result)")
 
             # Create mapping
-            self.col_name_mapping = {
-                f"factor{i+1}": name 
-                for i, name in enumerate(self.original_col_names[:-1])
-            }
-            self.col_name_mapping["result"] = self.original_col_names[-1]
+            self.col_name_mapping = DataSource.build_column_mapping(self.original_col_names)
 
             # Rename columns
             new_cols = list(self.col_name_mapping.keys())
             self.df.columns = new_cols
 
-            # Process data
-            self.df = self.df.apply(pd.to_numeric, errors='coerce').dropna()
+            # Process data (already numeric, complete data is kept as is, so a store's
+            # memory maps are not copied)
+            if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in self.df.dtypes):
+                self.df = self.df.apply(pd.to_numeric, errors='coerce')
+            if self.df.isna().to_numpy().any():
+                self.df = self.df.dropna()
             if self.df.empty:
                 raise ValueError("No valid numeric data found")
 
@@ -691,47 +1347,186 @@ class CSRApp:
             messagebox.showerror("Error", f"Failed to load file:\n{str(e)}")
             self.clear_results_and_plots()
                   
-    def update_table_view(self):
-        # Clear existing checkboxes
-        for widget in self.factor_selection_frame.winfo_children():
-            widget.destroy()
-        
-        self.factor_checkboxes = {}
-        self.factor_selection = {}
-        
+    def _model_artifact(self):
+        """(arrays, info) describing the fitted model, for ModelArtifact.save"""
+        n_factors = len(self.factor_cols)
+        loaded = self.loaded_model or {}
+        if hasattr(self, 'result_functions'):
+            funcs = list(self.result_functions.values())
+            outcomes = list(self.result_functions)
+            coefficients = np.array([f['coefficients'] for f in funcs])
+            bits_array, normalization = funcs[0]['bits_array'], funcs[0]['normalization']
+            metrics = {key: [f.get(key) for f in funcs] for key in ('r2', 'rmse', 'min_val', 'max_val', 'extremum_val')}
+            polarities = [f.get('polarity', 1) for f in funcs]
+            objective = self.comprehensive_function.objective
+        else:
+            outcomes = list(getattr(self, 'result_cols', ["result"])[:1])
+            coefficients = np.atleast_2d(self.coefficients)
+            bits_array, normalization = self.bits_array, self.normalization
+            metrics = {'r2': [self.train_r2], 'rmse': [self.train_rmse]}
+            polarities = [getattr(self, 'outcome_polarities', {}).get(col, 1) for col in outcomes]
+            objective = self.weight_combo.get()
+
+        arrays = {
+            'coefficients': coefficients,
+            'bits_array': np.asarray(bits_array, dtype=np.int8),
+            'x_min': self.X_original_scale.min(axis=0),
+            'x_max': self.X_original_scale.max(axis=0),
+            'x_mean': self._factor_mean(),
+        }
+        extremum = [{'active_factors': n_factors, 'result': self.extremum_point}] if self.extremum_point else []
+        extremum_arrays, extremum_entries = ModelArtifact.pack_extremum_results(extremum, n_factors, name='extremum')
+        results_arrays, results_entries = ModelArtifact.pack_extremum_results(
+            getattr(self, 'all_extremum_results', None) or [], n_factors)
+        arrays.update(extremum_arrays)
+        arrays.update(results_arrays)
+        variance = None
+        variance_function = None if hasattr(self, 'result_functions') else self._surface_variance()
+        if variance_function is not None:
+            arrays['gram'] = variance_function.gram
+            variance = {'sigma2': variance_function.sigma2, 'dof': variance_function.dof}
+
+        info = {
+            'kind': 'comprehensive' if hasattr(self, 'result_functions') else 'single',
+            'project': self.project_name_entry.get(),
+            'column_names': self.col_name_mapping,
+            'factors': list(self.factor_cols),
+            'outcomes': outcomes,
+            'normalization': normalization.norm_type,
+            'objective': objective,
+            'alpha': None if hasattr(self, 'result_functions') else self.fit_alpha,
+            'polarities': polarities,
+            'limits': self.csr_limits,
+            'limit_names': self.csr_limit_names,
+            'rows': len(self.df) if self.df is not None else loaded.get('rows'),
+            'metrics': metrics,
+            'prediction_variance': variance,
+            'extremum': extremum_entries,
+            'extremum_results': results_entries,
+        }
+        return arrays, info
+
+    def save_model(self):
+        """Save the fitted model to a model file (no data rows, see ModelArtifact)"""
+        if self.coefficients is None and not hasattr(self, 'result_functions'):
+            messagebox.showinfo("Save Model", "Run the fitting process first.")
+            return
+        project = os.path.splitext(self.project_name_entry.get().strip() or "model")[0]
+        path = filedialog.asksaveasfilename(defaultextension=ModelArtifact.ARTIFACT_SUFFIX,
+                                            initialfile=f"{project}{ModelArtifact.ARTIFACT_SUFFIX}",
+                                            filetypes=[("CSR models", f"*{ModelArtifact.ARTIFACT_SUFFIX}"),
+                                                       ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            arrays, info = self._model_artifact()
+            ModelArtifact.save(path, arrays, info)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Save Error", f"Could not save the model:\n{str(e)}")
+
+    def load_model(self):
+        """Show a saved model in every tab; the loaded data (if any) is dropped"""
+        path = filedialog.askopenfilename(filetypes=[("CSR models", f"*{ModelArtifact.ARTIFACT_SUFFIX}"),
+                                                     ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            arrays, info = ModelArtifact.load(path)
+            self.restore_model(arrays, info)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load model:\n{str(e)}")
+            self.clear_state()
+
+    @Profiling.timed()
+    def restore_model(self, arrays, info):
+        """Rebuild the fitted state from a model file's (arrays, info) and refresh the results"""
+        self.clear_state()
+        self.df = None
+        self.col_name_mapping = dict(info['column_names'])
+        self.original_col_names = list(self.col_name_mapping.values())
+        self.factor_cols = list(info['factors'])
+        self.result_cols = list(info['outcomes'])
+        self.norm_select.set(info['normalization'])
+        self.weight_combo.set(info['objective'])
+        self.csr_limits = {name: dict(limit) for name, limit in info['limits'].items()}
+        self.csr_limit_names = dict(info['limit_names'])
+        self._csr_update_limits_display()
+        self.project_name_entry.delete(0, tk.END)
+        self.project_name_entry.insert(0, info.get('project') or "")
+
+        # There are no data rows: the factor ranges stand in for them wherever only the
+        # ranges matter (normalization, search bounds, surfaces, evaluation points)
+        x_min = np.asarray(arrays['x_min'], dtype=float)
+        x_max = np.asarray(arrays['x_max'], dtype=float)
+        self.X_original_scale = np.vstack([x_min, x_max])
+        self.x_min_orig, self.x_max_orig = x_min, x_max
+        self.loaded_model = dict(info, x_mean=np.asarray(arrays['x_mean'], dtype=float))
+        normalization = Normalization(info['normalization'], x_min, x_max, n_factors=len(x_min))
+        bits_array = arrays['bits_array'].astype(int)
+        metrics = info['metrics']
+        self.outcome_polarities = dict(zip(self.result_cols, info['polarities']))
+
+        extremum = ModelArtifact.unpack_extremum_results(arrays, info['extremum'], name='extremum')
+        self.extremum_point = extremum[0]['result'] if extremum else None
+        self.all_extremum_results = ModelArtifact.unpack_extremum_results(arrays, info['extremum_results'])
+
+        self.update_table_view()
+        if info['kind'] == 'single':
+            self.coefficients = arrays['coefficients'][0]
+            self.bits_array = bits_array
+            self.normalization = normalization
+            self.X = normalization.forward(self.X_original_scale)
+            self.fit_alpha = info['alpha']
+            variance = info.get('prediction_variance')
+            if variance and 'gram' in arrays:
+                self.prediction_variance = CSRModel.restore_prediction_variance(
+                    arrays['gram'], self.fit_alpha or 1e-5, variance['sigma2'], variance['dof'])
+            self.train_r2, self.train_rmse = metrics['r2'][0], metrics['rmse'][0]
+            self._show_single_result(self.train_r2, self.train_rmse)
+        else:
+            self.result_functions = {
+                result_col: {
+                    'coefficients': arrays['coefficients'][k],
+                    'bits_array': bits_array,
+                    'normalization': normalization,
+                    'r2': metrics['r2'][k],
+                    'min_val': metrics['min_val'][k],
+                    'max_val': metrics['max_val'][k],
+                    'rmse': metrics['rmse'][k],
+                    'extremum_val': metrics['extremum_val'][k],
+                    'polarity': info['polarities'][k],
+                }
+                for k, result_col in enumerate(self.result_cols)
+            }
+            self.comprehensive_function = CSRModel.make_comprehensive_function(self.result_functions, info['objective'])
+            self._show_comprehensive_results()
+        log_io.info('Model restored: %s outcome(s), %s parameters', len(self.result_cols), len(self.factor_cols))
+
+    def _factor_mean(self):
+        """Mean of every factor over the data (saved with the model when it was loaded from a file)"""
+        if self.loaded_model is not None:
+            return self.loaded_model['x_mean']
+        return np.mean(self.X_original_scale, axis=0)
+
+    def _factor_bounds(self):
+        """(min, max) of every factor in original units"""
+        return list(zip(self.X_original_scale.min(axis=0), self.X_original_scale.max(axis=0)))
+
+    @Profiling.timed()
+    def update_table_view(self, keep_roles=False):
+        """Show the loaded columns in the role editor (default roles unless `keep_roles`)"""
         if self.df is None or self.df.empty:
+            self.role_editor.set_columns([])
+            self._update_csr_factor_limits_ui()
             return
         
         # Get all column names in order (EXCLUDE 'residual')
         all_columns = [col for col in list(self.df.columns) if col != 'residual']
-        
-        # DEBUG: Show what columns we have
-        print(f"DEBUG: Available columns: {all_columns}")
-        
-        # Add combobox for all features
-        cb_options = ["parameter", "outcome(+)", "outcome(-)", "ignore"]
-        
-        # Create selection for each column
-        for i, col in enumerate(all_columns):
-            display_name = self.col_name_mapping.get(col, col)
-            
-            # Create frame for this factor's controls
-            cb_frame = ttk.Frame(self.factor_selection_frame, style="App.TFrame")
-            cb_frame.pack(fill='x', pady=2)
-            
-            # Determine default value - LAST column should be outcome, others parameters
-            if i == len(all_columns) - 1:  # Last column default to outcome
-                var = tk.StringVar(value="outcome(+)")
-            else:
-                var = tk.StringVar(value="parameter")
-            
-            lbl = ttk.Label(cb_frame, text=f"{display_name} ({col})", width=30)  # Show both names for debugging
-            lbl.pack(side='left', padx=(0,10))
-            
-            cb = ttk.Combobox(cb_frame, values=cb_options, textvariable=var, width=12)
-            cb.set(var.get())
-            cb.pack(side='left', padx=(0,10))
-            self.factor_checkboxes[col] = var
+        log_io.debug('Available columns: %s', len(all_columns))
+
+        self.role_editor.set_columns(all_columns, labels=self.col_name_mapping,
+                                     kinds=RoleEditor.column_kinds(self.df, all_columns),
+                                     keep_roles=keep_roles)
 
         # Update factor limits UI
         self._update_csr_factor_limits_ui()
@@ -802,6 +1597,7 @@ class CSRApp:
         except ValueError:
             pass
 
+    @Profiling.timed()
     def run_fitting(self):
         try:
             self.clear_state()
@@ -809,10 +1605,8 @@ class CSRApp:
             if self.df is None:
                 raise ValueError("Please load data first.")
                 
-            # Store current checkbox states before updating
-            current_states = {}
-            if hasattr(self, 'factor_checkboxes'):
-                current_states = {col: var.get() for col, var in self.factor_checkboxes.items()}
+            # Roles as set in the role editor
+            current_states = dict(self.role_editor.roles)
                 
             # Get selected columns
             if current_states:
@@ -826,29 +1620,30 @@ class CSRApp:
             if not self.result_cols:
                 raise ValueError("Please select at least one result factor.")
 
+            # Wide data: only the top-k parameters go into the quadratic model
+            self._screen_parameters()
+
+            Profiling.recorder.start_run(
+                rows=len(self.df),
+                factors=len(getattr(self, 'factor_cols', [])),
+                outcomes=len(self.result_cols),
+                normalization=self.norm_select.get())
+
             # DEBUG: Print what we're detecting
-            print(f"DEBUG: Number of outcome columns: {len(self.result_cols)}")
-            print(f"DEBUG: Outcome columns: {self.result_cols}")
-            print(f"DEBUG: Factor columns: {self.factor_cols}")
+            log_fit.debug('Number of outcome columns: %s', len(self.result_cols))
+            log_fit.debug('Outcome columns: %s', self.result_cols)
+            log_fit.debug('Factor columns: %s', self.factor_cols)
 
             # MODIFIED: Use single result fitting for single outcome, comprehensive for multiple
             if len(self.result_cols) == 1:
-                print("DEBUG: Using SINGLE result fitting")
+                log_fit.debug('Using SINGLE result fitting')
                 self._run_single_result_fitting(self.result_cols[0])
             else:
-                print("DEBUG: Using COMPREHENSIVE fitting")
+                log_fit.debug('Using COMPREHENSIVE fitting')
                 self._run_comprehensive_fitting()
                 
-            # Update table view while preserving checkbox states
-            self.update_table_view()
-            
-            # Restore checkbox states
-            if hasattr(self, 'factor_checkboxes'):
-                for col, var in self.factor_checkboxes.items():
-                    if col in current_states:
-                        var.set(current_states[col])
-            
-            self.update_3d_plot()
+            # The roles stay as they are; the limits list follows the fitted parameters
+            self._update_csr_factor_limits_ui()
 
         except Exception as e:
             messagebox.showerror("Error", f"Fitting failed: {str(e)}")
@@ -856,6 +1651,10 @@ class CSRApp:
             self.extremum_point = None
             self.clear_results_and_plots()
 
+        # Deferred so the report includes run_fitting's own timing
+        self.root.after_idle(self._refresh_performance_panel)
+        self._update_disk_cache_label()
+
     def _run_single_result_fitting(self, result_col):
         """Handle fitting for a single result column (original behavior)"""
         try:
@@ -863,22 +1662,15 @@ class CSRApp:
             self.coefficients = None
             self.bits_array = None
             self.y_pred = None
+            self.outcome_polarities = {result_col: -1 if self.role_editor.roles.get(result_col) == "outcome(-)" else 1}
 
-            # Ensure we're working with the correct columns
-            working_cols = [col for col in self.df.columns 
-                        if (col.startswith('factor') and col in self.factor_cols) or col == result_col]
-            
-            # Create a working dataframe with just the needed columns
-            working_df = self.df[working_cols].copy()
-
-            if result_col != 'result':  
-                working_df = working_df.rename(columns={result_col: 'result'})
-            
-            self.factor_cols = [col for col in working_df.columns if col.startswith('factor')]
-            X_fit = working_df[self.factor_cols].values.copy()
-            self.X_original_scale = X_fit.copy()
-            self.y = working_df['result'].values
-            n_factors = X_fit.shape[1]
+            # Parameters in column order; the data is read in place (one copy for the factor
+            # matrix, the outcome column as is)
+            self.factor_cols = [col for col in self.df.columns
+                                if col.startswith('factor') and col in self.factor_cols and col != result_col]
+            self.X_original_scale = self.df[self.factor_cols].to_numpy(dtype=float)
+            self.y = self.df[result_col].to_numpy()
+            n_factors = self.X_original_scale.shape[1]
 
             # Generate fresh bits array based on current number of factors
             self.bits_array = self.generate_bits_array(n_factors)
@@ -886,64 +1678,48 @@ class CSRApp:
                 messagebox.showerror("Error", "Could not generate terms matrix (bits_array).")
                 return
 
-            # Rest of the method remains the same...
-            self.norm_x_min = None
-            self.norm_x_max = None
-
             norm_type = self.norm_select.get()
-            if norm_type == "[-1, 1]":
-                self.norm_x_min = X_fit.min(axis=0)
-                self.norm_x_max = X_fit.max(axis=0)
-                range_val = self.norm_x_max - self.norm_x_min
-                range_val[range_val == 0] = 1
-                X_fit = 2 * (X_fit - self.norm_x_min) / range_val - 1
-            elif norm_type == "[0, 1]":
-                self.norm_x_min = X_fit.min(axis=0)
-                self.norm_x_max = X_fit.max(axis=0)
-                range_val = self.norm_x_max - self.norm_x_min
-                range_val[range_val == 0] = 1
-                X_fit = (X_fit - self.norm_x_min) / range_val
-            else:  # "No normalization"
-                self.norm_x_min = None
-                self.norm_x_max = None
-                # Keep X_fit as is (original scale)
-
-            self.X = X_fit
-
-            X_design = self.create_design_matrix(self.X, self.bits_array)
-            if X_design.shape[1] == 0:
-                messagebox.showerror("Error", "Design matrix has no terms.")
-                return
+            self.X, self.normalization = CSRModel.normalize_factors(self.X_original_scale, norm_type)
 
             alpha_val = 1e-5
+            self.fit_alpha = alpha_val
+
+            # Identical data + settings return the cached fit and extremum instead of recomputing
+            cache_key = self._result_cache_key(self.X_original_scale, self.y, 'single', alpha_val)
+            cached = self.result_cache.get(cache_key)
+
+            # Large fits are solved from XᵀX and Xᵀy built over row blocks, without the full design matrix
+            gram = None
+            if cached is not None:
+                # Only coefficients and fit statistics are cached; the fitted values are one
+                # blockwise pass over the data
+                self.coefficients = cached['coefficients']
+                self.y_pred = CSRModel.predict_blocked(self.X, self.coefficients, self.bits_array)
+                train_r2 = cached['train_r2']
+            else:
+                fit, _ = CSRModel.fit_csr_auto(self.X, self.bits_array, self.y, alpha=alpha_val,
+                                                      max_iter=None, tol=1e-4, random_state=42)
+                gram = fit.get('gram')
+                self.coefficients = fit['coefficients']
 
-            model = Ridge(alpha=alpha_val, max_iter=None, tol=1e-4, fit_intercept=False, random_state=42)
-            model.fit(X_design, self.y)
-            self.coefficients = model.coef_
+                if not fit['converged']:
+                    messagebox.showwarning("Convergence Warning",
+                                        "Ridge regression may not have fully converged. Results may be suboptimal.\n"
+                                        "Consider adjusting alpha or checking your data.")
 
-            if model.n_iter_ is not None and model.n_iter_ >= model.max_iter:
-                messagebox.showwarning("Convergence Warning",
-                                    "Ridge regression may not have fully converged. Results may be suboptimal.\n"
-                                    "Consider adjusting alpha or checking your data.")
+                self.y_pred = fit['y_pred']
+                train_r2 = fit['r2']
 
-            self.y_pred = model.predict(X_design)
-            residuals = self.y - self.y_pred
-            self.df['residual'] = 0.0  # Initialize/reset residual column
-            self.df.loc[working_df.index, 'residual'] = residuals  # Only update residuals for the rows we used
-            
-            train_r2 = model.score(X_design, self.y)
-            train_rmse = np.sqrt(np.mean((self.y - self.y_pred) ** 2))
+            # The prediction variance is only built when an uncertainty surface is asked for
+            # (_surface_variance); a blocked fit's XᵀX is kept for it
+            self.fit_gram = gram
+
+            # Every row is used in the fit
+            self.df['residual'] = self.y - self.y_pred
+            train_rmse = np.sqrt(np.mean(self.df['residual'].to_numpy() ** 2))
 
             # SET UP OPTIMIZATION PARAMETERS FIRST
-            if norm_type == "[-1, 1]":
-                bounds_opt = [(-1, 1)] * n_factors
-                x0_opt = np.zeros(n_factors)
-            elif norm_type == "[0, 1]":
-                bounds_opt = [(0, 1)] * n_factors
-                x0_opt = np.full(n_factors, 0.5)
-            else:  # "No normalization"
-                bounds_opt = [(self.X_original_scale[:,i].min(), self.X_original_scale[:,i].max()) for i in range(n_factors)]
-                x0_opt = np.mean(self.X_original_scale, axis=0)
+            bounds_opt, x0_opt = self.normalization.search_bounds(self.X_original_scale)
 
             extremum_type_str = self.weight_combo.get().lower().replace(" ", "_")
             
@@ -952,10 +1728,22 @@ class CSRApp:
             all_extremum_results = []
             
             # SIMPLIFIED: Just run one optimization without artificial cardinality constraints
-            print("Running optimization...")
-            extremum_result = self.find_extremum(
-                self.coefficients, self.bits_array, bounds_opt, x0_opt, 
-                extremum_type_str, self.X)
+            if cached is not None:
+                extremum_result = {'x': cached.get('extremum_x'), 'value': cached.get('extremum_value', np.nan)}
+                if 'extremum_x_normalized' in cached:
+                    extremum_result['x_normalized'] = cached['extremum_x_normalized']
+            else:
+                log_fit.debug('Running optimization...')
+                extremum_result = self.find_extremum(
+                    self.coefficients, self.bits_array, bounds_opt, x0_opt, 
+                    extremum_type_str, self.X)
+                self.result_cache.put(cache_key, {
+                    'coefficients': self.coefficients,
+                    'train_r2': train_r2,
+                    'extremum_x': extremum_result.get('x'),
+                    'extremum_value': extremum_result.get('value'),
+                    'extremum_x_normalized': extremum_result.get('x_normalized')
+                })
 
             # Create results for all factor counts based on the single optimal solution
             if extremum_result and 'x' in extremum_result and extremum_result['x'] is not None:
@@ -984,16 +1772,16 @@ class CSRApp:
                             'active_factors': k,
                             'result': extremum_result
                         })
-                        print(f"Successfully added result for k={k} with {active_count} active factors")
+                        log_fit.debug('Successfully added result for k=%s with %s active factors', k, active_count)
                     else:
-                        print(f"Skipping result for k={k}: expected {k} factors but got {active_count}")
+                        log_fit.debug('Skipping result for k=%s: expected %s factors but got %s', k, k, active_count)
                 else:
-                    print(f"No valid result for k={k}")
+                    log_fit.debug('No valid result for k=%s', k)
 
             # Store ALL results, not just the best one
             # If no cardinality-constrained results were found, create them from the regular optimization result
             if not all_extremum_results and self.extremum_point and 'x' in self.extremum_point:
-                print("Creating cardinality results from regular optimization")
+                log_fit.debug('Creating cardinality results from regular optimization')
                 extremum_x = self.extremum_point['x']
                 active_count = sum(1 for val in extremum_x if abs(val) > 1e-6)
                 
@@ -1009,15 +1797,15 @@ class CSRApp:
                     })
                 
                 self.all_extremum_results = all_extremum_results
-                print(f"Created {len(self.all_extremum_results)} results from regular optimization")
+                log_fit.debug('Created %s results from regular optimization', len(self.all_extremum_results))
             else:
                 # Store ALL results, not just the best one
                 self.all_extremum_results = all_extremum_results
-                print(f"Total results stored: {len(self.all_extremum_results)}")
+                log_fit.debug('Total results stored: %s', len(self.all_extremum_results))
 
             # Store ALL results, not just the best one
             self.all_extremum_results = all_extremum_results
-            print(f"Total cardinality-constrained results stored: {len(self.all_extremum_results)}")
+            log_fit.debug('Total cardinality-constrained results stored: %s', len(self.all_extremum_results))
 
             # CREATE RESULTS BASED ON USER PREFERENCE
             if self.show_all_combinations_var.get():
@@ -1025,15 +1813,15 @@ class CSRApp:
                 if self.all_extremum_results:
                     # Create a set of factor counts we already have
                     existing_counts = {r['active_factors'] for r in self.all_extremum_results}
-                    print(f"Existing factor counts: {sorted(existing_counts)}")
+                    log_fit.debug('Existing factor counts: %s', sorted(existing_counts))
                     
                     # Create results for ALL factor counts from n_factors down to 1
                     all_factor_counts = list(range(n_factors, 0, -1))
-                    print(f"Target factor counts: {all_factor_counts}")
+                    log_fit.debug('Target factor counts: %s', all_factor_counts)
                     
                     for k in all_factor_counts:
                         if k not in existing_counts:
-                            print(f"Creating result for missing factor count: {k}")
+                            log_fit.debug('Creating result for missing factor count: %s', k)
                             
                             # Find the best available result to use as base
                             # Prefer results with higher factor counts
@@ -1062,12 +1850,7 @@ class CSRApp:
                                 new_x[idx] = original_x[idx]
                             
                             # Recalculate the objective value with the new solution
-                            if self.norm_select.get() == "[-1, 1]":
-                                new_x_norm = 2 * (new_x - self.norm_x_min) / (self.norm_x_max - self.norm_x_min) - 1
-                            elif self.norm_select.get() == "[0, 1]":
-                                new_x_norm = (new_x - self.norm_x_min) / (self.norm_x_max - self.norm_x_min)
-                            else:
-                                new_x_norm = new_x
+                            new_x_norm = self.normalization.forward(new_x)
                             
                             design_row = self.create_design_matrix(new_x_norm.reshape(1, -1), self.bits_array)
                             new_value = np.dot(design_row[0], self.coefficients)
@@ -1083,11 +1866,11 @@ class CSRApp:
                                 'active_factors': k,
                                 'result': new_result
                             })
-                            print(f"Created result for k={k} with value: {new_value:.4f}")
+                            log_fit.debug('Created result for k=%s with value: %.4f', k, new_value)
                     
                     # Re-sort all results by factor count (descending)
                     self.all_extremum_results.sort(key=lambda x: x['active_factors'], reverse=True)
-                    print(f"Final results count: {len(self.all_extremum_results)}")
+                    log_fit.debug('Final results count: %s', len(self.all_extremum_results))
             else:
                 # Only show the case with all factors
                 if self.all_extremum_results:
@@ -1095,16 +1878,16 @@ class CSRApp:
                     full_result = next((r for r in self.all_extremum_results if r['active_factors'] == n_factors), None)
                     if full_result:
                         self.all_extremum_results = [full_result]
-                        print("Showing only full factor combination")
+                        log_fit.debug('Showing only full factor combination')
                     else:
                         # If no full result, use the one with highest factor count
                         highest_result = max(self.all_extremum_results, key=lambda x: x['active_factors'])
                         self.all_extremum_results = [highest_result]
-                        print(f"Showing highest available factor combination: {highest_result['active_factors']} factors")
+                        log_fit.debug('Showing highest available factor combination: %s factors', highest_result['active_factors'])
 
             # FALLBACK: If no cardinality results at all, create from regular optimization
             if not self.all_extremum_results and self.extremum_point and 'x' in self.extremum_point:
-                print("No cardinality-constrained results found, creating from regular optimization")
+                log_fit.debug('No cardinality-constrained results found, creating from regular optimization')
                 extremum_x = self.extremum_point['x']
                 active_count = sum(1 for val in extremum_x if abs(val) > 1e-6)
                 
@@ -1121,7 +1904,7 @@ class CSRApp:
                         }
                     })
                 
-                print(f"Created {len(self.all_extremum_results)} results from regular optimization")
+                log_fit.debug('Created %s results from regular optimization', len(self.all_extremum_results))
 
             # Use the result with all factors active as the main result for plotting
             if self.all_extremum_results:
@@ -1129,99 +1912,104 @@ class CSRApp:
                 full_result = next((r for r in self.all_extremum_results if r['active_factors'] == n_factors), None)
                 if full_result:
                     self.extremum_point = full_result['result']
-                    print(f"Using full result with {n_factors} factors for plotting")
+                    log_fit.debug('Using full result with %s factors for plotting', n_factors)
                 else:
                     # Fallback to result with highest factor count
                     self.extremum_point = self.all_extremum_results[0]['result']
-                    print(f"Using highest available result with {self.all_extremum_results[0]['active_factors']} factors for plotting")
+                    log_fit.debug('Using highest available result with %s factors for plotting', self.all_extremum_results[0]['active_factors'])
             else:
                 # Final fallback to regular optimization
-                print("No results available, using regular optimization")
+                log_fit.debug('No results available, using regular optimization')
                 self.extremum_point = self.find_extremum(self.coefficients, self.bits_array,
                                                 bounds_opt, x0_opt, extremum_type_str, self.X)
         
-            # Generate equation and definitions
-            equation_str, function_defs_str, factor_defs_str = self.generate_equation_and_definitions(
-                self.coefficients, self.bits_array, n_factors)
-                        
-            # Clear R² frame for single optimization
-            if hasattr(self, 'r2_frame'):
-                for widget in self.r2_frame.winfo_children():
-                    widget.destroy()
+            self.train_r2, self.train_rmse = train_r2, train_rmse
+            self._show_single_result(train_r2, train_rmse)
+
+        except Exception as e:
+            raise Exception(f"Single result fitting failed: {str(e)}")
+
+    def _show_single_result(self, train_r2, train_rmse):
+        """Equation, fit metrics, charts and surface of the current single-outcome model"""
+        n_factors = len(self.factor_cols)
+
+        # Generate equation and definitions
+        equation_str, function_defs_str, factor_defs_str = self.generate_equation_and_definitions(
+            self.coefficients, self.bits_array, n_factors)
                     
-                # Create a frame for R² and RMSE display
-                metrics_frame = ttk.Frame(self.r2_frame)
-                metrics_frame.pack(fill='x', pady=(0,5))
-                
-                # R² display
-                ttk.Label(metrics_frame, text="R²:", font=self.label_font).grid(row=0, column=0, sticky='w')
-                r2_text = tk.Text(metrics_frame, height=1, width=15, wrap=tk.NONE, state='disabled',
-                                font=self.text_widget_font, relief=tk.SOLID, borderwidth=1, padx=5)
-                r2_text.grid(row=0, column=1, padx=(5,15), sticky='w')
-                r2_text.config(state='normal')
-                r2_text.insert(tk.END, f"{train_r2:.4f}")
-                r2_text.config(state='disabled')
+        # Clear R² frame for single optimization
+        if hasattr(self, 'r2_frame'):
+            for widget in self.r2_frame.winfo_children():
+                widget.destroy()
                 
-                # RMSE display
-                ttk.Label(metrics_frame, text="RMSE:", font=self.label_font).grid(row=0, column=2, sticky='w', padx=(10,0))
-                rmse_text = tk.Text(metrics_frame, height=1, width=15, wrap=tk.NONE, state='disabled',
+            # Create a frame for R² and RMSE display
+            metrics_frame = ttk.Frame(self.r2_frame)
+            metrics_frame.pack(fill='x', pady=(0,5))
+            
+            # R² display
+            ttk.Label(metrics_frame, text="R²:", font=self.label_font).grid(row=0, column=0, sticky='w')
+            r2_text = tk.Text(metrics_frame, height=1, width=15, wrap=tk.NONE, state='disabled',
+                            font=self.text_widget_font, relief=tk.SOLID, borderwidth=1, padx=5)
+            r2_text.grid(row=0, column=1, padx=(5,15), sticky='w')
+            r2_text.config(state='normal')
+            r2_text.insert(tk.END, f"{train_r2:.4f}")
+            r2_text.config(state='disabled')
+            
+            # RMSE display
+            ttk.Label(metrics_frame, text="RMSE:", font=self.label_font).grid(row=0, column=2, sticky='w', padx=(10,0))
+            rmse_text = tk.Text(metrics_frame, height=1, width=15, wrap=tk.NONE, state='disabled',
+                            font=self.text_widget_font, relief=tk.SOLID, borderwidth=1, padx=5)
+            rmse_text.grid(row=0, column=3, padx=(5,0), sticky='w')
+            rmse_text.config(state='normal')
+            rmse_text.insert(tk.END, f"{train_rmse:.4f}")
+            rmse_text.config(state='disabled')
+            
+            # Add interpretation for R²
+            interpretation = ""
+            if train_r2 >= 0.9:
+                interpretation = "Excellent fit"
+            elif train_r2 >= 0.7:
+                interpretation = "Good fit"
+            elif train_r2 >= 0.5:
+                interpretation = "Moderate fit"
+            else:
+                interpretation = "Poor fit"
+            
+            interp_text = tk.Text(metrics_frame, height=1, width=20, wrap=tk.NONE, state='disabled',
                                 font=self.text_widget_font, relief=tk.SOLID, borderwidth=1, padx=5)
-                rmse_text.grid(row=0, column=3, padx=(5,0), sticky='w')
-                rmse_text.config(state='normal')
-                rmse_text.insert(tk.END, f"{train_rmse:.4f}")
-                rmse_text.config(state='disabled')
-                
-                # Add interpretation for R²
-                interpretation = ""
-                if train_r2 >= 0.9:
-                    interpretation = "Excellent fit"
-                elif train_r2 >= 0.7:
-                    interpretation = "Good fit"
-                elif train_r2 >= 0.5:
-                    interpretation = "Moderate fit"
-                else:
-                    interpretation = "Poor fit"
-                
-                interp_text = tk.Text(metrics_frame, height=1, width=20, wrap=tk.NONE, state='disabled',
-                                    font=self.text_widget_font, relief=tk.SOLID, borderwidth=1, padx=5)
-                interp_text.grid(row=0, column=4, padx=(15,0), sticky='w')
-                interp_text.config(state='normal')
-                interp_text.insert(tk.END, interpretation)
-                interp_text.config(state='disabled')
-
-            self.update_results_display(equation_str, function_defs_str, factor_defs_str, train_r2)
-            display_factor_names = [self.col_name_mapping.get(f, f) for f in self.factor_cols]
-            self.x_factor_combo['values'] = display_factor_names
-            self.y_factor_combo['values'] = display_factor_names
-            if display_factor_names:
-                self.x_factor_combo.current(0)
-                self.y_factor_combo.current(min(1, len(display_factor_names)-1))
-
-            self.plot_results(n_factors, 0, min(1, n_factors -1) if n_factors > 1 else 0)
-            self.update_coefficient_pie_charts()
+            interp_text.grid(row=0, column=4, padx=(15,0), sticky='w')
+            interp_text.config(state='normal')
+            interp_text.insert(tk.END, interpretation)
+            interp_text.config(state='disabled')
 
-            self.update_3d_plot()
+        self.update_results_display(equation_str, function_defs_str, factor_defs_str, train_r2)
+        display_factor_names = [self.col_name_mapping.get(f, f) for f in self.factor_cols]
+        self.x_factor_combo['values'] = display_factor_names
+        self.y_factor_combo['values'] = display_factor_names
+        if display_factor_names:
+            self.x_factor_combo.current(0)
+            self.y_factor_combo.current(min(1, len(display_factor_names)-1))
 
-        except Exception as e:
-            raise Exception(f"Single result fitting failed: {str(e)}")
+        self.plot_results(n_factors)
+        self.update_coefficient_pie_charts()
+
+        self.update_3d_plot()
 
     def _debug_comprehensive_equations(self):
         """Debug method to print comprehensive CSR equation information"""
         if not hasattr(self, 'result_functions'):
-            print("DEBUG: No result_functions available")
+            log_fit.debug('No result_functions available')
             return
         
-        print("\n" + "="*60)
-        print("COMPREHENSIVE CSR EQUATION DEBUG INFO")
-        print("="*60)
+        log_fit.debug('COMPREHENSIVE CSR EQUATION DEBUG INFO')
         
         for result_col, func_data in self.result_functions.items():
-            print(f"\n--- Outcome: {result_col} ---")
-            print(f"Original data range: {func_data['min_val']:.2f} to {func_data['max_val']:.2f}")
-            print(f"Normalization type: {func_data['norm_type']}")
-            print(f"Polarity: {func_data.get('polarity', 1)}")
-            print(f"R²: {func_data['model'].score(func_data['X_design'], func_data['y']):.4f}")
-            print(f"RMSE: {func_data['rmse']:.4f}")
+            log_fit.debug('--- Outcome: %s ---', result_col)
+            log_fit.debug('Original data range: %.2f to %.2f', func_data['min_val'], func_data['max_val'])
+            log_fit.debug('Normalization type: %s', func_data['normalization'].norm_type)
+            log_fit.debug('Polarity: %s', func_data.get('polarity', 1))
+            log_fit.debug('R²: %.4f', func_data['r2'])
+            log_fit.debug('RMSE: %.4f', func_data['rmse'])
             
             # Print the actual CSR equation
             n_factors = len(self.factor_cols)
@@ -1230,17 +2018,17 @@ class CSRApp:
                 func_data['bits_array'], 
                 n_factors
             )
-            print(f"CSR Equation: {equation_str}")
+            log_fit.debug('CSR Equation: %s', equation_str)
             
             # Print coefficient magnitudes
-            print("Coefficient magnitudes:")
+            log_fit.debug('Coefficient magnitudes:')
             for i, (coef, bits) in enumerate(zip(func_data['coefficients'], func_data['bits_array'])):
                 if abs(coef) > 1e-6:  # Only show significant coefficients
                     term_type = self._classify_term(bits)
                     term_desc = self._format_term_debug(bits, n_factors)
-                    print(f"  {term_desc}: {coef:.6f} ({term_type})")
+                    log_fit.debug('  %s: %.6f (%s)', term_desc, coef, term_type)
         
-        print("\n--- Comprehensive Function Test Points ---")
+        log_fit.debug('--- Comprehensive Function Test Points ---')
         # Test the comprehensive function at some key points
         test_points = [
             ("Data Minimum", self.X_original_scale.min(axis=0)),
@@ -1252,20 +2040,15 @@ class CSRApp:
         for name, point in test_points:
             if point is not None:
                 comp_value = self.comprehensive_function(point)
-                print(f"{name}: {point} -> {comp_value:.6f}")
+                log_fit.debug('%s: %s -> %.6f', name, point, comp_value)
                 
                 # Also show individual outcomes at this point
                 for result_col, func_data in self.result_functions.items():
-                    if func_data['norm_type'] == "[-1, 1]":
-                        x_norm = 2 * (point - func_data['x_min']) / (func_data['x_max'] - func_data['x_min']) - 1
-                    elif func_data['norm_type'] == "[0, 1]":
-                        x_norm = (point - func_data['x_min']) / (func_data['x_max'] - func_data['x_min'])
-                    else:
-                        x_norm = point
+                    x_norm = CSRModel.to_fitting_scale(point, func_data)
                         
                     design_row = self.create_design_matrix(x_norm.reshape(1, -1), func_data['bits_array'])
                     raw_val = np.dot(design_row[0], func_data['coefficients'])
-                    print(f"  {result_col}: {raw_val:.2f} (normalized: {(raw_val - func_data['min_val']) / (func_data['max_val'] - func_data['min_val']):.3f})")
+                    log_fit.debug('  %s: %.2f (normalized: %.3f)', result_col, raw_val, (raw_val - func_data['min_val']) / (func_data['max_val'] - func_data['min_val']))
 
     def _format_term_debug(self, bits, n_factors):
         """Format term for debugging purposes"""
@@ -1290,108 +2073,70 @@ class CSRApp:
     def _run_comprehensive_fitting(self):
         """Handle fitting for multiple result columns (comprehensive optimization)"""
         try:
-            print(f"DEBUG: Data ranges for each outcome:")
+            log_fit.debug('Data ranges for each outcome:')
             for result_col in self.result_cols:
                 data_range = self.df[result_col].max() - self.df[result_col].min()
-                print(f"DEBUG: {result_col}: min={self.df[result_col].min():.2f}, max={self.df[result_col].max():.2f}, range={data_range:.2f}")
-            print(f"DEBUG: Running comprehensive fitting with {len(self.result_cols)} outcomes")
-            print(f"DEBUG: Outcome columns: {self.result_cols}")
+                log_fit.debug('%s: min=%.2f, max=%.2f, range=%.2f', result_col, self.df[result_col].min(), self.df[result_col].max(), data_range)
+            log_fit.debug('Running comprehensive fitting with %s outcomes', len(self.result_cols))
+            log_fit.debug('Outcome columns: %s', self.result_cols)
             
             # FIX: Add validation for factor columns
             if not hasattr(self, 'factor_cols') or not self.factor_cols:
                 raise ValueError("No factor columns available for comprehensive fitting")
                 
             self.X_original_scale = self.df[self.factor_cols].values
-            
-            # First fit individual CSR functions for each result
-            self.result_functions = {}
-            result_min_max = {}
-            
-            # Initialize residuals column
-            self.df['residual'] = 0.0
-            
+            Y = self.df[self.result_cols].to_numpy(dtype=float)
+
             self.result_functions = {}
-            result_min_max = {}
             self.outcome_polarities = {}  # Store polarity for each outcome
+            result_min_max = {result_col: {'min': Y[:, k].min(), 'max': Y[:, k].max()}
+                              for k, result_col in enumerate(self.result_cols)}
+
+            # Identical data + settings return the cached fits and extremum instead of recomputing
+            alpha_val = 0.01
+            polarities = [-1 if self.role_editor.roles.get(col) == "outcome(-)" else 1 for col in self.result_cols]
+            cache_key = self._result_cache_key(self.X_original_scale, Y, 'comprehensive', alpha_val,
+                                               polarities=polarities)
+            cached = self.result_cache.get(cache_key)
+
+            # Every outcome has the same factors: one normalization, one set of terms and one
+            # design matrix (blockwise for large fits) serve them all, and only coefficients
+            # and fit statistics are kept per outcome
+            X_fit, normalization = CSRModel.normalize_factors(self.X_original_scale, self.norm_select.get())
+            bits_array = self.generate_bits_array(X_fit.shape[1])
+            if cached is not None:
+                fit = CSRModel.outcome_residuals(X_fit, bits_array, Y, cached['coefficients'])
+                fit['coefficients'] = cached['coefficients']
+            else:
+                fit = CSRModel.fit_outcomes(X_fit, bits_array, Y, alpha=alpha_val)
 
-            for result_col in self.result_cols:
-                # Determine polarity from checkbox selection
-                polarity = 1  # Default to positive
-                if self.factor_checkboxes[result_col].get() == "outcome(-)":
-                    polarity = -1
-                
-                # Create temporary df with this result column
-                temp_df = self.df[self.factor_cols + [result_col]].copy()
-                temp_df.columns = [f"factor{i+1}" for i in range(len(self.factor_cols))] + ["result"]
-                
-                # Store min/max for reference
-                result_min_max[result_col] = {
-                    'min': temp_df['result'].min(),
-                    'max': temp_df['result'].max()
-                }
-                
-                # Fit CSR for this result
-                X_fit = temp_df[[f for f in temp_df.columns if f.startswith('factor')]].values
-                y_fit = temp_df['result'].values
-                        
-                # Normalize if selected
-                norm_type = self.norm_select.get()
-                x_min = X_fit.min(axis=0)
-                x_max = X_fit.max(axis=0)
-                
-                if norm_type == "[-1, 1]":
-                    range_val = x_max - x_min
-                    range_val[range_val == 0] = 1
-                    X_fit = 2 * (X_fit - x_min) / range_val - 1
-                elif norm_type == "[0, 1]":
-                    range_val = x_max - x_min
-                    range_val[range_val == 0] = 1
-                    X_fit = (X_fit - x_min) / range_val
-                
-                # Generate bits array and design matrix
-                n_factors = X_fit.shape[1]
-                bits_array = self.generate_bits_array(n_factors)
-                X_design = self.create_design_matrix(X_fit, bits_array)
-                
-                # Fit model
-                alpha_val = 0.01
-                model = Ridge(alpha=alpha_val, fit_intercept=False)
-                model.fit(X_design, y_fit)
-
-                # Calculate predictions and residuals
-                y_pred = model.predict(X_design)
-                residuals = y_fit - y_pred
-
-                # Calculate RMSE
-                rmse = np.sqrt(np.mean(residuals ** 2))
-
-                # Store the function with polarity
+            for outcome_idx, result_col in enumerate(self.result_cols):
+                polarity = polarities[outcome_idx]
                 self.result_functions[result_col] = {
-                    'coefficients': model.coef_,
+                    'coefficients': fit['coefficients'][outcome_idx],
                     'bits_array': bits_array,
-                    'x_min': x_min if norm_type != "No normalization" else None,
-                    'x_max': x_max if norm_type != "No normalization" else None,
-                    'norm_type': norm_type,
-                    'model': model,
-                    'X_design': X_design,
-                    'y': y_fit,
-                    'y_pred': y_pred,
-                    'residuals': residuals,
+                    'normalization': normalization,
+                    'r2': fit['r2'][outcome_idx],
                     'min_val': result_min_max[result_col]['min'],
                     'max_val': result_min_max[result_col]['max'],
-                    'rmse': rmse,
+                    'rmse': fit['rmse'][outcome_idx],
                     'polarity': polarity
                 }
                 
                 # Store polarity separately for display
                 self.outcome_polarities[result_col] = polarity
-                
-                # Add residuals to main dataframe (average if multiple results)
-                self.df['residual'] += residuals / len(self.result_cols)
+
+            # Residuals averaged over the outcomes
+            self.df['residual'] = fit['residual_mean']
+            del Y, fit
             
             # CALCULATE INDIVIDUAL EXTREMUM VALUES
-            print("DEBUG: Calculating individual extremum values...")
-            for result_col, func_data in self.result_functions.items():
+            log_fit.debug('Calculating individual extremum values...')
+            for outcome_idx, (result_col, func_data) in enumerate(self.result_functions.items()):
+                if cached is not None:
+                    func_data['extremum_val'] = cached['extremum_vals'][outcome_idx]
+                    continue
+
                 # Set up optimization parameters for this outcome
                 bounds_individual = [(self.df[col].min(), self.df[col].max()) for col in self.factor_cols]
                 x0_individual = np.array([(min_val + max_val)/2 for min_val, max_val in bounds_individual])
@@ -1402,14 +2147,13 @@ class CSRApp:
                     func_data['bits_array'],
                     bounds_individual,
                     x0_individual,
-                    self.weight_combo.get().lower().replace(" ", "_"),
-                    func_data['X_design']
+                    self.weight_combo.get().lower().replace(" ", "_")
                 )
                 
                 # Store the extremum value with better fallback
                 if individual_extremum and 'value' in individual_extremum and not np.isnan(individual_extremum['value']):
                     func_data['extremum_val'] = individual_extremum['value']
-                    print(f"DEBUG: {result_col} individual extremum: {individual_extremum['value']:.4f}")
+                    log_fit.debug('%s individual extremum: %.4f', result_col, individual_extremum['value'])
                 else:
                     # Better fallback: use data range
                     data_range = func_data['max_val'] - func_data['min_val']
@@ -1424,63 +2168,11 @@ class CSRApp:
                             func_data['extremum_val'] = max_abs
                     else:
                         func_data['extremum_val'] = 1.0  # Default to 1 to avoid division by zero
-                    print(f"DEBUG: {result_col} using fallback extremum: {func_data['extremum_val']:.4f}")
+                    log_fit.debug('%s using fallback extremum: %.4f', result_col, func_data['extremum_val'])
             
             # Create comprehensive function - IMPROVED NORMALIZATION
-            def comprehensive_func(x):
-                total_score = 0.0
-                weight_sum = 0.0
-                
-                for result_col, func_data in self.result_functions.items():
-                    # Evaluate individual CSR function in its normalized space
-                    if func_data['norm_type'] == "[-1, 1]":
-                        x_norm = 2 * (x - func_data['x_min']) / (func_data['x_max'] - func_data['x_min']) - 1
-                    elif func_data['norm_type'] == "[0, 1]":
-                        x_norm = (x - func_data['x_min']) / (func_data['x_max'] - func_data['x_min'])
-                    else:
-                        x_norm = x
-                        
-                    design_row = self.create_design_matrix(x_norm.reshape(1, -1), func_data['bits_array'])
-                    raw_val = np.dot(design_row[0], func_data['coefficients'])
-                    
-                    # REMOVE aggressive clipping - let the polynomial shape show
-                    # Only clip if it's extremely unreasonable (100x data range)
-                    data_min, data_max = func_data['min_val'], func_data['max_val']
-                    data_range = data_max - data_min
-                    reasonable_min = data_min - 2 * data_range  # Allow some extrapolation
-                    reasonable_max = data_max + 2 * data_range
-                    
-                    bounded_val = np.clip(raw_val, reasonable_min, reasonable_max)
-                    
-                    # Normalize using data range but don't force to [0,1]
-                    if data_range > 1e-9:
-                        # Use sigmoid-like normalization to handle extrapolation gracefully
-                        normalized_val = (bounded_val - data_min) / data_range
-                    else:
-                        normalized_val = 0.5
-                        
-                    # Apply polarity and objective
-                    polarity = func_data.get('polarity', 1)
-                    
-                    if self.weight_combo.get() == "Maximum":
-                        contribution = polarity * normalized_val
-                    elif self.weight_combo.get() == "Minimum":
-                        contribution = polarity * (1 - normalized_val)
-                    elif self.weight_combo.get() == "Maximum absolute value":
-                        contribution = polarity * abs(normalized_val)
-                    else:  # Minimum absolute value
-                        contribution = polarity * (1 - abs(normalized_val))
-                    
-                    # Weight by R² value to prioritize better-fitting models
-                    r2 = func_data['model'].score(func_data['X_design'], func_data['y'])
-                    weight = max(0.1, r2)  # Ensure minimum weight
-                    
-                    total_score += weight * contribution
-                    weight_sum += weight
-                
-                return total_score / weight_sum if weight_sum > 0 else 0.0
-                    
-            self.comprehensive_function = comprehensive_func
+            # The objective is taken at fit time, matching the cache key and the extremum found below
+            self.comprehensive_function = CSRModel.make_comprehensive_function(self.result_functions, self.weight_combo.get())
             
             # FIXED: Set bounds and run optimization
             bounds_opt = [(self.df[col].min(), self.df[col].max()) for col in self.factor_cols]
@@ -1489,13 +2181,23 @@ class CSRApp:
             extremum_type_str = 'maximum'  # Always maximize the comprehensive score
             
             # Find extremum - FIXED: Store result properly
-            print("DEBUG: Finding comprehensive extremum...")
-            extremum_result = self.find_extremum_comprehensive(bounds_opt, x0_opt, extremum_type_str)
+            if cached is not None:
+                extremum_result = {'x': cached.get('extremum_x'), 'value': cached.get('extremum_value', np.nan)}
+            else:
+                log_fit.debug('Finding comprehensive extremum...')
+                extremum_result = self.find_extremum_comprehensive(bounds_opt, x0_opt, extremum_type_str)
+                funcs = list(self.result_functions.values())
+                self.result_cache.put(cache_key, {
+                    'coefficients': np.array([f['coefficients'] for f in funcs]),
+                    'extremum_vals': np.array([f['extremum_val'] for f in funcs]),
+                    'extremum_x': extremum_result.get('x'),
+                    'extremum_value': extremum_result.get('value')
+                })
             
             if extremum_result and 'x' in extremum_result and extremum_result['x'] is not None:
                 self.extremum_point = extremum_result
-                print(f"DEBUG: Comprehensive extremum found at: {self.extremum_point['x']}")
-                print(f"DEBUG: Comprehensive extremum value: {self.extremum_point['value']}")
+                log_fit.debug('Comprehensive extremum found at: %s', self.extremum_point['x'])
+                log_fit.debug('Comprehensive extremum value: %s', self.extremum_point['value'])
                 
                 # FIXED: Create all_extremum_results for consistent display
                 n_factors = len(self.factor_cols)
@@ -1506,48 +2208,47 @@ class CSRApp:
                 
                 # Verify the extremum
                 test_value = self.comprehensive_function(self.extremum_point['x'])
-                print(f"DEBUG: Verified extremum value: {test_value:.4f}")
+                log_fit.debug('Verified extremum value: %.4f', test_value)
             else:
-                print("DEBUG: No valid extremum found for comprehensive optimization")
+                log_fit.debug('No valid extremum found for comprehensive optimization')
                 self.extremum_point = None
                 self.all_extremum_results = []
 
-            # Update displays - FIXED: Call the proper display methods
-            self.update_comprehensive_results_display(result_min_max)
-            
-            # Generate and display equations
-            equation_str, function_defs_str, factor_defs_str = self._generate_comprehensive_equation_and_definitions()
-            self.update_comprehensive_equation_display(equation_str, function_defs_str, factor_defs_str)
-            
-            # Set up factor combos for plotting
-            display_factor_names = [self.col_name_mapping.get(f, f) for f in self.factor_cols]
-            self.x_factor_combo['values'] = display_factor_names
-            self.y_factor_combo['values'] = display_factor_names
-            if display_factor_names:
-                self.x_factor_combo.current(0)
-                self.y_factor_combo.current(min(1, len(display_factor_names)-1))
-            
-            # FIX: CALL PLOT RESULTS FOR COMPREHENSIVE OPTIMIZATION
-            print("DEBUG: Calling plot_results for comprehensive optimization")
-            self.plot_results(len(self.factor_cols), 0, min(1, len(self.factor_cols)-1))
+            self._show_comprehensive_results()
             
-            self.update_3d_plot()
-            
-            print("\nDEBUG: Individual CSR functions fitted, running comprehensive analysis...")
-            self._debug_comprehensive_equations()
+            log_fit.debug('Individual CSR functions fitted, running comprehensive analysis...')
+            if log_fit.isEnabledFor(logging.DEBUG):
+                self._debug_comprehensive_equations()
 
-            # Debug: Check if predictions are stored correctly
-            print(f"DEBUG: Comprehensive fitting completed with {len(self.result_functions)} outcomes")
-            for result_col, func_data in self.result_functions.items():
-                has_y_pred = 'y_pred' in func_data and func_data['y_pred'] is not None
-                print(f"DEBUG: {result_col} - has predictions: {has_y_pred}, shape: {func_data['y_pred'].shape if has_y_pred else 'N/A'}")
+            log_fit.debug('Comprehensive fitting completed with %s outcomes', len(self.result_functions))
 
         except Exception as e:
-            import traceback
-            print(f"DEBUG: Comprehensive fitting error: {str(e)}")
-            print(f"DEBUG: Traceback: {traceback.format_exc()}")
+            log_fit.exception('Comprehensive fitting error: %s', e)
             raise Exception(f"Comprehensive fitting failed: {str(e)}")
 
+    def _show_comprehensive_results(self):
+        """Results, equations, charts and surface of the current comprehensive model"""
+        result_min_max = {result_col: {'min': func_data['min_val'], 'max': func_data['max_val']}
+                          for result_col, func_data in self.result_functions.items()}
+        self.update_comprehensive_results_display(result_min_max)
+        
+        # Generate and display equations
+        equation_str, function_defs_str, factor_defs_str = self._generate_comprehensive_equation_and_definitions()
+        self.update_comprehensive_equation_display(equation_str, function_defs_str, factor_defs_str)
+        
+        # Set up factor combos for plotting
+        display_factor_names = [self.col_name_mapping.get(f, f) for f in self.factor_cols]
+        self.x_factor_combo['values'] = display_factor_names
+        self.y_factor_combo['values'] = display_factor_names
+        if display_factor_names:
+            self.x_factor_combo.current(0)
+            self.y_factor_combo.current(min(1, len(display_factor_names)-1))
+        
+        log_fit.debug('Calling plot_results for comprehensive optimization')
+        self.plot_results(len(self.factor_cols))
+        
+        self.update_3d_plot()
+
     def _generate_comprehensive_equation_and_definitions(self):
         """Generate equation display for comprehensive optimization"""
         if not hasattr(self, 'result_functions'):
@@ -1594,7 +2295,7 @@ class CSRApp:
                 self.equation_text.insert(tk.END, equation_str)
                 self.equation_text.config(state='disabled')
             except tk.TclError as e:
-                print(f"Error updating equation text: {e}")
+                log_ui.warning('Error updating equation text: %s', e)
 
         # Update Factor Definitions Text
         if hasattr(self, 'factor_definitions_text'):
@@ -1604,15 +2305,17 @@ class CSRApp:
                 self.factor_definitions_text.insert(tk.END, factor_defs_str)
                 self.factor_definitions_text.config(state='disabled')
             except tk.TclError as e:
-                print(f"Error updating parameter definitions: {e}")
+                log_ui.warning('Error updating parameter definitions: %s', e)
             
+    @Profiling.timed()
     def _find_individual_extremum(self, coefficients, bits_array, bounds, x0, extremum_type, X_context=None):
         """Find extremum for an individual outcome function with better error handling"""
         if coefficients is None or bits_array is None:
-            print("DEBUG: Individual extremum - coefficients or bits_array is None")
+            log_opt.debug('Individual extremum - coefficients or bits_array is None')
             return None
         
         def individual_func(x_point):
+            Profiling.count_eval("_find_individual_extremum")
             try:
                 x_point_reshaped = np.array(x_point).reshape(1, -1)
                 design_row = self.create_design_matrix(x_point_reshaped, bits_array)
@@ -1620,7 +2323,7 @@ class CSRApp:
                     return 0
                 return np.dot(design_row[0], coefficients)
             except Exception as e:
-                print(f"DEBUG: Error in individual_func: {e}")
+                log_opt.warning('Error in individual_func: %s', e)
                 return 0
         
         # Set up objective function
@@ -1640,13 +2343,13 @@ class CSRApp:
             
             if res.success:
                 calculated_value = individual_func(res.x)
-                print(f"DEBUG: Individual extremum found: {calculated_value:.4f}")
+                log_opt.debug('Individual extremum found: %.4f', calculated_value)
                 return {
                     'x': res.x,
                     'value': calculated_value
                 }
             else:
-                print(f"DEBUG: Individual extremum optimization failed: {res.message}")
+                log_opt.warning('Individual extremum optimization failed: %s', res.message)
                 
                 # Try a simpler approach - evaluate at bounds and center
                 test_points = [
@@ -1673,25 +2376,27 @@ class CSRApp:
                         continue
                 
                 if best_value is not None:
-                    print(f"DEBUG: Using fallback extremum: {best_value:.4f}")
+                    log_opt.debug('Using fallback extremum: %.4f', best_value)
                     return {
                         'x': best_point,
                         'value': best_value
                     }
                     
         except Exception as e:
-            print(f"Individual extremum finding failed: {str(e)}")
+            log_opt.warning('Individual extremum finding failed: %s', str(e))
         
         # Final fallback: return None to use data-based fallback
-        print("DEBUG: Individual extremum calculation completely failed")
+        log_opt.warning('Individual extremum calculation completely failed')
         return None
 
+    @Profiling.timed()
     def find_extremum_comprehensive_with_active_factors(self, bounds_for_opt, x0_for_opt, extremum_type, max_active_factors):
         """Find extremum for comprehensive function with constraint on number of active factors"""
         if not hasattr(self, 'comprehensive_function'):
             return {'x': np.array([]), 'value': np.nan}
 
         def comprehensive_func_for_optimizer(x_point_in_opt_scale):
+            Profiling.count_eval("find_extremum_comprehensive_with_active_factors")
             return self.comprehensive_function(x_point_in_opt_scale)
 
         # Set up the objective function based on extremum type
@@ -1714,57 +2419,21 @@ class CSRApp:
         
         max_active = int(max_active_factors)
         
-        print(f"Comprehensive optimization with max {max_active} active factors out of {num_factors} total factors")
+        log_opt.debug('Comprehensive optimization with max %s active factors out of %s total factors', max_active, num_factors)
         
         # FIX: Ensure bounds and initial guess match the expected factor count
         if len(bounds_for_opt) != num_factors:
-            print(f"DEBUG: Adjusting bounds from {len(bounds_for_opt)} to {num_factors} factors")
+            log_opt.debug('Adjusting bounds from %s to %s factors', len(bounds_for_opt), num_factors)
             # Use default bounds if mismatch
             bounds_for_opt = [(self.df[col].min(), self.df[col].max()) for col in self.factor_cols]
         
         if len(x0_for_opt) != num_factors:
-            print(f"DEBUG: Adjusting initial guess from {len(x0_for_opt)} to {num_factors} factors")
+            log_opt.debug('Adjusting initial guess from %s to %s factors', len(x0_for_opt), num_factors)
             x0_for_opt = np.array([(min_val + max_val)/2 for min_val, max_val in bounds_for_opt])
         
-        # Add constraints from CSR limits
-        constraints = []
-        for limit_name, limit_data in self.csr_limits.items():
-            factors = limit_data.get('factors', [])
-            limit_value = limit_data.get('value', 0)
-            limit_type = limit_data.get('type', 'sum')
-            
-            if limit_type == 'sum':
-                def make_sum_constraint(factors_list, limit_val):
-                    def constraint_func(x_orig):
-                        total = sum(x_orig[i] for i in factors_list)
-                        return limit_val - total  # total <= limit_val
-                    return constraint_func
-                
-                constraint = {'type': 'ineq', 
-                            'fun': make_sum_constraint(factors, limit_value)}
-                constraints.append(constraint)
-                
-            elif limit_type == 'sum_equality':  # NEW: Equality constraint
-                def make_sum_equality_constraint(factors_list, limit_val):
-                    def constraint_func(x_orig):
-                        total = sum(x_orig[i] for i in factors_list)
-                        return total - limit_val  # total - limit_val = 0 => total = limit_val
-                    return constraint_func
-                
-                constraint = {'type': 'eq',  # CHANGE: Use equality constraint type
-                            'fun': make_sum_equality_constraint(factors, limit_value)}
-                constraints.append(constraint)
-                
-            elif limit_type == 'product':
-                def make_product_constraint(factors_list, limit_val):
-                    def constraint_func(x_orig):
-                        product = np.prod([x_orig[i] for i in factors_list])
-                        return limit_val - product
-                    return constraint_func
-                
-                constraint = {'type': 'ineq', 
-                            'fun': make_product_constraint(factors, limit_value)}
-                constraints.append(constraint)
+        # Add constraints from CSR limits (original scale)
+        limits = Constraints.compile_limits(self.csr_limits, num_factors)
+        constraints = limits.slsqp_constraints()
 
         # Use similar iterative optimization approach as single result case
         try:
@@ -1802,30 +2471,9 @@ class CSRApp:
                 active_bounds = [bounds_for_opt[i] for i in top_indices]
                 active_x0 = x_initial[top_indices]
                 
-                # Add constraints for the active factors optimization
-                active_constraints = []
-                for limit_name, limit_data in self.csr_limits.items():
-                    factors = limit_data.get('factors', [])
-                    limit_value = limit_data.get('value', 0)
-                    limit_type = limit_data.get('type', 'sum')
-                    
-                    # Only include constraints that involve the active factors
-                    active_factors_in_limit = [f for f in factors if f in top_indices]
-                    if not active_factors_in_limit:
-                        continue
-                    
-                    if limit_type == 'sum':
-                        def make_active_sum_constraint(factors_list, limit_val, top_indices_map):
-                            def constraint_func(x_active):
-                                x_full = np.zeros(num_factors)
-                                x_full[top_indices] = x_active
-                                total = sum(x_full[i] for i in factors_list)
-                                return limit_val - total
-                            return constraint_func
-                        
-                        constraint = {'type': 'ineq', 
-                                    'fun': make_active_sum_constraint(factors, limit_value, top_indices)}
-                        active_constraints.append(constraint)
+                # Sum limits touching the active factors, with the others held at zero
+                active_constraints = Constraints.compile_limits(self.csr_limits, num_factors, types=('sum',)) \
+                    .restrict(top_indices, np.zeros(num_factors)).slsqp_constraints()
                 
                 # Optimize only the active factors with constraints
                 if active_constraints:
@@ -1854,7 +2502,7 @@ class CSRApp:
                     }
         
         except Exception as e:
-            print(f"Comprehensive cardinality-constrained optimization failed: {str(e)}")
+            log_opt.warning('Comprehensive cardinality-constrained optimization failed: %s', str(e))
         
         # Fall back to regular comprehensive optimization
         return self.find_extremum_comprehensive(bounds_for_opt, x0_for_opt, extremum_type)
@@ -1870,7 +2518,7 @@ class CSRApp:
                 self.equation_text.insert(tk.END, equation_str)
                 self.equation_text.config(state='disabled')
             except tk.TclError as e:
-                print(f"Error updating equation text: {e}")
+                log_ui.warning('Error updating equation text: %s', e)
 
         # Update Factor Definitions Text
         if hasattr(self, 'factor_definitions_text'):
@@ -1880,7 +2528,7 @@ class CSRApp:
                 self.factor_definitions_text.insert(tk.END, factor_defs_str)
                 self.factor_definitions_text.config(state='disabled')
             except tk.TclError as e:
-                print(f"Error updating parameter definitions: {e}")
+                log_ui.warning('Error updating parameter definitions: %s', e)
 
         # Update Extremum Factors Display
         if hasattr(self, 'factors_text'):
@@ -1975,13 +2623,17 @@ class CSRApp:
                 
                 self.factors_text.config(state='disabled')
             except tk.TclError as e:
-                print(f"Error updating factors text: {e}")
+                log_ui.warning('Error updating factors text: %s', e)
                 
-        # Add verification info (optional - for debugging)
-        verification_info = self.verify_extremum_calculation()
-        print(verification_info)  # This will show in console for debugging
+        # Add verification info (optional - for debugging); skipped unless debug logging is on
+        if log_opt.isEnabledFor(logging.DEBUG):
+            log_opt.debug('%s', self.verify_extremum_calculation())
             
     def clear_results_and_plots(self):
+        # A pending surface refinement would redraw over the cleared plot
+        if hasattr(self, '_surface_generation'):
+            self._cancel_surface_refinement()
+
         # Clear text widgets safely
         text_widgets = [
             'equation_text', 
@@ -2017,25 +2669,12 @@ class CSRApp:
                 pass
 
         # Clear plots
-        if hasattr(self, 'figure1'):
-            try:
-                self.figure1.clf()
-                ax = self.figure1.add_subplot(111, facecolor='white')
-                ax.text(0.5, 0.5, "Load data and run fitting", 
-                       ha="center", va="center", color='gray')
-                self.canvas1.draw()
-            except:
-                pass
-                
-        if hasattr(self, 'figure2'):
-            try:
-                self.figure2.clf()
-                ax = self.figure2.add_subplot(111, facecolor='white')
-                ax.text(0.5, 0.5, "Load data and run fitting", 
-                       ha="center", va="center", color='gray')
-                self.canvas2.draw()
-            except:
-                pass
+        for plot_name in ['results_plot', 'surface_plot']:
+            if hasattr(self, plot_name):
+                try:
+                    self._show_placeholder(getattr(self, plot_name), "Load data and run fitting")
+                except:
+                    pass
         
         # Clear combo boxes
         for combo_name in ['x_factor_combo', 'y_factor_combo']:
@@ -2083,12 +2722,7 @@ class CSRApp:
                         x_point = extremum_x
                         
                         # Normalize for each function
-                        if func_data['norm_type'] == "[-1, 1]":
-                            x_norm = 2 * (x_point - func_data['x_min']) / (func_data['x_max'] - func_data['x_min']) - 1
-                        elif func_data['norm_type'] == "[0, 1]":
-                            x_norm = (x_point - func_data['x_min']) / (func_data['x_max'] - func_data['x_min'])
-                        else:
-                            x_norm = x_point
+                        x_norm = CSRModel.to_fitting_scale(x_point, func_data)
                         
                         design_row = self.create_design_matrix(x_norm.reshape(1, -1), func_data['bits_array'])
                         val = np.dot(design_row[0], func_data['coefficients'])
@@ -2115,7 +2749,7 @@ class CSRApp:
                 r2_row_num = 0
                 for result_col, func_data in self.result_functions.items():
                     display_name = self.col_name_mapping.get(result_col, result_col)
-                    r2 = func_data['model'].score(func_data['X_design'], func_data['y'])
+                    r2 = func_data['r2']
                     rmse = func_data['rmse']
                     
                     r2_frame = ttk.Frame(self.r2_frame)
@@ -2163,7 +2797,7 @@ class CSRApp:
 
                 # Calculate and display average R² and RMSE
                 if self.result_functions:
-                    avg_r2 = np.mean([func['model'].score(func['X_design'], func['y']) for func in self.result_functions.values()])
+                    avg_r2 = np.mean([func['r2'] for func in self.result_functions.values()])
                     avg_rmse = np.mean([func['rmse'] for func in self.result_functions.values()])
 
                     avg_frame = ttk.Frame(self.r2_frame)
@@ -2260,9 +2894,174 @@ class CSRApp:
             if equation_str.startswith("- "):
                 return equation_str[2:]  # Remove the "- " since we'll add it in the display
             return equation_str
-        
+
+    def _surface_variance(self):
+        """
+        prediction_variance of the single-outcome fit, built on first use: one XᵀX pass over
+        the data (none after a blocked fit) and one factorization. None without a fit.
+        """
+        if self.prediction_variance is None and self.y is not None and self.y_pred is not None:
+            gram = self.fit_gram
+            if gram is None:
+                gram, _ = CSRModel.design_gram(self.X, self.bits_array)
+            self.prediction_variance = CSRModel.prediction_variance(None, self.y, self.y_pred,
+                                                                    self.fit_alpha or 1e-5, gram=gram)
+        return self.prediction_variance
+
+    def _surface_fixed_point(self):
+        """
+        Point the response slices go through: the extremum when there is one, otherwise the
+        data mean (original units). Returns (fixed_point, extremum_x, extremum_value).
+        """
+        n_factors = len(self.factor_cols)
+        if not (self.extremum_point and self.extremum_point['x'] is not None and
+                len(self.extremum_point['x']) == n_factors):
+            return self._factor_mean(), None, None
+
+        if hasattr(self, 'comprehensive_function') or 'x_normalized' not in self.extremum_point:
+            # Comprehensive extremum (or fallback) - already in original scale
+            extremum_x = np.asarray(self.extremum_point['x'], dtype=float)
+        else:
+            extremum_x = self.normalization.inverse(self.extremum_point['x_normalized'])
+        extremum_value = self.extremum_point['value']
+        log_plot.debug('Extremum for plotting: %s, value %s', extremum_x, extremum_value)
+        return extremum_x.copy(), extremum_x, extremum_value
+
+    def _surface_batch(self):
+        """Batched response of the current model at original-unit points"""
+        if hasattr(self, 'comprehensive_function'):
+            return self.comprehensive_function.batch
+        coefficients, bits_array, normalization = self.coefficients, self.bits_array, self.normalization
+        return lambda X: CSRModel.evaluate_csr(normalization.forward(X), coefficients, bits_array)
+
+    def _surface_key(self, fixed_point, resolution=None):
+        """Slice-cache key covering the current model and the point the slices go through"""
+        if hasattr(self, 'comprehensive_function'):
+            models = CSRModel.outcome_models(self.result_functions)
+            arrays = [np.asarray(m['coefficients'], dtype=float) for m in models.values()]
+            options = {'objective': self.comprehensive_function.objective,
+                       'ranges': [(m['min_val'], m['max_val'], m['r2']) for m in models.values()]}
+        else:
+            arrays = [self.coefficients, self.normalization.scale, self.normalization.offset]
+            options = {}
+        return self.surface_slices.make_key(
+            self.X_original_scale.min(axis=0), self.X_original_scale.max(axis=0), self.bits_array,
+            np.asarray(fixed_point, dtype=float), *arrays,
+            kind='comprehensive' if hasattr(self, 'comprehensive_function') else 'single',
+            resolution=resolution or SURFACE_RESOLUTION, **options)
+
+    def _pair_slice(self, x_idx, y_idx, fixed_point, resolution=SURFACE_RESOLUTION):
+        """(x_grid, y_grid, z_grid) of one factor pair, from the slice cache when possible"""
+        key = self._surface_key(fixed_point, resolution)
+        return self.surface_slices.slices(self._surface_batch(), key, self.X_original_scale, fixed_point,
+                                          pairs=[(x_idx, y_idx)], resolution=resolution)[(x_idx, y_idx)]
+
+    @Profiling.timed()
+    def compute_pair_matrix(self):
+        """
+        Slices of every factor pair through the current fixed point, evaluated together and
+        cached for the 3D plot. Returns (slices, fixed_point, extremum_x).
+        """
+        fixed_point, extremum_x, _ = self._surface_fixed_point()
+        key = self._surface_key(fixed_point)
+        slices = self.surface_slices.slices(self._surface_batch(), key, self.X_original_scale, fixed_point,
+                                            resolution=SURFACE_RESOLUTION)
+        return slices, fixed_point, extremum_x
+
+    def show_pair_matrix(self):
+        """Contour plots of the response over every factor pair, through the extremum"""
+        if self.X_original_scale is None or (self.coefficients is None and not hasattr(self, 'comprehensive_function')):
+            messagebox.showinfo("Pairs Matrix", "Run the fitting process first.")
+            return
+        n_factors = len(self.factor_cols)
+        if n_factors < 2:
+            messagebox.showinfo("Pairs Matrix", "The pairs matrix needs at least two parameters.")
+            return
+        try:
+            slices, fixed_point, extremum_x = self.compute_pair_matrix()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to compute the pairs matrix: {str(e)}")
+            log_plot.exception('Pairs matrix failed')
+            return
+
+        names = [self.col_name_mapping.get(col, col) for col in self.factor_cols]
+        result_name = "Combined Result" if hasattr(self, 'comprehensive_function') else self.col_name_mapping.get("result", "Result")
+
+        window = tk.Toplevel(self.root)
+        window.title("Pairs Matrix")
+        window.geometry("900x850")
+        window.configure(background='#F0F0F0')
+        ttk.Label(window, text=f"{result_name} over every parameter pair, other parameters at "
+                               f"{'the extremum' if extremum_x is not None else 'their mean'}. "
+                               "Click a panel to show it in the 3D plot.",
+                  style="App.TLabel").pack(side='top', fill='x', padx=10, pady=(10, 0))
+
+        figure = Figure(figsize=(8, 8), dpi=100, facecolor='#F0F0F0')
+        canvas = FigureCanvasTkAgg(figure, master=window)
+
+        # Lower triangle: column i is the x factor, row j - 1 the y factor; one colour scale
+        z_all = np.concatenate([z.ravel() for _, _, z in slices.values()])
+        levels = np.linspace(np.nanmin(z_all), np.nanmax(z_all), 15)
+        if not np.all(np.diff(levels) > 0):
+            levels = 15
+        grid = figure.add_gridspec(n_factors - 1, n_factors - 1, hspace=0.08, wspace=0.08,
+                                   left=0.08, right=0.88, bottom=0.07, top=0.97)
+        panel_pairs = {}
+        contour = None
+        for (i, j), (x_grid, y_grid, z_grid) in slices.items():
+            ax = figure.add_subplot(grid[j - 1, i])
+            contour = ax.contourf(x_grid, y_grid, z_grid, levels=levels, cmap='viridis')
+            if extremum_x is not None:
+                ax.plot(extremum_x[i], extremum_x[j], marker='*', color='gold', markeredgecolor='black',
+                        markersize=8)
+            ax.tick_params(labelsize=6)
+            if j == n_factors - 1:
+                ax.set_xlabel(names[i], fontsize=7)
+            else:
+                ax.set_xticklabels([])
+            if i == 0:
+                ax.set_ylabel(names[j], fontsize=7)
+            else:
+                ax.set_yticklabels([])
+            panel_pairs[ax] = (i, j)
+        if contour is not None:
+            colorbar_ax = figure.add_axes([0.91, 0.3, 0.02, 0.4])
+            figure.colorbar(contour, cax=colorbar_ax, format="%.2f").ax.tick_params(labelsize=7)
+
+        def feature_pair(event):
+            pair = panel_pairs.get(event.inaxes)
+            if pair is None:
+                return
+            # Same fixed point and resolution, so the 3D plot reuses the cached slice
+            self.x_factor_combo.set(names[pair[0]])
+            self.y_factor_combo.set(names[pair[1]])
+            self.update_3d_plot()
+
+        def export_csv():
+            file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")],
+                                                     parent=window)
+            if not file_path:
+                return
+            rows = []
+            for (i, j), (x_grid, y_grid, z_grid) in slices.items():
+                rows.append(pd.DataFrame({'x_parameter': names[i], 'y_parameter': names[j], 'x': x_grid.ravel(),
+                                          'y': y_grid.ravel(), result_name: z_grid.ravel()}))
+            try:
+                pd.concat(rows, ignore_index=True).to_csv(file_path, index=False)
+            except OSError as e:
+                messagebox.showerror("Export Error", f"Could not save the pairs matrix:\n{e}", parent=window)
+
+        canvas.mpl_connect('button_press_event', feature_pair)
+        button_frame = ttk.Frame(window, style="App.TFrame")
+        button_frame.pack(side='bottom', fill='x', padx=10, pady=10)
+        ttk.Button(button_frame, text="Export CSV...", command=export_csv).pack(side='right')
+        canvas.get_tk_widget().pack(fill='both', expand=True, padx=5, pady=5)
+        canvas.draw()
+
+    @Profiling.timed()
     def update_3d_plot(self):
-        if self.df is None or not self.factor_cols:
+        # One-factor models are drawn as a curve by plot_results
+        if self.X_original_scale is None or len(self.factor_cols) < 2:
             return
 
         x_factor_display_name = self.x_factor_combo.get()
@@ -2288,220 +3087,194 @@ class CSRApp:
 
             x_idx = self.factor_cols.index(x_internal_name)
             y_idx = self.factor_cols.index(y_internal_name)
-            n_factors = len(self.factor_cols)
 
-            # Clear the figure and prepare for new plot
-            self.figure2.clf()
-            self.figure2.subplots_adjust(bottom=0.18, left=0.1, right=0.85, top=0.9)
-            self.figure2.patch.set_facecolor('#F0F0F0')
-            ax2 = self.figure2.add_subplot(111, projection='3d', facecolor='#ffffff')
-            
-            # Configure the 3D plot appearance
-            ax2.grid(True, linestyle=':', alpha=0.5)
-            for pane_ax in [ax2.xaxis, ax2.yaxis, ax2.zaxis]: 
-                pane_ax.set_pane_color((1.0, 1.0, 1.0, 0.0))
-                pane_ax.pane.set_edgecolor('#D0D0D0')
-
-            # Get the ranges for the selected factors - use finer resolution
-            x1_orig_plot_axis = np.linspace(self.X_original_scale[:, x_idx].min(), 
-                                        self.X_original_scale[:, x_idx].max(), 30)
-            x2_orig_plot_axis = np.linspace(self.X_original_scale[:, y_idx].min(), 
-                                        self.X_original_scale[:, y_idx].max(), 30)
-            x1_grid_orig, x2_grid_orig = np.meshgrid(x1_orig_plot_axis, x2_orig_plot_axis)
-            z_csr_values_grid = np.zeros_like(x1_grid_orig)
-
-            # Get fixed values for other factors (use extremum point if available, otherwise mean)
-            fixed_factor_values_original_scale = np.mean(self.X_original_scale, axis=0)
-            
-            # FIXED: Handle extremum point for both single and comprehensive optimization
-            extremum_x_orig_for_plotting = None
-            extremum_value_for_plotting = None
+            # Repeated requests for the surface already shown (or being refined) cost nothing
+            fixed_point = self._surface_fixed_point()[0]
+            shown = (x_idx, y_idx, self._surface_key(fixed_point), self.surface_uncertainty_combo.get())
+            if self.surface_plot.shown == shown:
+                return
+
+            # A new surface makes any pending refinement of the previous one stale
+            self._cancel_surface_refinement()
+            self._draw_surface(x_idx, y_idx, SURFACE_RESOLUTION)
+            self.surface_plot.shown = shown
+            self._surface_refine_job = self.root.after(SURFACE_REFINE_DELAY_MS, self._refine_3d_plot,
+                                                       x_idx, y_idx, self._surface_generation)
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to update 3D plot: {str(e)}")
+            log_plot.exception('Failed to update 3D plot')
+
+    def _cancel_surface_refinement(self):
+        """Drop the pending fine-grid redraw of the 3D surface, if any"""
+        self._surface_generation += 1
+        if self._surface_refine_job is not None:
+            try:
+                self.root.after_cancel(self._surface_refine_job)
+            except (tk.TclError, ValueError):
+                pass
+            self._surface_refine_job = None
+
+    @Profiling.timed()
+    def _refine_3d_plot(self, x_idx, y_idx, generation):
+        """Redraw the 3D surface on the fine grid, unless another request came in meanwhile"""
+        self._surface_refine_job = None
+        if generation != self._surface_generation or self.X_original_scale is None:
+            return
+        try:
+            self._draw_surface(x_idx, y_idx, SURFACE_FINE_RESOLUTION)
+        except Exception:
+            # The coarse surface is still on screen
+            log_plot.exception('Failed to refine 3D plot')
+
+    def _build_surface_axes(self, figure):
+        """3D axes of the response surface; the colorbar is added with the first surface"""
+        figure.subplots_adjust(bottom=0.18, left=0.1, right=0.85, top=0.9)
+        figure.patch.set_facecolor('#F0F0F0')
+        ax2 = figure.add_subplot(111, projection='3d', facecolor='#ffffff')
+        ax2.grid(True, linestyle=':', alpha=0.5)
+        for pane_ax in [ax2.xaxis, ax2.yaxis, ax2.zaxis]:
+            pane_ax.set_pane_color((1.0, 1.0, 1.0, 0.0))
+            pane_ax.pane.set_edgecolor('#D0D0D0')
+            pane_ax.set_tick_params(pad=3, labelsize=8)
+        ax2.set_title('CSR Response Surface', fontsize=11, fontweight='bold', y=1.02)
+        # Set once, so a view the user rotated to survives later updates
+        ax2.view_init(elev=25, azim=45)
+        return {'ax': ax2, 'colorbar': None}
+
+    def _draw_surface(self, x_idx, y_idx, resolution):
+        """Draw the response surface of factors x_idx and y_idx on a resolution x resolution grid"""
+        plot = self.surface_plot
+        parts = plot.layout('surface', self._build_surface_axes)
+        ax2 = parts['ax']
+        plot.begin()
+
+        fixed_factor_values_original_scale, extremum_x_orig_for_plotting, extremum_value_for_plotting = \
+            self._surface_fixed_point()
+
+        # Cached slice through the fixed point (the pairs matrix fills the same cache)
+        x1_grid_orig, x2_grid_orig, z_csr_values_grid = self._pair_slice(
+            x_idx, y_idx, fixed_factor_values_original_scale, resolution)
+
+        uncertainty = self.surface_uncertainty_combo.get()
+        band_grids = None
+        se_grid = None
+        variance = None
+        if not hasattr(self, 'comprehensive_function') and uncertainty != SURFACE_UNCERTAINTY[0]:
+            variance = self._surface_variance()
+        if variance is not None:
+            # Prediction variance of the whole grid from one design matrix in the fitting scale
+            _, _, grid_points = CSRModel.surface_points(
+                self.X_original_scale, x_idx, y_idx, fixed_factor_values_original_scale, resolution=resolution)
+            design = self.create_design_matrix(self.normalization.forward(grid_points), self.bits_array)
+            if uncertainty == SURFACE_UNCERTAINTY[1]:
+                half_width = t_dist.ppf(0.975, variance.dof) * np.sqrt(
+                    variance(design, include_noise=True)).reshape(x1_grid_orig.shape)
+                band_grids = (z_csr_values_grid - half_width, z_csr_values_grid + half_width)
+            else:
+                se_grid = np.sqrt(variance(design)).reshape(x1_grid_orig.shape)
+
+        # Remove any extreme outliers that might distort the plot
+        z_clean = np.copy(z_csr_values_grid)
+        z_mean = np.nanmean(z_clean)
+        z_std = np.nanstd(z_clean)
+        outlier_mask = np.abs(z_clean - z_mean) > 3 * z_std
+        z_clean[outlier_mask] = np.nan
+
+        # Surfaces can't take new data in place, so only the data artists are replaced;
+        # axes, panes and colorbar stay. Strides and edge lines follow the grid size.
+        surface_style, wire_stride = Surfaces.surface_style(resolution)
+        if se_grid is not None:
+            # Colour the response surface by the standard error of the fitted value
+            se_norm = mcolors.Normalize(vmin=np.nanmin(se_grid), vmax=np.nanmax(se_grid))
+            plot.replace('surface', ax2.plot_surface(x1_grid_orig, x2_grid_orig, z_clean,
+                                                     facecolors=plt.cm.magma_r(se_norm(se_grid)), alpha=0.9,
+                                                     shade=False, **surface_style))
+            surf = plt.cm.ScalarMappable(norm=se_norm, cmap='magma_r')
+        else:
+            surf = plot.replace('surface', ax2.plot_surface(x1_grid_orig, x2_grid_orig, z_clean,
+                                                            cmap='viridis', alpha=0.9, **surface_style))
+        if band_grids is not None:
+            for k, band in enumerate(band_grids):
+                band = np.where(outlier_mask, np.nan, band)
+                plot.replace(f'band {k}', ax2.plot_wireframe(x1_grid_orig, x2_grid_orig, band, color='#666666',
+                                                             linewidth=0.4, alpha=0.5,
+                                                             rstride=wire_stride, cstride=wire_stride))
+
+        extremum_shown = False
+        if extremum_x_orig_for_plotting is not None and extremum_value_for_plotting is not None:
+            log_plot.debug('Attempting to plot extremum at (%.4f, %.4f, %.4f)', extremum_x_orig_for_plotting[x_idx], extremum_x_orig_for_plotting[y_idx], extremum_value_for_plotting)
             
-            if (self.extremum_point and self.extremum_point['x'] is not None and 
-                len(self.extremum_point['x']) == n_factors):
-                
-                if hasattr(self, 'comprehensive_function'):
-                    # Comprehensive optimization - already in original scale
-                    extremum_x_orig_for_plotting = self.extremum_point['x']
-                    extremum_value_for_plotting = self.extremum_point['value']
-                    print(f"DEBUG: Comprehensive extremum for plotting: {extremum_x_orig_for_plotting}")
-                else:
-                    # Single optimization - need to handle normalization properly
-                    if 'x_normalized' in self.extremum_point:
-                        # Use normalized point and convert to original scale
-                        x_normalized = self.extremum_point['x_normalized']
-                        if self.norm_select.get() == "[-1, 1]":
-                            extremum_x_orig_for_plotting = (x_normalized + 1) / 2 * (self.norm_x_max - self.norm_x_min) + self.norm_x_min
-                        elif self.norm_select.get() == "[0, 1]":
-                            extremum_x_orig_for_plotting = x_normalized * (self.norm_x_max - self.norm_x_min) + self.norm_x_min
-                        else:
-                            extremum_x_orig_for_plotting = x_normalized
-                    else:
-                        # Fallback: use x directly (might already be in original scale)
-                        extremum_x_orig_for_plotting = self.extremum_point['x']
-                    
-                    extremum_value_for_plotting = self.extremum_point['value']
-                    print(f"DEBUG: Single extremum for plotting - original: {extremum_x_orig_for_plotting}")
-                    print(f"DEBUG: Single extremum value: {extremum_value_for_plotting}")
-                
-                # Use extremum point for fixed values
-                fixed_factor_values_original_scale = extremum_x_orig_for_plotting.copy()
-
-            # NEW: Improved comprehensive function evaluation
-            if hasattr(self, 'comprehensive_function'):
-                # Evaluate the comprehensive function across the grid
-                for i_grid in range(x1_grid_orig.shape[0]):
-                    for j_grid in range(x1_grid_orig.shape[1]):
-                        current_full_point_orig_scale = fixed_factor_values_original_scale.copy()
-                        current_full_point_orig_scale[x_idx] = x1_grid_orig[i_grid, j_grid]
-                        current_full_point_orig_scale[y_idx] = x2_grid_orig[i_grid, j_grid]
-                        
-                        # Direct evaluation without additional clipping
-                        z_csr_values_grid[i_grid, j_grid] = self.comprehensive_function(current_full_point_orig_scale)
+            # Verify the point is within the plot bounds
+            x_min_bound = self.X_original_scale[:, x_idx].min()
+            x_max_bound = self.X_original_scale[:, x_idx].max()
+            y_min_bound = self.X_original_scale[:, y_idx].min()
+            y_max_bound = self.X_original_scale[:, y_idx].max()
             
-            elif hasattr(self, 'coefficients') and hasattr(self, 'bits_array'):
-                # Single result case - use existing logic
-                for i_grid in range(x1_grid_orig.shape[0]):
-                    for j_grid in range(x1_grid_orig.shape[1]):
-                        current_full_point_orig_scale = fixed_factor_values_original_scale.copy()
-                        current_full_point_orig_scale[x_idx] = x1_grid_orig[i_grid, j_grid]
-                        current_full_point_orig_scale[y_idx] = x2_grid_orig[i_grid, j_grid]
-                        
-                        current_full_point_norm_scale = self._normalize_point(current_full_point_orig_scale)
-                        if current_full_point_norm_scale is not None:
-                            z_csr_values_grid[i_grid, j_grid] = self.evaluate_csr_at_point(current_full_point_norm_scale)
-                        else:
-                            z_csr_values_grid[i_grid, j_grid] = np.nan
-
-            # Remove any extreme outliers that might distort the plot
-            z_clean = np.copy(z_csr_values_grid)
-            z_mean = np.nanmean(z_clean)
-            z_std = np.nanstd(z_clean)
-            outlier_mask = np.abs(z_clean - z_mean) > 3 * z_std
-            z_clean[outlier_mask] = np.nan
-
-            # Plot the surface with improved settings
-            surf = ax2.plot_surface(x1_grid_orig, x2_grid_orig, z_clean, 
-                                cmap='viridis', alpha=0.9, edgecolor='#555555', 
-                                linewidth=0.1, antialiased=True, rstride=1, cstride=1)
-
-            # FIXED: Plot extremum point if available - PROPERLY HANDLED FOR BOTH CASES
-            if extremum_x_orig_for_plotting is not None and extremum_value_for_plotting is not None:
-                print(f"DEBUG: Attempting to plot extremum at ({extremum_x_orig_for_plotting[x_idx]:.4f}, {extremum_x_orig_for_plotting[y_idx]:.4f}, {extremum_value_for_plotting:.4f})")
-                
-                # Verify the point is within the plot bounds
-                x_min_bound = self.X_original_scale[:, x_idx].min()
-                x_max_bound = self.X_original_scale[:, x_idx].max()
-                y_min_bound = self.X_original_scale[:, y_idx].min()
-                y_max_bound = self.X_original_scale[:, y_idx].max()
-                
-                x_within_bounds = (x_min_bound <= extremum_x_orig_for_plotting[x_idx] <= x_max_bound)
-                y_within_bounds = (y_min_bound <= extremum_x_orig_for_plotting[y_idx] <= y_max_bound)
-                
-                if x_within_bounds and y_within_bounds:
-                    ax2.scatter([extremum_x_orig_for_plotting[x_idx]], 
-                            [extremum_x_orig_for_plotting[y_idx]], 
-                            [extremum_value_for_plotting], 
-                            c='gold', s=200, marker='*', edgecolor='black', 
-                            linewidth=1, label='Optimal Point', depthshade=True, zorder=10)
-                    
-                    # Add legend
-                    ax2.legend(fontsize=8, facecolor='#F0F0F0', framealpha=0.8)
-                    print("DEBUG: Extremum point successfully plotted")
-                else:
-                    print(f"DEBUG: Extremum point outside plot bounds - X: {x_within_bounds}, Y: {y_within_bounds}")
-                    print(f"DEBUG: X bounds: [{x_min_bound}, {x_max_bound}], extremum X: {extremum_x_orig_for_plotting[x_idx]}")
-                    print(f"DEBUG: Y bounds: [{y_min_bound}, {y_max_bound}], extremum Y: {extremum_x_orig_for_plotting[y_idx]}")
-
-            # Set axis labels
-            x_axis_name = self.col_name_mapping.get(self.factor_cols[x_idx], self.factor_cols[x_idx])
-            y_axis_name = self.col_name_mapping.get(self.factor_cols[y_idx], self.factor_cols[y_idx])
-            result_axis_name = "Combined Result" if hasattr(self, 'comprehensive_function') else self.col_name_mapping.get("result", "Result")
+            x_within_bounds = (x_min_bound <= extremum_x_orig_for_plotting[x_idx] <= x_max_bound)
+            y_within_bounds = (y_min_bound <= extremum_x_orig_for_plotting[y_idx] <= y_max_bound)
             
-            ax2.set_xlabel(f"\n{x_axis_name}", fontsize=9, fontweight='bold', linespacing=2)
-            ax2.set_ylabel(f"\n{y_axis_name}", fontsize=9, fontweight='bold', linespacing=2)
-            ax2.set_zlabel(f"\n{result_axis_name}", fontsize=9, fontweight='bold', linespacing=2)
-            ax2.set_title('CSR Response Surface', fontsize=11, fontweight='bold', y=1.02)
-
-            # Add colorbar
-            cbar = self.figure2.colorbar(surf, ax=ax2, shrink=0.6, aspect=12, pad=0.15, format="%.2f")
+            if x_within_bounds and y_within_bounds:
+                plot.replace('extremum', ax2.scatter([extremum_x_orig_for_plotting[x_idx]],
+                                                     [extremum_x_orig_for_plotting[y_idx]],
+                                                     [extremum_value_for_plotting],
+                                                     c='gold', s=200, marker='*', edgecolor='black',
+                                                     linewidth=1, label='Optimal Point', depthshade=True, zorder=10))
+                extremum_shown = True
+                log_plot.debug('Extremum point successfully plotted')
+            else:
+                log_plot.debug('Extremum point outside plot bounds - X: %s, Y: %s', x_within_bounds, y_within_bounds)
+                log_plot.debug('X bounds: [%s, %s], extremum X: %s', x_min_bound, x_max_bound, extremum_x_orig_for_plotting[x_idx])
+                log_plot.debug('Y bounds: [%s, %s], extremum Y: %s', y_min_bound, y_max_bound, extremum_x_orig_for_plotting[y_idx])
+        # Artists not redrawn in this pass (bands, a star now out of bounds) go away here
+        plot.prune()
+        if extremum_shown:
+            # A fixed corner: 'best' would test every surface vertex on each draw
+            ax2.legend(fontsize=8, facecolor='#F0F0F0', framealpha=0.8, loc='upper right')
+        elif ax2.get_legend() is not None:
+            ax2.get_legend().remove()
+
+        # Set axis labels
+        x_axis_name = self.col_name_mapping.get(self.factor_cols[x_idx], self.factor_cols[x_idx])
+        y_axis_name = self.col_name_mapping.get(self.factor_cols[y_idx], self.factor_cols[y_idx])
+        result_axis_name = "Combined Result" if hasattr(self, 'comprehensive_function') else self.col_name_mapping.get("result", "Result")
+        
+        ax2.set_xlabel(f"\n{x_axis_name}", fontsize=9, fontweight='bold', linespacing=2)
+        ax2.set_ylabel(f"\n{y_axis_name}", fontsize=9, fontweight='bold', linespacing=2)
+        ax2.set_zlabel(f"\n{result_axis_name}", fontsize=9, fontweight='bold', linespacing=2)
+
+        # One colorbar for the life of the axes, pointed at the new surface
+        cbar = parts['colorbar']
+        if cbar is None:
+            cbar = parts['colorbar'] = self.figure2.colorbar(surf, ax=ax2, shrink=0.6, aspect=12, pad=0.15, format="%.2f")
             cbar.ax.tick_params(labelsize=8)
             cbar.outline.set_edgecolor('gray')
-            
-            # Set view angle for better visibility
-            ax2.view_init(elev=25, azim=45)
-            
-            # Adjust tick parameters
-            for axis_obj in [ax2.xaxis, ax2.yaxis, ax2.zaxis]:
-                axis_obj.set_tick_params(pad=3, labelsize=8)
-                axis_obj.label.set_size(9)
+        else:
+            cbar.update_normal(surf)
+        cbar.set_label("Standard error" if se_grid is not None else "", fontsize=8)
 
-            # Auto-scale the z-axis to show the proper shape
-            z_min, z_max = np.nanmin(z_clean), np.nanmax(z_clean)
-            if not (np.isnan(z_min) or np.isnan(z_max)):
-                z_range = z_max - z_min
-                if z_range > 1e-9:  # Only adjust if there's meaningful range
-                    ax2.set_zlim(z_min - 0.1 * z_range, z_max + 0.1 * z_range)
+        # Limits from this surface only (the replaced ones would otherwise still count),
+        # with the z-axis fitted to show the proper shape
+        ax2.auto_scale_xyz(x1_grid_orig, x2_grid_orig, z_clean, had_data=False)
+        z_min, z_max = np.nanmin(z_clean), np.nanmax(z_clean)
+        if band_grids is not None:
+            z_min = min(z_min, np.nanmin(np.where(outlier_mask, np.nan, band_grids[0])))
+            z_max = max(z_max, np.nanmax(np.where(outlier_mask, np.nan, band_grids[1])))
+        if not (np.isnan(z_min) or np.isnan(z_max)):
+            z_range = z_max - z_min
+            if z_range > 1e-9:  # Only adjust if there's meaningful range
+                ax2.set_zlim(z_min - 0.1 * z_range, z_max + 0.1 * z_range)
 
-            self.canvas2.draw()
+        plot.canvas.draw_idle()
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to update 3D plot: {str(e)}")
-            import traceback
-            traceback.print_exc()
 
     def generate_bits_array(self, n_factors):
-        if n_factors <= 0:
-            return np.array([])
-        
-        bits = []
-        # Constant term (all zeros)
-        bits.append(np.zeros(n_factors, dtype=int))
-        
-        # Linear terms (f1, f2, f3,...)
-        for i in range(n_factors):
-            term = np.zeros(n_factors, dtype=int)
-            term[i] = 1
-            bits.append(term)
-        
-        # Quadratic terms (f1², f2², f3²,...)
-        for i in range(n_factors):
-            term = np.zeros(n_factors, dtype=int)
-            term[i] = 2
-            bits.append(term)
-        
-        # Interaction terms (f1*f2, f1*f3,..., f2*f3, f2*f4,...)
-        if n_factors > 1:
-            for i in range(n_factors):
-                for j in range(i + 1, n_factors):
-                    term = np.zeros(n_factors, dtype=int)
-                    term[i] = 1
-                    term[j] = 1
-                    bits.append(term)
-        
-        # Convert to numpy array (no need to sort, order is enforced above)
-        return np.array(bits, dtype=int)
+        return CSRModel.generate_bits_array(n_factors)
 
     def create_design_matrix(self, X_input_scaled, bits_array):
-        if X_input_scaled.size == 0 or bits_array.size == 0:
-            return np.array([[]])
-        n_samples = X_input_scaled.shape[0]
-        n_terms = bits_array.shape[0]
-        if n_terms == 0:
-            return np.array([[]])
-        X_design = np.ones((n_samples, n_terms))
-        for term_idx, bits_row in enumerate(bits_array):
-            current_term_values_for_all_samples = np.ones(n_samples)
-            for factor_idx, power in enumerate(bits_row):
-                if power == 1:
-                    current_term_values_for_all_samples *= X_input_scaled[:, factor_idx]
-                elif power == 2:
-                    current_term_values_for_all_samples *= X_input_scaled[:, factor_idx]**2
-                elif power > 2:
-                    current_term_values_for_all_samples *= X_input_scaled[:, factor_idx]**power
-            X_design[:, term_idx] = current_term_values_for_all_samples
-        return X_design
+        return CSRModel.create_design_matrix(X_input_scaled, bits_array)
             
+    @Profiling.timed()
     def find_extremum_with_active_factors(self, beta, bits_array, bounds_for_opt, x0_for_opt, extremum_type, X_context_for_opt, max_active_factors):
         """Simplified version - just run regular optimization without artificial constraints"""
         if beta is None or bits_array is None or X_context_for_opt is None:
@@ -2512,6 +3285,7 @@ class CSRApp:
             return {'x': np.array([]), 'value': np.nan}
 
         def csr_func_for_optimizer(x_point_in_opt_scale):
+            Profiling.count_eval("find_extremum_with_active_factors")
             x_point_reshaped = np.array(x_point_in_opt_scale).reshape(1, -1)
             design_row = self.create_design_matrix(x_point_reshaped, bits_array)
             if design_row.shape[1] == 0: return 0
@@ -2532,54 +3306,9 @@ class CSRApp:
         # SIMPLIFIED: Just run the optimization without artificial cardinality constraints
         # The CSR limits will naturally constrain the solution space
         
-        # Add constraints from CSR limits
-        constraints = []
-        for limit_name, limit_data in self.csr_limits.items():
-            factors = limit_data.get('factors', [])
-            limit_value = limit_data.get('value', 0)
-            limit_type = limit_data.get('type', 'sum')
-            
-            if limit_type == 'sum':
-                def make_sum_constraint(factors_list, limit_val, norm_min, norm_max, norm_type):
-                    def constraint_func(x_norm):
-                        # Convert normalized values back to original scale for constraint
-                        if norm_type == "[-1, 1]":
-                            x_orig = (x_norm + 1) / 2 * (norm_max - norm_min) + norm_min
-                        elif norm_type == "[0, 1]":
-                            x_orig = x_norm * (norm_max - norm_min) + norm_min
-                        else:
-                            x_orig = x_norm
-                        
-                        total = sum(x_orig[i] for i in factors_list)
-                        return limit_val - total  # total <= limit_val
-                    return constraint_func
-                
-                constraint = {'type': 'ineq', 
-                            'fun': make_sum_constraint(factors, limit_value, 
-                                                    self.norm_x_min, self.norm_x_max, 
-                                                    self.norm_select.get())}
-                constraints.append(constraint)
-                
-            elif limit_type == 'sum_equality':  # NEW: Equality constraint
-                def make_sum_equality_constraint(factors_list, limit_val, norm_min, norm_max, norm_type):
-                    def constraint_func(x_norm):
-                        # Convert normalized values back to original scale for constraint
-                        if norm_type == "[-1, 1]":
-                            x_orig = (x_norm + 1) / 2 * (norm_max - norm_min) + norm_min
-                        elif norm_type == "[0, 1]":
-                            x_orig = x_norm * (norm_max - norm_min) + norm_min
-                        else:
-                            x_orig = x_norm
-                        
-                        total = sum(x_orig[i] for i in factors_list)
-                        return total - limit_val  # total - limit_val = 0 => total = limit_val
-                    return constraint_func
-                
-                constraint = {'type': 'eq',  # CHANGE: Use equality constraint type
-                            'fun': make_sum_equality_constraint(factors, limit_value, 
-                                                            self.norm_x_min, self.norm_x_max, 
-                                                            self.norm_select.get())}
-                constraints.append(constraint)
+        # Sum and sum-equality limits, compiled for the fitting scale
+        constraints = Constraints.compile_limits(self.csr_limits, len(bounds_for_opt), self.normalization,
+                                                 types=('sum', 'sum_equality')).slsqp_constraints()
 
         # Perform optimization with CSR constraints only
         try:
@@ -2592,12 +3321,7 @@ class CSRApp:
             
             if res.success:
                 # Convert to original scale
-                if self.norm_select.get() == "[-1, 1]":
-                    res_orig = (res.x + 1) / 2 * (self.norm_x_max - self.norm_x_min) + self.norm_x_min
-                elif self.norm_select.get() == "[0, 1]":
-                    res_orig = res.x * (self.norm_x_max - self.norm_x_min) + self.norm_x_min
-                else:
-                    res_orig = res.x
+                res_orig = self.normalization.inverse(res.x)
                 
                 # Calculate extremum value using normalized inputs directly
                 design_row_normalized = self.create_design_matrix(res.x.reshape(1, -1), bits_array)
@@ -2610,15 +3334,17 @@ class CSRApp:
                 }
         
         except Exception as e:
-            print(f"Optimization failed: {str(e)}")
+            log_opt.warning('Optimization failed: %s', str(e))
         
         return None
 
+    @Profiling.timed()
     def _find_extremum_heuristic(self, beta, bits_array, bounds_for_opt, x0_for_opt, extremum_type, X_context_for_opt, max_active_factors):
         """Heuristic approach for cardinality-constrained optimization for large factor counts"""
-        print(f"Using improved heuristic approach for {max_active_factors} active factors")
+        log_opt.debug('Using improved heuristic approach for %s active factors', max_active_factors)
         
         def csr_func_for_optimizer(x_point_in_opt_scale):
+            Profiling.count_eval("_find_extremum_heuristic")
             x_point_reshaped = np.array(x_point_in_opt_scale).reshape(1, -1)
             design_row = self.create_design_matrix(x_point_reshaped, bits_array)
             if design_row.shape[1] == 0: return 0
@@ -2672,40 +3398,10 @@ class CSRApp:
                     active_bounds = [bounds_for_opt[i] for i in top_indices]
                     active_x0 = x_sparse[top_indices]
                     
-                    # Add CSR constraints for active factors
-                    active_constraints = []
-                    for limit_name, limit_data in self.csr_limits.items():
-                        factors = limit_data.get('factors', [])
-                        limit_value = limit_data.get('value', 0)
-                        limit_type = limit_data.get('type', 'sum')
-                        
-                        active_factors_in_limit = [f for f in factors if f in top_indices]
-                        if not active_factors_in_limit:
-                            continue
-                        
-                        if limit_type == 'sum':
-                            def make_active_sum_constraint(factors_list, limit_val, norm_min, norm_max, norm_type, top_indices_list):
-                                def constraint_func(x_active):
-                                    x_full = np.zeros(num_factors)
-                                    x_full[top_indices_list] = x_active
-                                    
-                                    # Convert to original scale for constraint
-                                    if norm_type == "[-1, 1]":
-                                        x_orig = (x_full + 1) / 2 * (norm_max - norm_min) + norm_min
-                                    elif norm_type == "[0, 1]":
-                                        x_orig = x_full * (norm_max - norm_min) + norm_min
-                                    else:
-                                        x_orig = x_full
-                                    
-                                    total = sum(x_orig[i] for i in factors_list)
-                                    return limit_val - total
-                                return constraint_func
-                            
-                            constraint = {'type': 'ineq', 
-                                        'fun': make_active_sum_constraint(factors, limit_value, 
-                                                                        self.norm_x_min, self.norm_x_max, 
-                                                                        self.norm_select.get(), top_indices)}
-                            active_constraints.append(constraint)
+                    # Sum limits touching the active factors; the others stay at zero in the fitting scale
+                    active_constraints = Constraints.compile_limits(self.csr_limits, num_factors, self.normalization,
+                                                                    types=('sum',)) \
+                        .restrict(top_indices, np.zeros(num_factors)).slsqp_constraints()
                     
                     # Optimize the active factors
                     if active_constraints:
@@ -2732,12 +3428,7 @@ class CSRApp:
                 active_count = np.sum(np.abs(x_final) > 1e-6)
                 
                 # Convert to original scale
-                if self.norm_select.get() == "[-1, 1]":
-                    res_orig = (x_final + 1) / 2 * (self.norm_x_max - self.norm_x_min) + self.norm_x_min
-                elif self.norm_select.get() == "[0, 1]":
-                    res_orig = x_final * (self.norm_x_max - self.norm_x_min) + self.norm_x_min
-                else:
-                    res_orig = x_final
+                res_orig = self.normalization.inverse(x_final)
                 
                 return {
                     'x': res_orig, 
@@ -2748,11 +3439,12 @@ class CSRApp:
                 }
         
         except Exception as e:
-            print(f"Improved heuristic optimization failed: {str(e)}")
+            log_opt.warning('Improved heuristic optimization failed: %s', str(e))
         
         return None
 
     # Modified optimization methods to use CSR limits
+    @Profiling.timed()
     def find_extremum(self, beta, bits_array, bounds_for_opt, x0_for_opt, extremum_type, X_context_for_opt):
         if beta is None or bits_array is None or X_context_for_opt is None:
             return {'x': np.array([]), 'value': np.nan}
@@ -2761,23 +3453,12 @@ class CSRApp:
             return {'x': np.array([]), 'value': np.nan}
 
         def csr_func_for_optimizer(x_point_in_opt_scale):
+            Profiling.count_eval("find_extremum")
             x_point_reshaped = np.array(x_point_in_opt_scale).reshape(1, -1)
             design_row = self.create_design_matrix(x_point_reshaped, bits_array)
             if design_row.shape[1] == 0: return 0
             return np.dot(design_row[0], beta)
 
-        objective_func_val = csr_func_for_optimizer
-        if extremum_type == 'maximum':
-            objective_to_minimize = lambda x_vals: -csr_func_for_optimizer(x_vals)
-        elif extremum_type == 'minimum':
-            objective_to_minimize = csr_func_for_optimizer
-        elif extremum_type == 'maximum_absolute_value':
-            objective_to_minimize = lambda x_vals: -np.abs(csr_func_for_optimizer(x_vals))
-        elif extremum_type == 'minimum_absolute_value':
-            objective_to_minimize = lambda x_vals: np.abs(csr_func_for_optimizer(x_vals))
-        else:
-            objective_to_minimize = csr_func_for_optimizer
-
         num_factors_in_context = X_context_for_opt.shape[1]
         if len(x0_for_opt) != num_factors_in_context:
             messagebox.showerror("Optimization Error", f"Initial guess x0 length ({len(x0_for_opt)}) mismatch with factor count ({num_factors_in_context}).")
@@ -2786,131 +3467,47 @@ class CSRApp:
             messagebox.showerror("Optimization Error", f"Bounds length ({len(bounds_for_opt)}) mismatch with factor count ({num_factors_in_context}).")
             return {'x': np.array([np.nan]*num_factors_in_context), 'value': np.nan}
 
-        # Add constraints from CSR limits - APPLY IN ORIGINAL SCALE
-        constraints = []
-        for limit_name, limit_data in self.csr_limits.items():
-            factors = limit_data.get('factors', [])
-            limit_value = limit_data.get('value', 0)
-            limit_type = limit_data.get('type', 'sum')
-            
-            if limit_type == 'sum':
-                def make_sum_constraint(factors_list, limit_val, norm_min, norm_max, norm_type):
-                    def constraint_func(x_norm):
-                        # Convert normalized values back to original scale for constraint
-                        if norm_type == "[-1, 1]":
-                            x_orig = (x_norm + 1) / 2 * (norm_max - norm_min) + norm_min
-                        elif norm_type == "[0, 1]":
-                            x_orig = x_norm * (norm_max - norm_min) + norm_min
-                        else:
-                            x_orig = x_norm
-                        
-                        total = sum(x_orig[i] for i in factors_list)
-                        return limit_val - total  # total <= limit_val
-                    return constraint_func
-                
-                constraint = {'type': 'ineq', 
-                            'fun': make_sum_constraint(factors, limit_value, 
-                                                    self.norm_x_min, self.norm_x_max, 
-                                                    self.norm_select.get())}
-                constraints.append(constraint)
-                
-            elif limit_type == 'sum_equality':  # NEW: Equality constraint
-                def make_sum_equality_constraint(factors_list, limit_val, norm_min, norm_max, norm_type):
-                    def constraint_func(x_norm):
-                        # Convert normalized values back to original scale for constraint
-                        if norm_type == "[-1, 1]":
-                            x_orig = (x_norm + 1) / 2 * (norm_max - norm_min) + norm_min
-                        elif norm_type == "[0, 1]":
-                            x_orig = x_norm * (norm_max - norm_min) + norm_min
-                        else:
-                            x_orig = x_norm
-                        
-                        total = sum(x_orig[i] for i in factors_list)
-                        return total - limit_val  # total - limit_val = 0 => total = limit_val
-                    return constraint_func
-                
-                constraint = {'type': 'eq',  # CHANGE: Use equality constraint type
-                            'fun': make_sum_equality_constraint(factors, limit_value, 
-                                                            self.norm_x_min, self.norm_x_max, 
-                                                            self.norm_select.get())}
-                constraints.append(constraint)
-                
-            elif limit_type == 'product':
-                def make_product_constraint(factors_list, limit_val, norm_min, norm_max, norm_type):
-                    def constraint_func(x_norm):
-                        # Convert normalized values back to original scale for constraint
-                        if norm_type == "[-1, 1]":
-                            x_orig = (x_norm + 1) / 2 * (norm_max - norm_min) + norm_min
-                        elif norm_type == "[0, 1]":
-                            x_orig = x_norm * (norm_max - norm_min) + norm_min
-                        else:
-                            x_orig = x_norm
-                        
-                        product = np.prod([x_orig[i] for i in factors_list])
-                        return limit_val - product
-                    return constraint_func
-                
-                constraint = {'type': 'ineq', 
-                            'fun': make_product_constraint(factors, limit_value,
-                                                        self.norm_x_min, self.norm_x_max,
-                                                        self.norm_select.get())}
-                constraints.append(constraint)
+        # CSR limits are stated in original units; compile them once for the fitting scale
+        limits = Constraints.compile_limits(self.csr_limits, num_factors_in_context, self.normalization)
+        constraints = limits.slsqp_constraints()
 
         # Debug: Print constraints before optimization
-        print(f"Number of constraints: {len(constraints)}")
-        print(f"Normalization type: {self.norm_select.get()}")
-        print(f"Norm min: {self.norm_x_min}")
-        print(f"Norm max: {self.norm_x_max}")
+        log_opt.debug('Number of limits: %s', len(limits))
+        log_opt.debug('Normalization type: %s', self.normalization.norm_type)
+        log_opt.debug('Norm min: %s', self.normalization.x_min)
+        log_opt.debug('Norm max: %s', self.normalization.x_max)
 
         # Perform optimization with constraints if any
         try:
-            if constraints:
-                res = minimize(objective_to_minimize, x0_for_opt, bounds=bounds_for_opt, 
-                            method='SLSQP', constraints=constraints, options={'disp': True})
+            if self.global_search_var.get():
+                res = GlobalSearch.global_extremum(
+                    csr_func_for_optimizer, bounds_for_opt, extremum_type, self.csr_limits,
+                    batch_func=lambda X: CSRModel.evaluate_csr(X, beta, bits_array),
+                    normalization=self.normalization, x0=x0_for_opt)
             else:
-                res = minimize(objective_to_minimize, x0_for_opt, bounds=bounds_for_opt, method='L-BFGS-B')
-            
-            # Check if optimization was successful
-            if not res.success:
-                pass
+                res = CSRModel.find_extremum(csr_func_for_optimizer, bounds_for_opt, x0_for_opt, extremum_type, constraints)
             
-            # Verify constraints are satisfied in ORIGINAL SCALE
-            if constraints:
-                print("Verifying constraints in ORIGINAL SCALE:")
-                # Convert result to original scale for verification
-                if self.norm_select.get() == "[-1, 1]":
-                    res_orig = (res.x + 1) / 2 * (self.norm_x_max - self.norm_x_min) + self.norm_x_min
-                elif self.norm_select.get() == "[0, 1]":
-                    res_orig = res.x * (self.norm_x_max - self.norm_x_min) + self.norm_x_min
-                else:
-                    res_orig = res.x
-                    
-                for i, constr in enumerate(constraints):
-                    constraint_value = constr['fun'](res.x)  # This now uses original scale conversion
-                    print(f"Constraint {i}: {constraint_value} (should be >= 0)")
-                    if constraint_value < -1e-3:  # Allow small numerical tolerance
-                        messagebox.showwarning("Constraint Violation", 
-                                            f"Constraint {i} is violated: {constraint_value}")
+            # Verify the limits are satisfied (allowing small numerical tolerance)
+            if len(limits):
+                violation = limits.violation(res.x, eq_tolerance=1e-3)[0]
+                log_opt.debug('Limit violation at result: %s', violation)
+                if violation > 1e-3:
+                    messagebox.showwarning("Constraint Violation",
+                                        f"CSR limits are violated by {violation:.4g}")
             
-            # Calculate the final value - USE NORMALIZED VALUES DIRECTLY
-            if self.norm_select.get() == "[-1, 1]":
-                res_orig = (res.x + 1) / 2 * (self.norm_x_max - self.norm_x_min) + self.norm_x_min
-            elif self.norm_select.get() == "[0, 1]":
-                res_orig = res.x * (self.norm_x_max - self.norm_x_min) + self.norm_x_min
-            else:
-                res_orig = res.x
+            res_orig = self.normalization.inverse(res.x)
             
             # CRITICAL FIX: Calculate extremum value using normalized inputs directly
             design_row_normalized = self.create_design_matrix(res.x.reshape(1, -1), bits_array)
             extremum_value = np.dot(design_row_normalized[0], beta)
             
             # Debug: Print the calculation details
-            print(f"Optimization result (normalized): {res.x}")
-            print(f"Optimization result (original): {res_orig}")
-            print(f"Design row (normalized): {design_row_normalized[0]}")
-            print(f"Coefficients: {beta}")
-            print(f"Extremum value (calculated): {extremum_value}")
-            print(f"Sum of factors (original): {sum(res_orig)}")
+            log_opt.debug('Optimization result (normalized): %s', res.x)
+            log_opt.debug('Optimization result (original): %s', res_orig)
+            log_opt.debug('Design row (normalized): %s', design_row_normalized[0])
+            log_opt.debug('Coefficients: %s', beta)
+            log_opt.debug('Extremum value (calculated): %s', extremum_value)
+            log_opt.debug('Sum of factors (original): %s', sum(res_orig))
             
             return {'x': res_orig, 'value': extremum_value, 'x_normalized': res.x}   
                  
@@ -2918,103 +3515,54 @@ class CSRApp:
             messagebox.showerror("Optimization Error", f"Optimization failed: {str(e)}")
             return {'x': np.array([np.nan]*num_factors_in_context), 'value': np.nan}
     
+    @Profiling.timed()
     def find_extremum_comprehensive(self, bounds_for_opt, x0_for_opt, extremum_type):
         """Find extremum for the comprehensive function that combines multiple results"""
         if not hasattr(self, 'comprehensive_function'):
             return {'x': np.array([]), 'value': np.nan}
 
         def comprehensive_func_for_optimizer(x_point_in_opt_scale):
+            Profiling.count_eval("find_extremum_comprehensive")
             return self.comprehensive_function(x_point_in_opt_scale)
 
-        # Set up the objective function based on extremum type
-        if extremum_type == 'maximum':
-            objective_to_minimize = lambda x_vals: -comprehensive_func_for_optimizer(x_vals)
-        elif extremum_type == 'minimum':
-            objective_to_minimize = comprehensive_func_for_optimizer
-        elif extremum_type == 'maximum_absolute_value':
-            objective_to_minimize = lambda x_vals: -np.abs(comprehensive_func_for_optimizer(x_vals))
-        elif extremum_type == 'minimum_absolute_value':
-            objective_to_minimize = lambda x_vals: np.abs(comprehensive_func_for_optimizer(x_vals))
-        else:
-            objective_to_minimize = comprehensive_func_for_optimizer
-
-        # Add constraints from CSR limits - APPLY IN ORIGINAL SCALE
-        constraints = []
-        for limit_name, limit_data in self.csr_limits.items():
-            factors = limit_data.get('factors', [])
-            limit_value = limit_data.get('value', 0)
-            limit_type = limit_data.get('type', 'sum')
-            
-            if limit_type == 'sum':
-                def make_sum_constraint(factors_list, limit_val):
-                    def constraint_func(x_orig):
-                        # Note: For comprehensive optimization, we're already in original scale
-                        total = sum(x_orig[i] for i in factors_list)
-                        return limit_val - total  # total <= limit_val
-                    return constraint_func
-                
-                constraint = {'type': 'ineq', 
-                            'fun': make_sum_constraint(factors, limit_value)}
-                constraints.append(constraint)
-                
-            elif limit_type == 'sum_equality':  # NEW: Equality constraint
-                def make_sum_equality_constraint(factors_list, limit_val):
-                    def constraint_func(x_orig):
-                        # Note: For comprehensive optimization, we're already in original scale
-                        total = sum(x_orig[i] for i in factors_list)
-                        return total - limit_val  # total - limit_val = 0 => total = limit_val
-                    return constraint_func
-                
-                constraint = {'type': 'eq',  # CHANGE: Use equality constraint type
-                            'fun': make_sum_equality_constraint(factors, limit_value)}
-                constraints.append(constraint)
-                
-            elif limit_type == 'product':
-                def make_product_constraint(factors_list, limit_val):
-                    def constraint_func(x_orig):
-                        # Note: For comprehensive optimization, we're already in original scale
-                        product = np.prod([x_orig[i] for i in factors_list])
-                        return limit_val - product
-                    return constraint_func
-                
-                constraint = {'type': 'ineq', 
-                            'fun': make_product_constraint(factors, limit_value)}
-                constraints.append(constraint)
+        # CSR limits compiled for the original scale, which is where the comprehensive search runs
+        limits = Constraints.compile_limits(self.csr_limits, len(bounds_for_opt))
+        constraints = limits.slsqp_constraints()
 
         # Debug: Print constraints before optimization
-        print(f"Number of constraints: {len(constraints)}")
-        print("Comprehensive optimization - using original scale constraints")
+        log_opt.debug('Number of limits: %s', len(limits))
+        log_opt.debug('Comprehensive optimization - using original scale constraints')
 
         # Perform the optimization - note bounds are in original scale
         try:
-            if constraints:
-                res = minimize(objective_to_minimize, x0_for_opt, bounds=bounds_for_opt, 
-                            method='SLSQP', constraints=constraints, options={'disp': True})
+            if self.global_search_var.get():
+                res = GlobalSearch.global_extremum(
+                    comprehensive_func_for_optimizer, bounds_for_opt, extremum_type, self.csr_limits,
+                    batch_func=self.comprehensive_function.batch, x0=x0_for_opt)
             else:
-                res = minimize(objective_to_minimize, x0_for_opt, bounds=bounds_for_opt, method='L-BFGS-B')
+                res = CSRModel.find_extremum(comprehensive_func_for_optimizer, bounds_for_opt, x0_for_opt,
+                                             extremum_type, constraints)
             
             # Check if optimization was successful
             if not res.success:
                 messagebox.showwarning("Optimization Warning", 
                                     f"Optimization may not have converged: {res.message}")
             
-            # Verify constraints are satisfied
-            if constraints:
-                print("Verifying constraints:")
-                for i, constr in enumerate(constraints):
-                    constraint_value = constr['fun'](res.x)
-                    print(f"Constraint {i}: {constraint_value} (should be >= 0)")
-                    if constraint_value < -1e-3:  # Allow small numerical tolerance
-                        messagebox.showwarning("Constraint Violation", 
-                                            f"Constraint {i} is violated: {constraint_value}")
+            # Verify the limits are satisfied (allowing small numerical tolerance)
+            if len(limits):
+                violation = limits.violation(res.x, eq_tolerance=1e-3)[0]
+                log_opt.debug('Limit violation at result: %s', violation)
+                if violation > 1e-3:
+                    messagebox.showwarning("Constraint Violation",
+                                        f"CSR limits are violated by {violation:.4g}")
             
             # CRITICAL FIX: Always calculate using the comprehensive function
             extremum_value = comprehensive_func_for_optimizer(res.x)
             
             # Debug: Print the result
-            print(f"Optimization result (original): {res.x}")
-            print(f"Sum of factors: {sum(res.x)}")
-            print(f"Extremum value: {extremum_value}")
+            log_opt.debug('Optimization result (original): %s', res.x)
+            log_opt.debug('Sum of factors: %s', sum(res.x))
+            log_opt.debug('Extremum value: %s', extremum_value)
             
             return {
                 'x': res.x,  # Already in original scale for comprehensive
@@ -3052,54 +3600,34 @@ class CSRApp:
         Difference: {abs(calculated_value - displayed_value):.2e}
         """
         
-        print(verification_text)
         return verification_text
 
     def _normalize_point(self, x_point_original_scale):
-        """Debug this method to ensure proper normalization"""
+        """Original-scale point -> fitting scale of the current single fit"""
         if x_point_original_scale is None: 
-            print("DEBUG: _normalize_point received None")
+            log_opt.debug('_normalize_point received None')
             return None
             
         x_original_np = np.array(x_point_original_scale, dtype=float)
-        norm_type = self.norm_select.get()
-        
-        print(f"DEBUG: Normalizing point - original: {x_original_np}, type: {norm_type}")
-        
-        if norm_type == "No normalization" or self.norm_x_min is None or self.norm_x_max is None:
-            print("DEBUG: No normalization applied")
+        if self.normalization is None or self.normalization.is_identity:
+            log_opt.debug('No normalization applied')
             return x_original_np
             
-        if len(x_original_np) != len(self.norm_x_min): 
-            print(f"DEBUG: Dimension mismatch: point {len(x_original_np)} vs min {len(self.norm_x_min)}")
+        if len(x_original_np) != len(self.normalization): 
+            log_opt.debug('Dimension mismatch: point %s vs normalization %s', len(x_original_np), len(self.normalization))
             return None
             
-        range_val = self.norm_x_max - self.norm_x_min
-        range_val[range_val == 0] = 1
-        
-        if norm_type == "[-1, 1]":
-            result = 2 * (x_original_np - self.norm_x_min) / range_val - 1
-        elif norm_type == "[0, 1]":
-            result = (x_original_np - self.norm_x_min) / range_val
-        else:
-            result = x_original_np
-            
-        print(f"DEBUG: Normalization result: {result}")
+        result = self.normalization.forward(x_original_np)
+        log_opt.debug('Normalization result: %s', result)
         return result
 
     def _unnormalize_point(self, x_point_fitting_scale):
         if x_point_fitting_scale is None: return None
         x_fitting_np = np.array(x_point_fitting_scale, dtype=float)
-        norm_type = self.norm_select.get()
-        if norm_type == "No normalization" or self.norm_x_min is None or self.norm_x_max is None:
+        if self.normalization is None or self.normalization.is_identity:
             return x_fitting_np
-        if len(x_fitting_np) != len(self.norm_x_min): return None
-        range_val = self.norm_x_max - self.norm_x_min
-        if norm_type == "[-1, 1]":
-            return (x_fitting_np + 1) / 2 * range_val + self.norm_x_min
-        elif norm_type == "[0, 1]":
-            return x_fitting_np * range_val + self.norm_x_min
-        return x_fitting_np
+        if len(x_fitting_np) != len(self.normalization): return None
+        return self.normalization.inverse(x_fitting_np)
 
     def generate_equation_and_definitions(self, beta, bits_array, n_factors):
         if beta is None or bits_array is None or bits_array.size == 0 or len(beta) != bits_array.shape[0]:
@@ -3235,243 +3763,138 @@ class CSRApp:
         # Add sign (handled when joining terms)
         return f"{'+' if coef >= 0 else '-'} {term_str}"
 
-    def plot_results(self, n_factors, x_plot_idx=0, y_plot_idx=1):
-        print(f"DEBUG: plot_results called with n_factors={n_factors}")
-        print(f"DEBUG: has result_functions: {hasattr(self, 'result_functions')}")
-        
-        self.figure1.clf() 
-        self.figure1.subplots_adjust(bottom=0.18, left=0.18, top=0.9, right=0.95) 
-        self.figure1.patch.set_facecolor('#F0F0F0')
-        ax1 = self.figure1.add_subplot(111, facecolor='#ffffff') 
+    def _build_results_axes(self, figure):
+        """Axes of the Actual vs. Predicted chart"""
+        figure.subplots_adjust(bottom=0.18, left=0.18, top=0.9, right=0.95)
+        figure.patch.set_facecolor('#F0F0F0')
+        ax1 = figure.add_subplot(111, facecolor='#ffffff')
         ax1.grid(True, linestyle=':', alpha=0.6, color='gray')
-        
-        for spine in ax1.spines.values(): 
+        for spine in ax1.spines.values():
             spine.set_edgecolor('gray')
-        
-        # Handle comprehensive optimization case - FIXED VERSION
-        if hasattr(self, 'result_functions'):
-            print(f"DEBUG: Plotting comprehensive results with {len(self.result_functions)} outcomes")
+        ax1.set_xlabel('Actual Values', fontsize=10, fontweight='bold')
+        ax1.set_ylabel('Predicted Values', fontsize=10, fontweight='bold')
+        ax1.set_title('Actual vs. Predicted Performance', fontsize=11, fontweight='bold')
+        return {'ax': ax1}
+
+    def _show_placeholder(self, plot, message, facecolor='white'):
+        """Replace a plot with a single grey message"""
+        plot.reset('placeholder')
+        ax = plot.figure.add_subplot(111, facecolor=facecolor)
+        ax.text(0.5, 0.5, message, ha="center", va="center", fontsize=10, color='gray')
+        for spine in ax.spines.values():
+            spine.set_edgecolor('gray')
+        plot.canvas.draw_idle()
+
+    @Profiling.timed()
+    def plot_results(self, n_factors):
+        """
+        Actual vs. Predicted chart, plus the single-factor response curve. With two or more
+        factors the response surface belongs to update_3d_plot.
+        """
+        log_plot.debug('plot_results called with n_factors=%s', n_factors)
+        plot = self.results_plot
+        ax1 = plot.layout('actual_vs_predicted', self._build_results_axes)['ax']
+        plot.begin()
+
+        bbox = dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8)
+        if hasattr(self, 'result_functions') and self.df is None:
+            plot.text('message', ax1, 0.5, 0.5, "Fitted values need the data\n(model loaded from a file)",
+                      ha="center", va="center", fontsize=10, color='gray')
+        elif hasattr(self, 'result_functions'):
+            log_plot.debug('Plotting comprehensive results with %s outcomes', len(self.result_functions))
             # For comprehensive optimization, we'll show all individual fits
             colors = plt.cm.tab10(np.linspace(0, 1, len(self.result_functions)))
-            
-            all_y = []
-            all_y_pred = []
-            
-            for i, (result_col, func_data) in enumerate(self.result_functions.items()):
-                y = func_data['y']
-                y_pred = func_data['y_pred']  # Use stored predictions
-                
-                print(f"DEBUG: Outcome {result_col} - y shape: {y.shape}, y_pred shape: {y_pred.shape}")
-                
-                # Store for overall min/max calculation
-                all_y.extend(y)
-                all_y_pred.extend(y_pred)
-                
-                # Plot this outcome
-                ax1.scatter(y, y_pred, alpha=0.7, edgecolors='#333333', s=40, 
-                            color=colors[i], label=self.col_name_mapping.get(result_col, result_col))
-            
-            # Calculate overall min/max for perfect fit line
-            if all_y and all_y_pred:
-                min_val = min(min(all_y), min(all_y_pred))
-                max_val = max(max(all_y), max(all_y_pred))
-                
-                ax1.plot([min_val, max_val], [min_val, max_val], 'r--', lw=1.5, label='Perfect Fit')
+            # Only coefficients are kept per outcome: the fitted values are recomputed here
+            all_y = self.df[list(self.result_functions)].to_numpy(dtype=float)
+            all_y_pred = CSRModel.outcome_predictions(self.result_functions)(self.X_original_scale)
+            for i, result_col in enumerate(self.result_functions):
+                plot.scatter(f'outcome {i}', ax1, all_y[:, i], all_y_pred[:, i], alpha=0.7, edgecolors='#333333', s=40,
+                             color=tuple(colors[i]), label=self.col_name_mapping.get(result_col, result_col))
+
+            if all_y.size:
+                min_val = min(all_y.min(), all_y_pred.min())
+                max_val = max(all_y.max(), all_y_pred.max())
+                plot.line('perfect_fit', ax1, [min_val, max_val], [min_val, max_val], 'r--', lw=1.5, label='Perfect Fit')
                 ax1.legend(fontsize=9)
-                
-                # Calculate and display overall R² for comprehensive case
-                if len(all_y) == len(all_y_pred):
-                    overall_r2 = np.corrcoef(all_y, all_y_pred)[0,1]**2
-                    ax1.text(0.05, 0.95, f'Overall R² = {overall_r2:.4f}', 
-                            transform=ax1.transAxes, fontsize=10, 
-                            bbox=dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8))
-                    print(f"DEBUG: Overall R² for comprehensive: {overall_r2:.4f}")
+                overall_r2 = np.corrcoef(all_y.ravel(), all_y_pred.ravel())[0,1]**2
+                plot.text('r2', ax1, 0.05, 0.95, f'Overall R² = {overall_r2:.4f}',
+                          transform=ax1.transAxes, fontsize=10, bbox=bbox)
+                log_plot.debug('Overall R² for comprehensive: %.4f', overall_r2)
             else:
-                ax1.text(0.5, 0.5, "No prediction data available", 
-                        ha="center", va="center", fontsize=10, color='gray')
-                print("DEBUG: No prediction data available for comprehensive plot")
-                
+                plot.text('message', ax1, 0.5, 0.5, "No prediction data available",
+                          ha="center", va="center", fontsize=10, color='gray')
+                log_plot.debug('No prediction data available for comprehensive plot')
+
         elif self.y is not None and self.y_pred is not None:
-            print("DEBUG: Plotting single result")
-            # Single result case
-            ax1.scatter(self.y, self.y_pred, alpha=0.7, edgecolors='#333333', s=40, color="#007ACC")
+            plot.scatter('outcome 0', ax1, self.y, self.y_pred, alpha=0.7, edgecolors='#333333', s=40, color="#007ACC")
             min_val, max_val = min(self.y.min(), self.y_pred.min()), max(self.y.max(), self.y_pred.max())
-            ax1.plot([min_val, max_val], [min_val, max_val], 'r--', lw=1.5, label='Perfect Fit')
-            
-            # Calculate and display R² for single result case
+            plot.line('perfect_fit', ax1, [min_val, max_val], [min_val, max_val], 'r--', lw=1.5, label='Perfect Fit')
             train_r2 = np.corrcoef(self.y, self.y_pred)[0,1]**2
-            ax1.text(0.05, 0.95, f'R² = {train_r2:.4f}', 
-                    transform=ax1.transAxes, fontsize=10, 
-                    bbox=dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8))
-            
+            plot.text('r2', ax1, 0.05, 0.95, f'R² = {train_r2:.4f}', transform=ax1.transAxes, fontsize=10, bbox=bbox)
             ax1.legend(fontsize=9)
         else:
-            ax1.text(0.5, 0.5, "No data to plot", 
-                    ha="center", va="center", fontsize=10, color='gray')
-            print("DEBUG: No data available for plotting")
-        
-        ax1.set_xlabel('Actual Values', fontsize=10, fontweight='bold')
-        ax1.set_ylabel('Predicted Values', fontsize=10, fontweight='bold')
-        ax1.set_title('Actual vs. Predicted Performance', fontsize=11, fontweight='bold')
-        
-        print("DEBUG: Drawing canvas1")
-        self.canvas1.draw()
-        print("DEBUG: Canvas1 drawn")
+            plot.text('message', ax1, 0.5, 0.5, "No data to plot", ha="center", va="center", fontsize=10, color='gray')
+            log_plot.debug('No data available for plotting')
+
+        # Drop the previous pass's artists first, so only a message shown now hides the legend
+        plot.prune()
+        if 'message' in plot.artists and ax1.get_legend() is not None:
+            ax1.get_legend().remove()
+        # The perfect-fit line spans every point, so it sets the data limits
+        ax1.relim()
+        ax1.autoscale_view()
+        plot.finish()
+
+        if (not hasattr(self, 'comprehensive_function') and (self.coefficients is None or self.bits_array is None or
+            self.X_original_scale is None or n_factors == 0)):
+            self._show_placeholder(self.surface_plot, "Fit model to see surface plot", facecolor='#ffffff')
+        elif n_factors == 1:
+            self._plot_single_factor()
 
-        # The rest of your existing 3D plot code remains the same...
-        self.figure2.clf()
+    def _plot_single_factor(self):
+        """Response curve of a one-factor model with the data and the extremum"""
+        self.surface_plot.reset('single_factor')
         self.figure2.subplots_adjust(bottom=0.18, left=0.1, right=0.85, top=0.9)
         self.figure2.patch.set_facecolor('#F0F0F0')
-        ax2_facecolor = '#ffffff'
-        
-        if (not hasattr(self, 'comprehensive_function') and (self.coefficients is None or self.bits_array is None or 
-            self.X_original_scale is None or n_factors == 0)):
-            ax2 = self.figure2.add_subplot(111, facecolor=ax2_facecolor)
-            ax2.text(0.5, 0.5, "Fit model to see surface plot", 
-                    ha="center", va="center", fontsize=10, color='gray')
-            for spine in ax2.spines.values(): 
-                spine.set_edgecolor('gray')
-            self.canvas2.draw()
-            return
+        ax2 = self.figure2.add_subplot(111, facecolor='#ffffff')
+        ax2.grid(True, linestyle=':', alpha=0.6, color='gray')
+        for spine in ax2.spines.values():
+            spine.set_edgecolor('gray')
 
-        if n_factors == 1:
-            ax2 = self.figure2.add_subplot(111, facecolor=ax2_facecolor)
-            ax2.grid(True, linestyle=':', alpha=0.6, color='gray')
-            for spine in ax2.spines.values(): 
-                spine.set_edgecolor('gray')
-            
-            x_orig_plot_axis = np.linspace(self.X_original_scale[:, 0].min(), 
-                                          self.X_original_scale[:, 0].max(), 100)
-            points_to_eval_csr_orig = x_orig_plot_axis.reshape(-1,1)
-            
-            # Handle comprehensive vs single result
-            if hasattr(self, 'comprehensive_function'):
-                z_csr_values = np.array([self.comprehensive_function(p) for p in points_to_eval_csr_orig])
-            else:
-                z_csr_values = np.array([self.evaluate_csr_at_point(self._normalize_point(p)) 
-                                      if self._normalize_point(p) is not None else np.nan 
-                                      for p in points_to_eval_csr_orig])
-            
-            ax2.plot(x_orig_plot_axis, z_csr_values, label='CSR Function', color="#D83B01", lw=2.5)
-            
-            # Plot original data points for all results in comprehensive case
-            if hasattr(self, 'result_functions'):
-                colors = plt.cm.tab10(np.linspace(0, 1, len(self.result_functions)))
-                for i, result_col in enumerate(self.result_functions):
-                    ax2.scatter(self.X_original_scale[:, 0], 
-                               self.result_functions[result_col]['y'], 
-                               color=colors[i], s=40, alpha=0.7, 
-                               label=self.col_name_mapping.get(result_col, result_col),
-                               edgecolors='#333333')
-                ax2.legend(fontsize=9)
-            else:
-                ax2.scatter(self.X_original_scale[:, 0], self.y, color="#007ACC", 
-                           s=40, alpha=0.7, label='Original Data', edgecolors='#333333')
+        x_orig_plot_axis = np.linspace(self.X_original_scale[:, 0].min(),
+                                      self.X_original_scale[:, 0].max(), 100)
+        points_to_eval_csr_orig = x_orig_plot_axis.reshape(-1,1)
+        z_csr_values = self._surface_batch()(points_to_eval_csr_orig)
+        ax2.plot(x_orig_plot_axis, z_csr_values, label='CSR Function', color="#D83B01", lw=2.5)
 
-            # Plot extremum point if available
-            if self.extremum_point and self.extremum_point['x'] is not None and len(self.extremum_point['x']) > 0:
-                if hasattr(self, 'comprehensive_function'):
-                    extremum_x_orig = self.extremum_point['x']
-                else:
-                    extremum_x_orig = self._unnormalize_point(self.extremum_point['x'])
-                
-                if extremum_x_orig is not None and len(extremum_x_orig) > 0:
-                    ax2.scatter([extremum_x_orig[0]], [self.extremum_point['value']], 
-                               c='gold', s=200, marker='*', edgecolor='black', 
-                               linewidth=1, label='Extremum', zorder=5)
-                    ax2.legend(fontsize=9)
-
-            factor_disp_name = self.col_name_mapping.get(self.factor_cols[0], self.factor_cols[0])
-            result_disp_name = "Combined Result" if hasattr(self, 'comprehensive_function') else self.col_name_mapping.get("result", "Result")
-            ax2.set_xlabel(factor_disp_name, fontsize=10, fontweight='bold')
-            ax2.set_ylabel(result_disp_name, fontsize=10, fontweight='bold')
-            ax2.set_title(f'CSR Output vs. {factor_disp_name}', fontsize=11, fontweight='bold')
-
-        elif n_factors >= 2:
-            ax2 = self.figure2.add_subplot(111, projection='3d', facecolor=ax2_facecolor)
-            ax2.grid(True, linestyle=':', alpha=0.5)
-            
-            for pane_ax in [ax2.xaxis, ax2.yaxis, ax2.zaxis]: 
-                pane_ax.set_pane_color((1.0, 1.0, 1.0, 0.0))
-                pane_ax.pane.set_edgecolor('#D0D0D0')
-            
-            x1_orig_plot_axis = np.linspace(self.X_original_scale[:, x_plot_idx].min(), 
-                                           self.X_original_scale[:, x_plot_idx].max(), 20)
-            x2_orig_plot_axis = np.linspace(self.X_original_scale[:, y_plot_idx].min(), 
-                                           self.X_original_scale[:, y_plot_idx].max(), 20)
-            x1_grid_orig, x2_grid_orig = np.meshgrid(x1_orig_plot_axis, x2_orig_plot_axis)
-            z_csr_values_grid = np.zeros_like(x1_grid_orig)
-            
-            # Get fixed values for other factors (use extremum point if available, otherwise mean)
-            fixed_factor_values_original_scale = np.mean(self.X_original_scale, axis=0)
-            if (self.extremum_point and self.extremum_point['x'] is not None and 
-                len(self.extremum_point['x']) == n_factors):
-                if hasattr(self, 'comprehensive_function'):
-                    fixed_factor_values_original_scale = self.extremum_point['x']
-                else:
-                    unnorm_temp = self._unnormalize_point(self.extremum_point['x'])
-                    if unnorm_temp is not None:
-                        fixed_factor_values_original_scale = unnorm_temp
-            
-            # Evaluate comprehensive function across the grid
-            for i_grid in range(x1_grid_orig.shape[0]):
-                for j_grid in range(x1_grid_orig.shape[1]):
-                    current_full_point_orig_scale = fixed_factor_values_original_scale.copy()
-                    current_full_point_orig_scale[x_plot_idx] = x1_grid_orig[i_grid, j_grid]
-                    current_full_point_orig_scale[y_plot_idx] = x2_grid_orig[i_grid, j_grid]
-                    
-                    if hasattr(self, 'comprehensive_function'):
-                        z_csr_values_grid[i_grid, j_grid] = self.comprehensive_function(current_full_point_orig_scale)
-                    else:
-                        current_full_point_norm_scale = self._normalize_point(current_full_point_orig_scale)
-                        if current_full_point_norm_scale is not None:
-                            z_csr_values_grid[i_grid, j_grid] = self.evaluate_csr_at_point(current_full_point_norm_scale)
-                        else:
-                            z_csr_values_grid[i_grid, j_grid] = np.nan
-            
-            # Plot the surface
-            surf = ax2.plot_surface(x1_grid_orig, x2_grid_orig, z_csr_values_grid, 
-                                   cmap='viridis', alpha=0.9, edgecolor='#555555', 
-                                   linewidth=0.15, antialiased=True)
-            
-            # Plot extremum point if available
-            if (self.extremum_point and self.extremum_point['x'] is not None and 
-                len(self.extremum_point['x']) == n_factors):
-                if hasattr(self, 'comprehensive_function'):
-                    extremum_x_orig_for_scatter = self.extremum_point['x']
-                else:
-                    extremum_x_orig_for_scatter = self._unnormalize_point(self.extremum_point['x'])
-                
-                if extremum_x_orig_for_scatter is not None:
-                    ax2.scatter([extremum_x_orig_for_scatter[x_plot_idx]], 
-                               [extremum_x_orig_for_scatter[y_plot_idx]], 
-                               [self.extremum_point['value']], 
-                               c='gold', s=200, marker='*', edgecolor='black', 
-                               linewidth=1, label='Extremum', depthshade=True, zorder=10)
-            
-            x_axis_name = self.col_name_mapping.get(self.factor_cols[x_plot_idx], self.factor_cols[x_plot_idx])
-            y_axis_name = self.col_name_mapping.get(self.factor_cols[y_plot_idx], self.factor_cols[y_plot_idx])
-            result_axis_name = "Combined Result" if hasattr(self, 'comprehensive_function') else self.col_name_mapping.get("result", "Result")
-            
-            ax2.set_xlabel(f"\n{x_axis_name}", fontsize=9, fontweight='bold', linespacing=2)
-            ax2.set_ylabel(f"\n{y_axis_name}", fontsize=9, fontweight='bold', linespacing=2)
-            ax2.set_zlabel(f"\n{result_axis_name}", fontsize=9, fontweight='bold', linespacing=2)
-            ax2.set_title('CSR Response Surface', fontsize=11, fontweight='bold', y=1.02)
-            
-            if (self.extremum_point and self.extremum_point['x'] is not None and 
-                len(self.extremum_point['x']) == n_factors):
-                ax2.legend(fontsize=8, facecolor='#F0F0F0', framealpha=0.8)
-            
-            cbar = self.figure2.colorbar(surf, ax=ax2, shrink=0.6, aspect=12, pad=0.15, format="%.2f")
-            cbar.ax.tick_params(labelsize=8)
-            cbar.outline.set_edgecolor('gray')
-            ax2.view_init(elev=28, azim=130)
-            
-            for axis_obj in [ax2.xaxis, ax2.yaxis, ax2.zaxis]:
-                axis_obj.set_tick_params(pad=3, labelsize=8)
-                axis_obj.label.set_size(9)
-        
-        self.canvas2.draw()
+        # Plot original data points for all results in comprehensive case (a model loaded
+        # from a file has none)
+        if hasattr(self, 'result_functions') and self.df is not None:
+            colors = plt.cm.tab10(np.linspace(0, 1, len(self.result_functions)))
+            for i, result_col in enumerate(self.result_functions):
+                ax2.scatter(self.X_original_scale[:, 0],
+                           self.df[result_col].to_numpy(),
+                           color=colors[i], s=40, alpha=0.7,
+                           label=self.col_name_mapping.get(result_col, result_col),
+                           edgecolors='#333333')
+            ax2.legend(fontsize=9)
+        elif self.y is not None:
+            ax2.scatter(self.X_original_scale[:, 0], self.y, color="#007ACC",
+                       s=40, alpha=0.7, label='Original Data', edgecolors='#333333')
+
+        _, extremum_x_orig, extremum_value = self._surface_fixed_point()
+        if extremum_x_orig is not None:
+            ax2.scatter([extremum_x_orig[0]], [extremum_value],
+                       c='gold', s=200, marker='*', edgecolor='black',
+                       linewidth=1, label='Extremum', zorder=5)
+            ax2.legend(fontsize=9)
+
+        factor_disp_name = self.col_name_mapping.get(self.factor_cols[0], self.factor_cols[0])
+        result_disp_name = "Combined Result" if hasattr(self, 'comprehensive_function') else self.col_name_mapping.get("result", "Result")
+        ax2.set_xlabel(factor_disp_name, fontsize=10, fontweight='bold')
+        ax2.set_ylabel(result_disp_name, fontsize=10, fontweight='bold')
+        ax2.set_title(f'CSR Output vs. {factor_disp_name}', fontsize=11, fontweight='bold')
+        self.canvas2.draw_idle()
 
     def evaluate_csr_at_point(self, x_point_in_fitting_scale):
         """Evaluate CSR function at a point (input should be in normalized scale)"""
@@ -3500,8 +3923,8 @@ class CSRApp:
             return None
             
         eval_choice = self.eval_point_combo.get()
-        print(f"DEBUG: Evaluation choice: {eval_choice}")
-        print(f"DEBUG: X_original_scale range: min={self.X_original_scale.min(axis=0)}, max={self.X_original_scale.max(axis=0)}")
+        log_coef.debug('Evaluation choice: %s', eval_choice)
+        log_coef.debug('X_original_scale range: min=%s, max=%s', self.X_original_scale.min(axis=0), self.X_original_scale.max(axis=0))
         
         if eval_choice == "Factors at Minimum": 
             point = self.X_original_scale.min(axis=0)
@@ -3512,56 +3935,32 @@ class CSRApp:
                 point = self.extremum_point['x']  # This is already in original scale
             else:
                 messagebox.showinfo("Info", "Extremum point not available. Using mean.")
-                point = np.mean(self.X_original_scale, axis=0)
+                point = self._factor_mean()
         else:
-            point = np.mean(self.X_original_scale, axis=0)
+            point = self._factor_mean()
         
-        print(f"DEBUG: Returning point: {point}")
+        log_coef.debug('Returning point: %s', point)
         return point
     
-    def debug_pie_chart_calculation(self, x_eval_original_scale_for_contrib):
-        """Debug method to trace pie chart calculation issues"""
-        print("\n=== PIE CHART DEBUGGING ===")
-        print(f"Evaluation point (original): {x_eval_original_scale_for_contrib}")
-        
-        # Normalize the point
-        x_eval_normalized = self._normalize_point(x_eval_original_scale_for_contrib)
-        print(f"Evaluation point (normalized): {x_eval_normalized}")
-        
-        # Calculate the total value using normalized inputs (should match extremum value)
-        design_row = self.create_design_matrix(x_eval_normalized.reshape(1, -1), self.bits_array)
-        total_value = np.dot(design_row[0], self.coefficients)
-        print(f"Total value from normalized inputs: {total_value}")
-        print(f"Extremum value for comparison: {self.extremum_point['value']}")
-        
-        # Test individual term calculations
-        print("\nIndividual term contributions:")
-        for i, (coef_val, bits_def) in enumerate(zip(self.coefficients, self.bits_array)):
-            contribution = self.calculate_term_contribution(coef_val, bits_def, x_eval_original_scale_for_contrib)
-            if abs(contribution) > 1e-6:  # Only show significant terms
-                print(f"Term {i}: bits={bits_def}, coef={coef_val:.6f}, contrib={contribution:.6f}")
-        
-        print("=== END DEBUGGING ===\n")
+    def debug_pie_chart_calculation(self, x_eval_scaled):
+        """Debug method to trace pie chart calculation issues (point in the fitting scale)"""
+        log_coef.debug('=== PIE CHART DEBUGGING ===')
+        log_coef.debug('Evaluation point (normalized): %s', x_eval_scaled)
+        if x_eval_scaled is None:
+            return
 
-    def calculate_term_contribution(self, coefficient_val, bits_row_def, x_eval_point_original_scale):
-        if x_eval_point_original_scale is None or len(x_eval_point_original_scale) != len(bits_row_def): 
-            return 0
-        
-        # CRITICAL: Normalize the evaluation point to match training data
-        x_eval_point_for_model_scale = self._normalize_point(x_eval_point_original_scale)
-        if x_eval_point_for_model_scale is None: 
-            return 0
-            
-        term_product_val = 1.0
-        for factor_idx, power_val in enumerate(bits_row_def):
-            if factor_idx >= len(x_eval_point_for_model_scale): 
-                continue
-            if power_val == 1: 
-                term_product_val *= x_eval_point_for_model_scale[factor_idx]
-            elif power_val == 2: 
-                term_product_val *= x_eval_point_for_model_scale[factor_idx]**2
-                
-        return coefficient_val * term_product_val
+        # All term values in one go; they sum to the model value (should match the extremum value)
+        term_values = Coefficients.term_values(self.coefficients, self.bits_array, x_eval_scaled)
+        log_coef.debug('Total value from normalized inputs: %s', term_values.sum())
+        if self.extremum_point:
+            log_coef.debug('Extremum value for comparison: %s', self.extremum_point['value'])
+
+        log_coef.debug('Individual term contributions:')
+        for i in np.flatnonzero(np.abs(term_values) > 1e-6):  # Only show significant terms
+            log_coef.debug('Term %s: bits=%s, coef=%.6f, contrib=%.6f',
+                           i, self.bits_array[i], self.coefficients[i], term_values[i])
+
+        log_coef.debug('=== END DEBUGGING ===')
 
     def plot_full_pie_and_get_term_details(self, ax, data_values_map, chart_title_suffix, canvas_to_draw, initial_start_angle=120.0):
         ax.cla()
@@ -3719,6 +4118,7 @@ class CSRApp:
         ax.axis('equal')
         canvas_to_draw.draw()
 
+    @Profiling.timed()
     def update_coefficient_pie_charts(self, initial_load=False):
         # Update factor definitions display
         factor_definitions = []
@@ -3744,7 +4144,7 @@ class CSRApp:
 
         # Handle case when no model is fitted
         placeholder_text = 'Load data & Run Fitting' if initial_load else "No data or model fitted."
-        if initial_load or self.coefficients is None or self.bits_array is None or self.df is None or not self.factor_cols:
+        if initial_load or self.coefficients is None or self.bits_array is None or self.X_original_scale is None or not self.factor_cols:
             for i in range(4):
                 if i < len(self.pie_axes):
                     self.pie_axes[i].cla()
@@ -3761,60 +4161,11 @@ class CSRApp:
             messagebox.showerror("Error", "Could not determine evaluation point for coefficient contributions.")
             return
     
-        self.debug_pie_chart_calculation(x_eval_original_scale_for_contrib)
-
-        # Calculate term contributions
-        term_contributions_map = {
-            'constant': 0.0,
-            'linear_total': 0.0,
-            'quadratic_total': 0.0,
-            'interaction_total': 0.0,
-            'linear_factors': {},
-            'quadratic_factors': {},
-            'interaction_factors': {}
-        }
-
-        for coef_val, bits_def in zip(self.coefficients, self.bits_array):
-            contribution_val = self.calculate_term_contribution(coef_val, bits_def, x_eval_original_scale_for_contrib)
-            sum_of_powers = np.sum(bits_def)
-            unique_powers = set(bits_def)
-
-            if sum_of_powers == 0:
-                term_contributions_map['constant'] += contribution_val
-            elif sum_of_powers == 1 and unique_powers.issubset({0, 1}):
-                idx = np.where(bits_def == 1)[0][0]
-                name = f"c{idx+1}"
-                term_contributions_map['linear_total'] += contribution_val
-                term_contributions_map['linear_factors'][name] = term_contributions_map['linear_factors'].get(name, 0) + contribution_val
-            elif sum_of_powers == 2 and 2 in unique_powers:
-                idx = np.where(bits_def == 2)[0][0]
-                name = f"c{idx+1}²"
-                term_contributions_map['quadratic_total'] += contribution_val
-                term_contributions_map['quadratic_factors'][name] = term_contributions_map['quadratic_factors'].get(name, 0) + contribution_val
-            elif sum_of_powers == 2 and unique_powers.issubset({0, 1}):
-                idxs = np.where(bits_def == 1)[0]
-                if len(idxs) == 2:
-                    idx1, idx2 = sorted(idxs)
-                    name1 = f"c{idx1+1}"
-                    name2 = f"c{idx2+1}"
-                    d_name = f"{name1}×{name2}"
-                    term_contributions_map['interaction_total'] += contribution_val
-                    term_contributions_map['interaction_factors'][d_name] = term_contributions_map['interaction_factors'].get(d_name, 0) + contribution_val
-
-        # Sort terms for consistent display
-        def sort_linear_key(item):
-            return int(item[0].replace('c', ''))
-        
-        def sort_quadratic_key(item):
-            return int(item[0].replace('c', '').replace('²', ''))
-        
-        def sort_interaction_key(item):
-            parts = item[0].split('×')
-            return (int(parts[0].replace('c', '')), int(parts[1].replace('c', '')))
-
-        term_contributions_map['linear_factors'] = dict(sorted(term_contributions_map['linear_factors'].items(), key=sort_linear_key))
-        term_contributions_map['quadratic_factors'] = dict(sorted(term_contributions_map['quadratic_factors'].items(), key=sort_quadratic_key))
-        term_contributions_map['interaction_factors'] = dict(sorted(term_contributions_map['interaction_factors'].items(), key=sort_interaction_key))
+        # Calculate term contributions (the model is evaluated in its fitting scale)
+        x_eval_scaled = self._normalize_point(x_eval_original_scale_for_contrib)
+        if log_coef.isEnabledFor(logging.DEBUG):
+            self.debug_pie_chart_calculation(x_eval_scaled)
+        term_contributions_map = Coefficients.term_contributions(self.coefficients, self.bits_array, x_eval_scaled)
 
         # Calculate total effect magnitude
         overall_term_types_data = {
@@ -3862,6 +4213,296 @@ class CSRApp:
                        ha='center', va='center', fontsize=8, color='gray')
                 canvas.draw()
 
+    PROFILE_POINTS = ["Factors at Minimum", "Factors at Mean", "Factors at Extremum", "Factors at Maximum"]
+    PROFILE_DETAILS = {"Term types": 'types', "Linear factors": 'linear',
+                       "Quadratic factors": 'quadratic', "Interaction factors": 'interaction'}
+
+    def _contribution_models(self):
+        """(label, coefficients, bits_array, normalization) for every fitted model"""
+        if hasattr(self, 'result_functions') and self.result_functions:
+            return [(self.col_name_mapping.get(col, col), f['coefficients'], f['bits_array'], f['normalization'])
+                    for col, f in self.result_functions.items()]
+        if self.coefficients is None or self.bits_array is None:
+            return []
+        result_col = getattr(self, 'result_cols', ["result"])[0]
+        return [(self.col_name_mapping.get(result_col, result_col), self.coefficients, self.bits_array, self.normalization)]
+
+    def _profile_point(self, choice):
+        """Original-scale point for one end of a contribution path"""
+        if choice == "Factors at Minimum":
+            return self.X_original_scale.min(axis=0)
+        if choice == "Factors at Maximum":
+            return self.X_original_scale.max(axis=0)
+        if choice == "Factors at Extremum" and self.extremum_point and self.extremum_point.get('x') is not None:
+            return np.asarray(self.extremum_point['x'], dtype=float)
+        return self._factor_mean()
+
+    @Profiling.timed()
+    def compute_contribution_profile(self, model_index=0, source="All data rows",
+                                     start="Factors at Minimum", end="Factors at Maximum", n_steps=50):
+        """
+        Contributions of one fitted model at every data row, or along the straight path between
+        two of PROFILE_POINTS. Returns (positions, X_original, profile) where positions is the
+        row number or the path fraction (0 = start, 1 = end).
+        """
+        _, coefficients, bits_array, normalization = self._contribution_models()[model_index]
+        if source == "All data rows":
+            X_points = np.asarray(self.X_original_scale, dtype=float)
+            positions = np.arange(1, len(X_points) + 1)
+        else:
+            X_points = Coefficients.path_points(self._profile_point(start), self._profile_point(end), n_steps)
+            positions = np.linspace(0.0, 1.0, n_steps)
+        X_scaled = X_points if normalization is None else normalization.forward(X_points)
+        return positions, X_points, Coefficients.contribution_profile(coefficients, bits_array, X_scaled)
+
+    def show_contribution_profile(self):
+        """Window with stacked-area / line plots of the term contributions over many points"""
+        models = self._contribution_models()
+        if not models or self.X_original_scale is None:
+            messagebox.showinfo("Contribution Profile", "Load data and run the fitting process first.")
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title("Contribution Profile")
+        window.geometry("1000x650")
+
+        controls = ttk.Frame(window, style="App.TFrame")
+        controls.pack(side='top', fill='x', padx=10, pady=(10,5))
+
+        def add_combo(label, values, width, column, row=0):
+            ttk.Label(controls, text=label, font=self.label_font).grid(row=row, column=column, padx=(0,5), pady=3, sticky='w')
+            combo = ttk.Combobox(controls, values=values, state='readonly', width=width)
+            combo.grid(row=row, column=column + 1, padx=(0,15), pady=3, sticky='w')
+            combo.current(0)
+            return combo
+
+        model_combo = add_combo("Outcome:", [label for label, *_ in models], 18, 0)
+        # A model loaded from a file has no data rows, only paths
+        sources = ["Path between points"] if self.df is None else ["All data rows", "Path between points"]
+        source_combo = add_combo("Points:", sources, 20, 2)
+        detail_combo = add_combo("Show:", list(self.PROFILE_DETAILS), 18, 4)
+        start_combo = add_combo("Path from:", self.PROFILE_POINTS, 18, 0, row=1)
+        end_combo = add_combo("to:", self.PROFILE_POINTS, 18, 2, row=1)
+        end_combo.current(len(self.PROFILE_POINTS) - 1)
+        mode_combo = add_combo("Plot:", ["Shares (stacked area)", "Values (lines)"], 18, 4, row=1)
+        ttk.Label(controls, text="Steps:", font=self.label_font).grid(row=1, column=6, padx=(0,5), sticky='w')
+        steps_var = tk.IntVar(value=50)
+        ttk.Spinbox(controls, from_=2, to=1000, textvariable=steps_var, width=6).grid(row=1, column=7, sticky='w')
+
+        figure = Figure(figsize=(8, 4.5), dpi=100)
+        figure.patch.set_facecolor('#F0F0F0')
+        canvas = FigureCanvasTkAgg(figure, master=window)
+        canvas.get_tk_widget().pack(side='top', fill='both', expand=True, padx=10)
+
+        current = {}
+
+        def redraw(_event=None):
+            try:
+                n_steps = max(2, int(steps_var.get()))
+            except (tk.TclError, ValueError):
+                n_steps = 50
+            positions, X_points, profile = self.compute_contribution_profile(
+                model_combo.current(), source_combo.get(), start_combo.get(), end_combo.get(), n_steps)
+            current.update(positions=positions, X=X_points, profile=profile)
+
+            detail = self.PROFILE_DETAILS[detail_combo.get()]
+            if detail == 'types':
+                values = profile['types']
+                names = ['Constant', 'Linear', 'Quadratic', 'Interaction']
+                colors = [self.term_type_colors[name] for name in names]
+            else:
+                values = profile[detail]
+                names = profile[f'{detail}_names']
+                colors = self._generate_shades(self.term_type_colors[detail.capitalize()], len(names))
+
+            figure.clf()
+            ax = figure.add_subplot(111, facecolor='#ffffff')
+            ax.grid(True, linestyle=':', alpha=0.6, color='gray')
+            if values.shape[1] == 0:
+                ax.text(0.5, 0.5, f"No {detail} terms", ha='center', va='center', color='gray', transform=ax.transAxes)
+            elif mode_combo.current() == 0:
+                ax.stackplot(positions, Coefficients.contribution_shares(values).T, labels=names, colors=colors, alpha=0.85)
+                ax.set_ylim(0, 1)
+                ax.set_ylabel("Share of |contribution|")
+            else:
+                for k, name in enumerate(names):
+                    ax.plot(positions, values[:, k], label=name, color=colors[k], linewidth=1.5)
+                ax.axhline(0, color='gray', linewidth=0.8)
+                ax.set_ylabel("Contribution")
+            if source_combo.current() == 0:
+                ax.set_xlabel("Data row")
+            else:
+                ax.set_xlabel(f"Path position (0 = {start_combo.get()}, 1 = {end_combo.get()})")
+            ax.set_title(f"{detail_combo.get()} - {model_combo.get()}", fontsize=10)
+            if values.shape[1]:
+                ax.legend(loc='center left', bbox_to_anchor=(1.01, 0.5), fontsize=8, frameon=False)
+            figure.tight_layout()
+            canvas.draw_idle()
+
+        def export():
+            path = filedialog.asksaveasfilename(defaultextension=".npz",
+                                                filetypes=[("NumPy archive", "*.npz"), ("CSV files", "*.csv")],
+                                                initialfile="contribution_profile.npz")
+            if not path or not current:
+                return
+            profile = current['profile']
+            factor_names = [self.col_name_mapping.get(f, f) for f in self.factor_cols]
+            try:
+                if path.lower().endswith('.csv'):
+                    table = pd.DataFrame(current['X'], columns=factor_names)
+                    table.insert(0, 'position', current['positions'])
+                    for k, term_type in enumerate(Coefficients.TERM_TYPES):
+                        table[f'{term_type}_total'] = profile['types'][:, k]
+                    for term_type in Coefficients.TERM_TYPES[1:]:
+                        for k, name in enumerate(profile[f'{term_type}_names']):
+                            table[name] = profile[term_type][:, k]
+                    table['model_value'] = profile['total']
+                    table.to_csv(path, index=False)
+                else:
+                    np.savez(path, positions=current['positions'], x=current['X'],
+                             factor_names=np.array(factor_names), term_types=np.array(Coefficients.TERM_TYPES),
+                             **profile)
+            except OSError as e:
+                messagebox.showerror("Export Error", f"Could not save contribution profile: {str(e)}")
+
+        button_frame = ttk.Frame(window, style="App.TFrame")
+        button_frame.pack(side='bottom', fill='x', padx=10, pady=10)
+        ttk.Button(button_frame, text="Update", command=redraw).pack(side='left')
+        ttk.Button(button_frame, text="Export...", command=export).pack(side='right')
+
+        for combo in (model_combo, source_combo, detail_combo, start_combo, end_combo, mode_combo):
+            combo.bind("<<ComboboxSelected>>", redraw)
+        redraw()
+
+    @Profiling.timed()
+    def compute_sensitivity(self, model_index=0, n_samples=Sensitivity.DEFAULT_SAMPLES):
+        """
+        Sobol indices over the data range of every factor. model_index picks a fitted outcome
+        (closed form); len(models) is the comprehensive score (sampled).
+        """
+        models = self._contribution_models()
+        lower = self.X_original_scale.min(axis=0)
+        upper = self.X_original_scale.max(axis=0)
+        if model_index < len(models):
+            _, coefficients, bits_array, normalization = models[model_index]
+            func_data = {'coefficients': coefficients, 'bits_array': bits_array, 'normalization': normalization}
+            # Only sampled (non-quadratic) models use the workers
+            return Sensitivity.outcome_sensitivity(func_data, lower, upper, n_samples=n_samples,
+                                                   workers=os.cpu_count())
+        return Sensitivity.comprehensive_sensitivity(self.result_functions, self.weight_combo.get(),
+                                                     lower, upper, n_samples=n_samples,
+                                                     workers=os.cpu_count())
+
+    def show_sensitivity_analysis(self):
+        """Window with first-order and total Sobol indices per factor"""
+        models = self._contribution_models()
+        if not models or self.X_original_scale is None:
+            messagebox.showinfo("Sensitivity Analysis", "Load data and run the fitting process first.")
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title("Sensitivity Analysis (Sobol indices)")
+        window.geometry("900x650")
+
+        factor_names = [self.col_name_mapping.get(f, f) for f in self.factor_cols]
+        model_names = [label for label, *_ in models]
+        if len(models) > 1:
+            model_names.append("Comprehensive score")
+
+        controls = ttk.Frame(window, style="App.TFrame")
+        controls.pack(side='top', fill='x', padx=10, pady=(10,5))
+        ttk.Label(controls, text="Model:", font=self.label_font).pack(side='left')
+        model_combo = ttk.Combobox(controls, values=model_names, state='readonly', width=22)
+        model_combo.pack(side='left', padx=(5,15))
+        model_combo.current(0)
+        ttk.Label(controls, text="Samples (sampled models):", font=self.label_font).pack(side='left')
+        samples_combo = ttk.Combobox(controls, values=["1024", "4096", "16384", "65536"], state='readonly', width=8)
+        samples_combo.pack(side='left', padx=5)
+        samples_combo.set(str(Sensitivity.DEFAULT_SAMPLES))
+        status_label = ttk.Label(window, text="", font=self.label_font)
+        status_label.pack(side='top', fill='x', padx=10)
+
+        figure = Figure(figsize=(7, 3.5), dpi=100)
+        figure.patch.set_facecolor('#F0F0F0')
+        canvas = FigureCanvasTkAgg(figure, master=window)
+        canvas.get_tk_widget().pack(side='top', fill='both', expand=True, padx=10)
+
+        table_frame = ttk.Frame(window, style="App.TFrame")
+        table_frame.pack(side='top', fill='x', padx=10, pady=5)
+        columns = ["Factor", "First order", "± (95%)", "Total", "± (95%)"]
+        tree = ttk.Treeview(table_frame, columns=columns, show='headings', height=min(8, len(factor_names)))
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=120, anchor='center')
+        tree.pack(fill='x')
+
+        current = {}
+
+        def recompute(_event=None):
+            try:
+                window.config(cursor="watch")
+                window.update_idletasks()
+                result = self.compute_sensitivity(model_combo.current(), int(samples_combo.get()))
+            except Exception as e:
+                log_coef.exception('Sensitivity analysis failed')
+                messagebox.showerror("Sensitivity Error", f"Could not compute Sobol indices: {str(e)}")
+                return
+            finally:
+                window.config(cursor="")
+            current['result'] = result
+
+            if result['method'] == 'analytic':
+                status = "Closed form from the quadratic coefficients (factors uniform over the data range)."
+            else:
+                status = (f"Saltelli sampling: {result['n_evaluations']} evaluations, "
+                          f"{'converged' if result['converged'] else 'NOT converged - increase the samples'}.")
+            status_label.config(text=status)
+
+            tree.delete(*tree.get_children())
+            for i, name in enumerate(factor_names):
+                tree.insert('', 'end', values=[name, f"{result['first_order'][i]:.4f}", f"{result['first_order_conf'][i]:.4f}",
+                                               f"{result['total'][i]:.4f}", f"{result['total_conf'][i]:.4f}"])
+
+            figure.clf()
+            ax = figure.add_subplot(111, facecolor='#ffffff')
+            ax.grid(True, axis='y', linestyle=':', alpha=0.6, color='gray')
+            positions = np.arange(len(factor_names))
+            ax.bar(positions - 0.2, result['first_order'], 0.4, yerr=result['first_order_conf'],
+                   label="First order", color=self.term_type_colors['Linear'], capsize=3)
+            ax.bar(positions + 0.2, result['total'], 0.4, yerr=result['total_conf'],
+                   label="Total", color=self.term_type_colors['Interaction'], capsize=3)
+            ax.set_xticks(positions)
+            ax.set_xticklabels(factor_names, rotation=30, ha='right', fontsize=8)
+            ax.set_ylabel("Sobol index")
+            ax.set_title(f"Sensitivity of {model_combo.get()}", fontsize=10)
+            ax.legend(fontsize=8)
+            figure.tight_layout()
+            canvas.draw_idle()
+
+        def export_csv():
+            if 'result' not in current:
+                return
+            path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")],
+                                                initialfile="sobol_indices.csv")
+            if not path:
+                return
+            result = current['result']
+            table = pd.DataFrame({'factor': factor_names,
+                                  'first_order': result['first_order'], 'first_order_conf': result['first_order_conf'],
+                                  'total': result['total'], 'total_conf': result['total_conf']})
+            try:
+                table.to_csv(path, index=False)
+            except OSError as e:
+                messagebox.showerror("Export Error", f"Could not save Sobol indices: {str(e)}")
+
+        button_frame = ttk.Frame(window, style="App.TFrame")
+        button_frame.pack(side='bottom', fill='x', padx=10, pady=10)
+        ttk.Button(button_frame, text="Export CSV...", command=export_csv).pack(side='right')
+
+        model_combo.bind("<<ComboboxSelected>>", recompute)
+        samples_combo.bind("<<ComboboxSelected>>", recompute)
+        recompute()
+
     def _generate_shades(self, base_color_hex, n_shades):
         if n_shades == 0:
             return []
@@ -3897,8 +4538,30 @@ class CSRApp:
                 shades_rgb.append(np.clip(mcolors.hsv_to_rgb((base_h, s_for_shades, v_val)), 0, 1))
         return shades_rgb
 
+    @Profiling.timed()
+    def chart_export_jobs(self, pies=True, surface=True, pair_slices=False):
+        """
+        Snapshots of the charts to export (ChartExport jobs), taken on the Tk thread: the four
+        pie charts, the response surface as shown and every pair slice through the extremum.
+        """
+        jobs = []
+        if pies:
+            titles = getattr(self, 'pie_chart_titles', [f"Chart {i + 1}" for i in range(4)])
+            jobs.extend(ChartExport.figure_job(f"CSR_{titles[i]}", self.pie_figures[i]) for i in range(4))
+        if surface and self.surface_plot.layout_name in ('surface', 'single_factor'):
+            jobs.append(ChartExport.figure_job("CSR_Response_Surface", self.figure2))
+        if pair_slices and len(self.factor_cols) >= 2:
+            slices, _, extremum_x = self.compute_pair_matrix()
+            names = [self.col_name_mapping.get(col, col) for col in self.factor_cols]
+            result_name = "Combined Result" if hasattr(self, 'comprehensive_function') else self.col_name_mapping.get("result", "Result")
+            for (i, j), (x_grid, y_grid, z_grid) in slices.items():
+                extremum = None if extremum_x is None else (extremum_x[i], extremum_x[j])
+                jobs.append(ChartExport.slice_job(f"CSR_Slice_{names[i]}_{names[j]}", x_grid, y_grid, z_grid,
+                                                  names[i], names[j], result_name, extremum))
+        return jobs
+
     def _download_all_charts(self):
-        if self.coefficients is None:
+        if self.coefficients is None and not hasattr(self, 'comprehensive_function'):
             messagebox.showwarning("No Data", "Please run the fitting process first to generate charts.")
             return
 
@@ -3906,42 +4569,100 @@ class CSRApp:
             messagebox.showwarning("No Charts", "No charts available to save.")
             return
 
-        # Ask for directory to save files
-        save_dir = filedialog.askdirectory(title="Select Directory to Save Charts")
-        if not save_dir:
-            return
-
-        try:
-            from matplotlib.backends.backend_pdf import PdfPages
-            import tempfile
-            import shutil
-
-            # Create a temporary directory for intermediate files
-            temp_dir = tempfile.mkdtemp()
-            pdf_paths = []
-
-            # Render all charts first
-            for i in range(4):
-                self.pie_canvas[i].draw()
-
-            # Generate a single merged PDF
-            merged_pdf_path = os.path.join(save_dir, "CSR_Charts_Merged.pdf")
-            
-            with PdfPages(merged_pdf_path) as merged_pdf:
-                for i in range(4):
-                    fig = self.pie_figures[i]
-                    # Save each figure as a page in the merged PDF
-                    merged_pdf.savefig(fig, bbox_inches='tight', facecolor=fig.get_facecolor())
+        window = tk.Toplevel(self.root)
+        window.title("Download Charts")
+        window.configure(background='#F0F0F0')
+        window.resizable(False, False)
+
+        options_frame = ttk.LabelFrame(window, text="Charts", padding=10)
+        options_frame.pack(fill='x', padx=10, pady=(10, 5))
+        pies_var = tk.BooleanVar(value=True)
+        surface_var = tk.BooleanVar(value=True)
+        slices_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Coefficient pie charts", variable=pies_var).pack(anchor='w')
+        ttk.Checkbutton(options_frame, text="Response surface", variable=surface_var).pack(anchor='w')
+        ttk.Checkbutton(options_frame, text="All parameter pair slices", variable=slices_var).pack(anchor='w')
+
+        format_frame = ttk.LabelFrame(window, text="Files", padding=10)
+        format_frame.pack(fill='x', padx=10, pady=5)
+        merged_var = tk.BooleanVar(value=True)
+        format_vars = {fmt: tk.BooleanVar(value=False) for fmt in ChartExport.FORMATS}
+        ttk.Checkbutton(format_frame, text="Merged PDF (one page per chart)", variable=merged_var).pack(anchor='w')
+        for fmt, var in format_vars.items():
+            ttk.Checkbutton(format_frame, text=f"One {fmt.upper()} file per chart", variable=var).pack(anchor='w')
+        parallel_var = tk.BooleanVar(value=(os.cpu_count() or 1) > 1)
+        ttk.Checkbutton(format_frame, text="Render in parallel processes", variable=parallel_var).pack(anchor='w')
+
+        progress_bar = ttk.Progressbar(window, mode='determinate', length=320)
+        progress_bar.pack(fill='x', padx=10, pady=(10, 2))
+        status_label = ttk.Label(window, text="", style="App.TLabel")
+        status_label.pack(fill='x', padx=10)
+
+        button_frame = ttk.Frame(window, style="App.TFrame")
+        button_frame.pack(fill='x', padx=10, pady=10)
+        state = {'export': None}
+        save_dir = [None]
+        updates = queue.Queue()
+
+        def poll():
+            if not window.winfo_exists():
+                return
+            while not updates.empty():
+                done, total, message = updates.get_nowait()
+                progress_bar.config(maximum=max(total, 1), value=done)
+                status_label.config(text=f"{done}/{total}: {message}")
+            thread, _, outcome = state['export']
+            if thread.is_alive():
+                window.after(100, poll)
+                return
+            state['export'] = None
+            export_button.config(state='normal')
+            if 'error' in outcome:
+                messagebox.showerror("Error", f"Failed to save charts:\n{outcome['error']}", parent=window)
+            elif outcome['cancelled']:
+                status_label.config(text=f"Cancelled after {len(outcome['paths'])} files")
+            else:
+                messagebox.showinfo("Success", f"{len(outcome['paths'])} files saved to:\n{save_dir[0]}", parent=window)
+                window.destroy()
 
-            # Clean up temporary directory (not strictly needed here but good practice)
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        def export():
+            formats = [fmt for fmt, var in format_vars.items() if var.get()]
+            if not formats and not merged_var.get():
+                messagebox.showwarning("No Files", "Select at least one kind of file.", parent=window)
+                return
+            directory = filedialog.askdirectory(title="Select Directory to Save Charts", parent=window)
+            if not directory:
+                return
+            try:
+                jobs = self.chart_export_jobs(pies_var.get(), surface_var.get(), slices_var.get())
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to prepare charts:\n{str(e)}", parent=window)
+                return
+            if not jobs:
+                messagebox.showwarning("No Charts", "No charts available to save.", parent=window)
+                return
+            save_dir[0] = directory
+            merged_pdf = os.path.join(directory, "CSR_Charts_Merged.pdf") if merged_var.get() else None
+            state['export'] = ChartExport.start_export(
+                jobs, directory, formats=formats, merged_pdf=merged_pdf,
+                workers=os.cpu_count() if parallel_var.get() else None,
+                progress=lambda done, total, message: updates.put((done, total, message)))
+            export_button.config(state='disabled')
+            status_label.config(text=f"Rendering {len(jobs)} charts...")
+            window.after(100, poll)
+
+        def cancel():
+            if state['export'] is None:
+                window.destroy()
+                return
+            state['export'][1].set()
+            status_label.config(text="Cancelling...")
 
-            messagebox.showinfo("Success", f"All charts saved as a single PDF:\n{merged_pdf_path}")
+        export_button = ttk.Button(button_frame, text="Export", command=export)
+        export_button.pack(side='left')
+        ttk.Button(button_frame, text="Cancel", command=cancel).pack(side='right')
+        window.protocol("WM_DELETE_WINDOW", lambda: (state['export'] and state['export'][1].set(), window.destroy()))
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save charts:\n{str(e)}")
-            # Clean up temp dir even if error occurs
-            shutil.rmtree(temp_dir, ignore_errors=True)
             
     def create_oacd_tab(self):
         # Main container for OACD tab
@@ -4045,14 +4766,8 @@ class CSRApp:
         # --- OACD Table Display ---
         table_disp_frame = ttk.LabelFrame(right_frame, text="Generated OACD Table", padding=(8,6,8,8))
         table_disp_frame.pack(fill='both', expand=True)
-        x_scroll = ttk.Scrollbar(table_disp_frame, orient='horizontal')
-        x_scroll.pack(side='bottom', fill='x')
-        y_scroll = ttk.Scrollbar(table_disp_frame, orient='vertical')
-        y_scroll.pack(side='right', fill='y')
-        self.oacd_table_tree = ttk.Treeview(table_disp_frame, show='headings', xscrollcommand=x_scroll.set, yscrollcommand=y_scroll.set, height=15)
-        self.oacd_table_tree.pack(fill='both', expand=True)
-        x_scroll.config(command=self.oacd_table_tree.xview)
-        y_scroll.config(command=self.oacd_table_tree.yview)
+        # Only the rows in view are formatted and inserted, so large designs display at once
+        self.oacd_table_view = VirtualTable(table_disp_frame, height=15)
 
     def _oacd_update_extrenum_table(self):
         # Clear previous widgets
@@ -4093,11 +4808,11 @@ class CSRApp:
             return
         self.oacd.max_nonzero = value
         self.oacd.reduce_levels()
-        self._oacd_display_table()
+        self._oacd_display_table(keep_position=True)
 
     def _oacd_generate_table(self):
         # Set up OACD object
-        print(self.oacd.limits)
+        log_oacd.debug('Limits: %s', self.oacd.limits)
         n = self.oacd.factor_num
         # Build extrenum DataFrame from UI
         extrenum = np.zeros((n,2))
@@ -4112,18 +4827,12 @@ class CSRApp:
         self.oacd.normalize_table()
         self._oacd_display_table()
 
-    def _oacd_display_table(self):
+    @Profiling.timed()
+    def _oacd_display_table(self, keep_position=False):
         # Display the table
-        for col in self.oacd_table_tree.get_children():
-            self.oacd_table_tree.delete(col)
-        columns = ["Run"] + [f"c{i+1}" for i in range(self.oacd.table.shape[1])]
-        self.oacd_table_tree['columns'] = columns
-        for i, col in enumerate(columns):
-            self.oacd_table_tree.heading(col, text=col)
-            self.oacd_table_tree.column(col, width=80, anchor='center')
-        for idx, row in self.oacd.table.iterrows():
-            values = [str(idx+1)] + [f"{x:.4f}" for x in row.values]
-            self.oacd_table_tree.insert('', 'end', values=values)
+        if self.oacd.table is None:
+            return
+        self.oacd_table_view.set_data(self.oacd.table.to_numpy(dtype=float), keep_position=keep_position)
 
     def _oacd_export_table(self):
         if self.oacd.table is None:
@@ -4256,6 +4965,9 @@ class CSRApp:
             self.oacd_limits_listbox.insert(tk.END, name)
 
 if __name__ == "__main__":
+    # Worker processes (bootstrap, global search) re-import this module when frozen
+    multiprocessing.freeze_support()
+    Log.configure()
     root = tk.Tk()
     app = CSRApp(root)
     root.mainloop()
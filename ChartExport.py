@@ -0,0 +1,146 @@
+"""
+Off-screen chart export.
+
+Charts on screen belong to the Tk thread, so an export takes a snapshot of them there
+(a pickled Figure is a few milliseconds and keeps the current view) and everything else,
+unpickling, rendering with Agg and writing PNG/SVG/PDF files, runs in a background
+thread, optionally spreading the charts over worker processes. Pair slices travel as
+plain arrays and are drawn as contour plots by the worker.
+"""
+import os
+import re
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import Log
+
+log = Log.get_logger("plot")
+
+FORMATS = ("png", "svg", "pdf")
+
+
+def file_stem(name):
+    """`name` as a file name stem: runs of anything but letters, digits, - and _ become _"""
+    return re.sub(r'[^\w\-]+', '_', name).strip('_') or "chart"
+
+
+def figure_job(name, figure):
+    """Export job for an existing Figure (call on the thread that owns the figure)"""
+    return {'name': name, 'figure': pickle.dumps(figure)}
+
+
+def slice_job(name, x_grid, y_grid, z_grid, x_label, y_label, z_label, extremum=None):
+    """Export job for one pair slice, drawn as a contour plot; extremum is its (x, y) or None"""
+    return {'name': name, 'slice': (np.asarray(x_grid), np.asarray(y_grid), np.asarray(z_grid)),
+            'labels': (x_label, y_label, z_label), 'extremum': extremum}
+
+
+def build_figure(job):
+    """The Figure of an export job, on an Agg canvas"""
+    if 'figure' in job:
+        figure = pickle.loads(job['figure'])
+        FigureCanvasAgg(figure)
+        return figure
+    x_grid, y_grid, z_grid = job['slice']
+    x_label, y_label, z_label = job['labels']
+    figure = Figure(figsize=(5, 4), dpi=100, facecolor='#F0F0F0')
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot(111)
+    contour = ax.contourf(x_grid, y_grid, z_grid, levels=15, cmap='viridis')
+    if job['extremum'] is not None:
+        ax.plot(*job['extremum'], marker='*', color='gold', markeredgecolor='black', markersize=12)
+    ax.set_xlabel(x_label, fontsize=10, fontweight='bold')
+    ax.set_ylabel(y_label, fontsize=10, fontweight='bold')
+    ax.set_title(f"{z_label}: {x_label} vs. {y_label}", fontsize=11, fontweight='bold')
+    figure.colorbar(contour, ax=ax, format="%.2f")
+    return figure
+
+
+def render_job(job, out_dir, formats, dpi=150):
+    """Write one job in every format; returns the paths written"""
+    figure = build_figure(job)
+    paths = []
+    for fmt in formats:
+        path = os.path.join(out_dir, f"{file_stem(job['name'])}.{fmt}")
+        figure.savefig(path, format=fmt, dpi=dpi, bbox_inches='tight', facecolor=figure.get_facecolor())
+        paths.append(path)
+    return paths
+
+
+def export_charts(jobs, out_dir, formats=("png",), merged_pdf=None, workers=None, dpi=150,
+                  progress=None, cancel_event=None):
+    """
+    Render export jobs to `out_dir`, one file per job and format, plus all jobs as pages of
+    `merged_pdf` (a path) when given. workers > 1 renders the single files in worker processes.
+    progress(done, total, message) is called from the exporting thread after each step;
+    setting `cancel_event` stops after the steps already running.
+    Returns (paths written, cancelled).
+    """
+    formats = [fmt for fmt in formats if fmt in FORMATS]
+    total = len(jobs) * bool(formats) + bool(merged_pdf)
+    written = []
+    done = 0
+
+    def cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    def step(paths, message):
+        nonlocal done
+        done += 1
+        written.extend(paths)
+        if progress is not None:
+            progress(done, total, message)
+
+    if formats and workers and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(render_job, job, out_dir, formats, dpi): job['name'] for job in jobs}
+            for future in as_completed(futures):
+                step(future.result(), futures[future])
+                if cancelled():
+                    pool.shutdown(wait=True, cancel_futures=True)
+                    break
+    elif formats:
+        for job in jobs:
+            if cancelled():
+                break
+            step(render_job(job, out_dir, formats, dpi), job['name'])
+
+    if merged_pdf and not cancelled():
+        from matplotlib.backends.backend_pdf import PdfPages
+        with PdfPages(merged_pdf) as pdf:
+            for job in jobs:
+                if cancelled():
+                    break
+                figure = build_figure(job)
+                pdf.savefig(figure, bbox_inches='tight', facecolor=figure.get_facecolor())
+        if cancelled():
+            # A merged PDF cut short is not worth keeping
+            os.remove(merged_pdf)
+        else:
+            step([merged_pdf], os.path.basename(merged_pdf))
+    log.debug('Chart export: %s files, cancelled=%s', len(written), cancelled())
+    return written, cancelled()
+
+
+def start_export(jobs, out_dir, **options):
+    """
+    Run `export_charts` in a daemon thread. Returns (thread, cancel_event, outcome) where
+    outcome is filled with 'paths' and 'cancelled', or 'error', when the thread ends.
+    """
+    cancel_event = threading.Event()
+    outcome = {}
+
+    def run():
+        try:
+            outcome['paths'], outcome['cancelled'] = export_charts(jobs, out_dir, cancel_event=cancel_event,
+                                                                   **options)
+        except Exception as e:
+            log.exception('Chart export failed')
+            outcome['error'] = e
+
+    thread = threading.Thread(target=run, name="chart-export", daemon=True)
+    thread.start()
+    return thread, cancel_event, outcome
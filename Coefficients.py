@@ -0,0 +1,133 @@
+import functools
+import numpy as np
+import CSRModel
+
+TERM_TYPES = ('constant', 'linear', 'quadratic', 'interaction')
+
+
+class TermGroups:
+    """
+    Term-type classification of a bits_array, worked out once per model.
+
+    For every term type: the term (row) indices in display order and the pie-chart names
+    (c1, c1², c1×c2, sorted by factor index). `totals` sums contribution columns per type.
+    """
+    def __init__(self, bits_array):
+        bits_array = np.asarray(bits_array)
+        self.n_terms = len(bits_array)
+        powers = bits_array.sum(axis=1)
+        max_power = bits_array.max(axis=1) if bits_array.size else np.zeros(len(bits_array))
+        n_ones = (bits_array == 1).sum(axis=1)
+
+        self.constant = np.flatnonzero(powers == 0)
+        linear = np.flatnonzero((powers == 1) & (max_power == 1))
+        quadratic = np.flatnonzero((powers == 2) & (max_power == 2))
+        interaction = np.flatnonzero((powers == 2) & (max_power == 1) & (n_ones == 2))
+
+        linear_factor = np.argmax(bits_array[linear] == 1, axis=1)
+        order = np.argsort(linear_factor, kind='stable')
+        self.linear = linear[order]
+        self.linear_names = [f"c{i+1}" for i in linear_factor[order]]
+
+        quadratic_factor = np.argmax(bits_array[quadratic] == 2, axis=1)
+        order = np.argsort(quadratic_factor, kind='stable')
+        self.quadratic = quadratic[order]
+        self.quadratic_names = [f"c{i+1}²" for i in quadratic_factor[order]]
+
+        pairs = [np.flatnonzero(bits_array[row] == 1) for row in interaction]
+        order = sorted(range(len(pairs)), key=lambda k: tuple(pairs[k]))
+        self.interaction = interaction[order].astype(int)
+        self.interaction_names = [f"c{pairs[k][0]+1}×c{pairs[k][1]+1}" for k in order]
+
+    def indices(self, term_type):
+        return getattr(self, term_type)
+
+    def term_names(self):
+        """Display name of every term row ('Constant', c1, c1², c1×c2) in bits_array order"""
+        names = {}
+        for term_type in TERM_TYPES[1:]:
+            names.update(zip(getattr(self, term_type), getattr(self, f'{term_type}_names')))
+        names.update((row, 'Constant') for row in self.constant)
+        return [names.get(row, f"term {row + 1}") for row in range(self.n_terms)]
+
+    def totals(self, values):
+        """Per-type sums of term values (..., n_terms) -> (..., 4) in TERM_TYPES order"""
+        values = np.asarray(values, dtype=float)
+        return np.stack([values[..., self.indices(t)].sum(axis=-1) for t in TERM_TYPES], axis=-1)
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_groups(shape, raw, dtype):
+    return TermGroups(np.frombuffer(raw, dtype=dtype).reshape(shape))
+
+
+def term_groups(bits_array):
+    """TermGroups for `bits_array`, computed once and reused for identical arrays"""
+    bits_array = np.ascontiguousarray(bits_array)
+    return _cached_groups(bits_array.shape, bits_array.tobytes(), bits_array.dtype.str)
+
+
+def term_values(coefficients, bits_array, X_scaled):
+    """
+    Value of every CSR term (coefficient times its factor product) at fitting-scale point(s):
+    one elementwise product of the design rows and the coefficients. A single point gives
+    shape (n_terms,), a batch (n_points, n_terms); the rows sum to the model prediction.
+    """
+    X_scaled = np.asarray(X_scaled, dtype=float)
+    design = CSRModel.create_design_matrix(np.atleast_2d(X_scaled), bits_array)
+    values = design * np.asarray(coefficients, dtype=float)
+    return values[0] if X_scaled.ndim == 1 else values
+
+
+def term_contributions(coefficients, bits_array, x_eval_scaled):
+    """
+    Term contributions at `x_eval_scaled` grouped the way the pie charts show them:
+    totals per term type plus per-factor maps named c1, c1², c1×c2 (sorted by factor index).
+    A missing or mismatched point gives all-zero contributions.
+    """
+    groups = term_groups(bits_array)
+    if x_eval_scaled is not None and len(x_eval_scaled) == bits_array.shape[1]:
+        values = term_values(coefficients, bits_array, x_eval_scaled)
+    else:
+        values = np.zeros(bits_array.shape[0])
+    constant, linear, quadratic, interaction = groups.totals(values)
+    return {
+        'constant': constant,
+        'linear_total': linear,
+        'quadratic_total': quadratic,
+        'interaction_total': interaction,
+        'linear_factors': dict(zip(groups.linear_names, values[groups.linear])),
+        'quadratic_factors': dict(zip(groups.quadratic_names, values[groups.quadratic])),
+        'interaction_factors': dict(zip(groups.interaction_names, values[groups.interaction])),
+    }
+
+
+def contribution_profile(coefficients, bits_array, X_scaled):
+    """
+    Term-type and per-factor contributions for every row of X_scaled (fitting scale) in one
+    vectorized pass. Returns a dict with 'types' (n_points, 4) totals in TERM_TYPES order,
+    'linear' / 'quadratic' / 'interaction' (n_points, n_terms_of_type) with matching
+    '<type>_names' columns, and 'total' (the model value at each row).
+    """
+    groups = term_groups(bits_array)
+    values = term_values(coefficients, bits_array, np.atleast_2d(X_scaled))
+    profile = {'types': groups.totals(values), 'total': values.sum(axis=1)}
+    for term_type in TERM_TYPES[1:]:
+        profile[term_type] = values[:, groups.indices(term_type)]
+        profile[f'{term_type}_names'] = getattr(groups, f'{term_type}_names')
+    return profile
+
+
+def contribution_shares(contributions):
+    """Magnitude shares of each column per row (rows sum to 1; all-zero rows stay 0), as in the pie charts"""
+    magnitude = np.abs(np.asarray(contributions, dtype=float))
+    total = magnitude.sum(axis=-1, keepdims=True)
+    return np.divide(magnitude, total, out=np.zeros_like(magnitude), where=total > 1e-12)
+
+
+def path_points(start, end, n_steps=50):
+    """n_steps points on the straight line from `start` to `end` (both included), shape (n_steps, n_factors)"""
+    start = np.asarray(start, dtype=float)
+    end = np.asarray(end, dtype=float)
+    t = np.linspace(0.0, 1.0, n_steps)[:, None]
+    return start + t * (end - start)
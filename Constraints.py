@@ -0,0 +1,187 @@
+"""
+CSR limits compiled into matrix form.
+
+Limits are stated in original units as {'factors': [...], 'value': v, 'type': ...}.
+The optimizers search in a fitting scale where x_original = scale * x + offset, so a sum
+limit is still linear there: sum/sum_equality limits become rows of A with
+lb <= A @ x <= ub (scipy LinearConstraint semantics), and product limits are kept as
+factor index lists evaluated for whole batches with analytic Jacobians. Compiling once
+per search replaces per-limit closures with one matrix-vector product per iteration.
+"""
+import numpy as np
+from scipy.optimize import LinearConstraint
+
+LIMIT_TYPES = ('sum', 'sum_equality', 'product')
+
+
+class CompiledLimits:
+    """
+    CSR limits for one search scale.
+
+    A, lb, ub: linear rows (sum limits have lb = -inf, sum equalities lb = ub).
+    products: list of (factor indices, limit value) for product <= value limits.
+    Build with `compile_limits`; `restrict` derives the limits of a subproblem that
+    only moves some factors.
+    """
+    def __init__(self, A, lb, ub, products, scale, offset, fixed=None, active=None):
+        self.A = A
+        self.lb = lb
+        self.ub = ub
+        self.products = products
+        self.scale = scale
+        self.offset = offset
+        # For restricted limits: full-space point holding the fixed factors, and the moving ones
+        self.fixed = fixed
+        self.active = active
+
+    @property
+    def equality_rows(self):
+        return np.isfinite(self.lb) & (self.lb == self.ub)
+
+    def __len__(self):
+        return self.A.shape[0] + len(self.products)
+
+    def _full(self, X):
+        """Batch of points in this (possibly restricted) space -> full search-space points"""
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        if self.active is None:
+            return X
+        X_full = np.tile(self.fixed, (X.shape[0], 1))
+        X_full[:, self.active] = X
+        return X_full
+
+    def linear_constraint(self):
+        """The linear limits as a scipy LinearConstraint (None when there are none)"""
+        if self.A.shape[0] == 0:
+            return None
+        return LinearConstraint(self.A, self.lb, self.ub)
+
+    def product_values(self, X):
+        """Product of each product limit's factors (original units), shape (n_points, n_products)"""
+        X_orig = self._full(X) * self.scale + self.offset
+        if not self.products:
+            return np.zeros((X_orig.shape[0], 0))
+        return np.column_stack([X_orig[:, idxs].prod(axis=1) for idxs, _ in self.products])
+
+    def product_jacobian(self, x):
+        """d(product)/dx at one point for every product limit, shape (n_products, n_variables)"""
+        x_orig = self._full(x)[0] * self.scale + self.offset
+        n_full = x_orig.shape[0]
+        jac = np.zeros((len(self.products), n_full))
+        for row, (idxs, _) in enumerate(self.products):
+            values = x_orig[idxs]
+            # Product of all the other factors, without dividing by a factor that may be zero
+            prefix = np.concatenate(([1.0], np.cumprod(values)[:-1]))
+            suffix = np.concatenate((np.cumprod(values[::-1])[:-1][::-1], [1.0]))
+            jac[row, idxs] = prefix * suffix * self.scale[idxs]
+        return jac if self.active is None else jac[:, self.active]
+
+    def slsqp_constraints(self):
+        """
+        SLSQP constraint dicts with Jacobians: one 'ineq' for all linear upper bounds,
+        one 'eq' for all equalities and one 'ineq' for all product limits.
+        """
+        constraints = []
+        eq = self.equality_rows
+        upper = ~eq & np.isfinite(self.ub)
+        if upper.any():
+            A_upper, b_upper = self.A[upper], self.ub[upper]
+            constraints.append({'type': 'ineq', 'fun': lambda x: b_upper - A_upper @ x, 'jac': lambda x: -A_upper})
+        if eq.any():
+            A_eq, b_eq = self.A[eq], self.ub[eq]
+            constraints.append({'type': 'eq', 'fun': lambda x: A_eq @ x - b_eq, 'jac': lambda x: A_eq})
+        if self.products:
+            limit_values = np.array([value for _, value in self.products], dtype=float)
+            constraints.append({'type': 'ineq',
+                                'fun': lambda x: limit_values - self.product_values(x)[0],
+                                'jac': lambda x: -self.product_jacobian(x)})
+        return constraints
+
+    def violation(self, X, eq_tolerance=1e-4):
+        """Total limit violation of every row of X; 0 means feasible"""
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        violation = np.zeros(X.shape[0])
+        if self.A.shape[0]:
+            Ax = X @ self.A.T
+            eq = self.equality_rows
+            tolerance = np.where(eq, eq_tolerance, 0.0)
+            violation += np.maximum(Ax - self.ub - tolerance, 0).sum(axis=1)
+            violation += np.maximum(self.lb - Ax - tolerance, 0).sum(axis=1)
+        if self.products:
+            limit_values = np.array([value for _, value in self.products], dtype=float)
+            violation += np.maximum(self.product_values(X) - limit_values, 0).sum(axis=1)
+        return violation
+
+    def repair(self, X, lower, upper, passes=3):
+        """Shift the factors of each equality row evenly onto the target, within bounds"""
+        X = np.array(np.atleast_2d(X), dtype=float)
+        for row in np.flatnonzero(self.equality_rows):
+            a = self.A[row]
+            idxs = np.flatnonzero(a)
+            for _ in range(passes):
+                gap = self.ub[row] - X @ a
+                X[:, idxs] = np.clip(X[:, idxs] + gap[:, None] * a[idxs] / (a[idxs] @ a[idxs]),
+                                     lower[idxs], upper[idxs])
+        return X
+
+    def scale_to_equalities(self, X):
+        """
+        Rescale each equality row's factors so they sum to the target exactly (the OACD
+        normalization). Rows whose factors sum to zero are left as they are.
+        """
+        X = np.array(X, dtype=float)
+        for row in np.flatnonzero(self.equality_rows):
+            idxs = np.flatnonzero(self.A[row])
+            totals = X[:, idxs].sum(axis=1)
+            nonzero = totals != 0
+            X[np.ix_(nonzero, idxs)] = self.ub[row] * (X[np.ix_(nonzero, idxs)] / totals[nonzero, None])
+        return X
+
+    def restrict(self, active, fixed_point):
+        """
+        Limits of the subproblem that moves only the `active` factors while the others stay
+        at `fixed_point` (search scale). Keeps only rows touching an active factor.
+        """
+        active = np.asarray(active, dtype=int)
+        fixed_point = np.asarray(fixed_point, dtype=float)
+        inactive = np.setdiff1d(np.arange(self.A.shape[1]), active)
+        if self.A.shape[0]:
+            keep = np.any(self.A[:, active] != 0, axis=1)
+            shift = self.A[keep][:, inactive] @ fixed_point[inactive]
+            A, lb, ub = self.A[keep][:, active], self.lb[keep] - shift, self.ub[keep] - shift
+        else:
+            A, lb, ub = np.zeros((0, len(active))), np.zeros(0), np.zeros(0)
+        products = [(idxs, value) for idxs, value in self.products if np.intersect1d(idxs, active).size]
+        return CompiledLimits(A, lb, ub, products, self.scale, self.offset, fixed=fixed_point, active=active)
+
+
+def compile_limits(csr_limits, n_factors, normalization=None, types=LIMIT_TYPES):
+    """
+    Compile `csr_limits` (original units) for a search over `n_factors` factors in the
+    scale of `normalization` (a Normalization; None searches in original units).
+    `types` selects which limit types to include.
+    """
+    if normalization is None or normalization.is_identity:
+        scale, offset = np.ones(n_factors), np.zeros(n_factors)
+    else:
+        scale, offset = normalization.scale, normalization.offset
+    rows, lb, ub, products = [], [], [], []
+    for limit_data in csr_limits.values():
+        factors = [int(i) for i in limit_data.get('factors', [])]
+        limit_value = float(limit_data.get('value', 0))
+        limit_type = limit_data.get('type', 'sum')
+        if not factors or limit_type not in types:
+            continue
+        if limit_type == 'product':
+            products.append((np.array(factors), limit_value))
+            continue
+        indicator = np.zeros(n_factors)
+        indicator[factors] = 1.0
+        # sum(scale * x + offset) over the limit's factors
+        row = indicator * scale
+        constant = indicator @ offset
+        rows.append(row)
+        ub.append(limit_value - constant)
+        lb.append(limit_value - constant if limit_type == 'sum_equality' else -np.inf)
+    A = np.array(rows, dtype=float).reshape(len(rows), n_factors)
+    return CompiledLimits(A, np.array(lb, dtype=float), np.array(ub, dtype=float), products, scale, offset)
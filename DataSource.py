@@ -0,0 +1,304 @@
+import os
+import sys
+import csv
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # Optional: enables Parquet/Feather and the fast CSV engine
+except ImportError:
+    pyarrow = None
+
+
+class DataSource:
+    """
+    Base class for a tabular input format.
+
+    Subclasses implement column discovery and loading. `columns` restricts the load to
+    the named columns so column-oriented formats only read what is needed.
+    """
+    name = ""
+    extensions = ()
+
+    def available(self):
+        return True
+
+    def matches(self, path):
+        return path.lower().endswith(self.extensions)
+
+    def read_columns(self, path):
+        return list(self.load(path).columns)
+
+    def load(self, path, columns=None):
+        raise NotImplementedError
+
+
+class ExcelSource(DataSource):
+    name = "Excel files"
+    extensions = (".xlsx", ".xls")
+
+    def read_columns(self, path):
+        return list(pd.read_excel(path, header=0, nrows=0).columns)
+
+    def load(self, path, columns=None):
+        return pd.read_excel(path, header=0, usecols=columns)
+
+
+class CSVSource(DataSource):
+    name = "CSV files"
+    extensions = (".csv",)
+
+    def _engine(self):
+        # The pyarrow engine parses multi-threaded; fall back to the C parser without it
+        return "pyarrow" if pyarrow is not None else "c"
+
+    def _options(self, path):
+        return {"sep": ","}
+
+    def read_columns(self, path):
+        return list(pd.read_csv(path, nrows=0, **self._options(path)).columns)
+
+    def load(self, path, columns=None):
+        options = self._options(path)
+        # pyarrow only takes single-character separators
+        engine = self._engine() if len(options["sep"]) == 1 else "c"
+        return pd.read_csv(path, usecols=columns, engine=engine, **options)
+
+
+class TextSource(CSVSource):
+    """
+    Delimited text files. The separator (tab, semicolon, comma or pipe) is sniffed from
+    the first lines; anything else is read as whitespace-separated columns.
+    """
+    name = "Text files"
+    extensions = (".txt", ".tsv", ".dat")
+    delimiters = "\t;,|"
+
+    def _options(self, path):
+        with open(path, newline="") as f:
+            sample = f.read(64 * 1024)
+        try:
+            sep = csv.Sniffer().sniff(sample, delimiters=self.delimiters).delimiter
+        except csv.Error:
+            sep = r"\s+"
+        return {"sep": sep}
+
+
+class ParquetSource(DataSource):
+    name = "Parquet files"
+    extensions = (".parquet", ".pq")
+
+    def available(self):
+        return pyarrow is not None
+
+    def read_columns(self, path):
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(path).names)
+
+    def load(self, path, columns=None):
+        return pd.read_parquet(path, columns=columns)
+
+
+class FeatherSource(DataSource):
+    name = "Feather files"
+    extensions = (".feather", ".arrow")
+
+    def available(self):
+        return pyarrow is not None
+
+    def read_columns(self, path):
+        import pyarrow.feather as feather
+        return list(feather.read_table(path, memory_map=True).column_names)
+
+    def load(self, path, columns=None):
+        return pd.read_feather(path, columns=columns)
+
+
+class NumpySource(DataSource):
+    """
+    NumPy arrays.
+
+    .npz: every array is a column named after its key, or a single 2D `data` array with
+    an optional `columns` array of names.
+    .npy: a structured array (fields become columns) or a plain 2D array (columns are
+    named column1, column2, ...).
+    """
+    name = "NumPy files"
+    extensions = (".npy", ".npz")
+
+    def _open(self, path):
+        if path.lower().endswith(".npz"):
+            return np.load(path, allow_pickle=False)
+        # Memory-map so selecting columns does not copy the whole array first
+        return np.load(path, mmap_mode="r", allow_pickle=False)
+
+    def _column_names(self, arr_or_archive):
+        if isinstance(arr_or_archive, np.lib.npyio.NpzFile):
+            if "data" in arr_or_archive.files:
+                if "columns" in arr_or_archive.files:
+                    return [str(c) for c in arr_or_archive["columns"]]
+                return [f"column{i+1}" for i in range(arr_or_archive["data"].shape[1])]
+            return list(arr_or_archive.files)
+        if arr_or_archive.dtype.names:
+            return list(arr_or_archive.dtype.names)
+        if arr_or_archive.ndim != 2:
+            raise ValueError("NumPy input must be a 2D array or a structured array")
+        return [f"column{i+1}" for i in range(arr_or_archive.shape[1])]
+
+    def read_columns(self, path):
+        data = self._open(path)
+        try:
+            return self._column_names(data)
+        finally:
+            if isinstance(data, np.lib.npyio.NpzFile):
+                data.close()
+
+    def load(self, path, columns=None):
+        data = self._open(path)
+        try:
+            names = self._column_names(data)
+            selected = names if columns is None else list(columns)
+            missing = [c for c in selected if c not in names]
+            if missing:
+                raise ValueError(f"Columns not found: {missing}")
+
+            if isinstance(data, np.lib.npyio.NpzFile):
+                if "data" in data.files:
+                    matrix = data["data"]
+                    return pd.DataFrame({c: matrix[:, names.index(c)] for c in selected})
+                # Only the requested members of the archive are decompressed
+                return pd.DataFrame({c: data[c] for c in selected})
+            if data.dtype.names:
+                return pd.DataFrame({c: np.asarray(data[c]) for c in selected})
+            return pd.DataFrame({c: np.asarray(data[:, names.index(c)]) for c in selected})
+        finally:
+            if isinstance(data, np.lib.npyio.NpzFile):
+                data.close()
+
+
+class StoreSource(DataSource):
+    """Dataset stores written by DatasetStore (pick the index.json in the .csrstore folder)"""
+    name = "Dataset stores"
+    extensions = ("index.json",)
+
+    def matches(self, path):
+        import DatasetStore
+        return DatasetStore.is_store(path)
+
+    def read_columns(self, path):
+        import DatasetStore
+        return list(DatasetStore.DatasetStore(path).columns)
+
+    def load(self, path, columns=None):
+        import DatasetStore
+        return DatasetStore.DatasetStore(path).to_frame(columns)
+
+
+# Registered formats, in the order they appear in the file dialog
+SOURCES = [ExcelSource(), CSVSource(), TextSource(), ParquetSource(), FeatherSource(), NumpySource(), StoreSource()]
+
+
+def available_sources():
+    return [source for source in SOURCES if source.available()]
+
+
+def filetypes():
+    """File dialog filter list: all supported formats first, then one entry per format"""
+    sources = available_sources()
+    all_patterns = " ".join(f"*{ext}" for source in sources for ext in source.extensions)
+    return [("All supported files", all_patterns)] + [
+        (source.name, " ".join(f"*{ext}" for ext in source.extensions)) for source in sources
+    ]
+
+
+def source_for_path(path):
+    for source in available_sources():
+        if source.matches(path):
+            return source
+    raise ValueError(f"Unsupported file type: {os.path.basename(path)}")
+
+
+def read_columns(path):
+    """Column names of a data file without loading its rows (where the format allows)"""
+    return source_for_path(path).read_columns(path)
+
+
+def load_table(path, columns=None):
+    """Load a data file into a DataFrame, optionally restricted to `columns`"""
+    return source_for_path(path).load(path, columns=columns)
+
+
+def build_column_mapping(original_col_names):
+    """
+    Internal-to-display column name mapping used throughout the app.
+    All columns but the last become factor1..factorN, the last one is the result.
+    """
+    col_name_mapping = {
+        f"factor{i+1}": name
+        for i, name in enumerate(original_col_names[:-1])
+    }
+    col_name_mapping["result"] = original_col_names[-1]
+    return col_name_mapping
+
+
+def benchmark_formats(n_rows=100_000, n_cols=10, n_selected=3, directory=None, repeats=3):
+    """
+    Time full and column-selected loads of the same synthetic table in every available format.
+    Returns a list of dicts with the best-of-`repeats` wall times in seconds. The files are
+    written to `directory`, or to a temporary directory removed afterwards.
+    """
+    if directory is None:
+        with tempfile.TemporaryDirectory(prefix="csr_formats_") as tmp_dir:
+            return benchmark_formats(n_rows, n_cols, n_selected, tmp_dir, repeats)
+
+    rng = np.random.default_rng(0)
+    columns = [f"col{i+1}" for i in range(n_cols)]
+    df = pd.DataFrame(rng.random((n_rows, n_cols)), columns=columns)
+    selected = columns[:n_selected]
+
+    writers = {
+        ".csv": lambda p: df.to_csv(p, index=False),
+        ".xlsx": lambda p: df.to_excel(p, index=False),
+        ".parquet": lambda p: df.to_parquet(p, index=False),
+        ".feather": lambda p: df.to_feather(p),
+        ".npz": lambda p: np.savez(p, **{c: df[c].values for c in columns}),
+        ".npy": lambda p: np.save(p, df.values),
+    }
+
+    results = []
+    for ext, write in writers.items():
+        path = os.path.join(directory, f"bench{ext}")
+        try:
+            source = source_for_path(path)
+        except ValueError:
+            continue  # Format not available in this environment
+        write(path)
+        names = source.read_columns(path)
+        subset = names[:n_selected] if ext == ".npy" else selected
+
+        timings = {}
+        for label, cols in (("full", None), ("selected", subset)):
+            best = np.inf
+            for _ in range(repeats):
+                start = time.perf_counter()
+                source.load(path, columns=cols)
+                best = min(best, time.perf_counter() - start)
+            timings[label] = best
+        results.append({
+            'format': ext,
+            'source': source.name,
+            'rows': n_rows,
+            'file_mb': os.path.getsize(path) / 1e6,
+            'full_s': timings['full'],
+            'selected_s': timings['selected'],
+        })
+    return results
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{'format':<10}{'size (MB)':>12}{'full (s)':>12}{'selected (s)':>15}")
+    for row in benchmark_formats(n_rows=n_rows):
+        print(f"{row['format']:<10}{row['file_mb']:>12.2f}{row['full_s']:>12.4f}{row['selected_s']:>15.4f}")
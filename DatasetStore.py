@@ -0,0 +1,184 @@
+"""
+Memory-mapped columnar copies of data files.
+
+Parsing a large workbook takes seconds every session. The first load of a file converts
+it to a store: a `.csrstore` folder with one .npy file per column (numeric, as the app
+coerces it anyway) and an index.json with the column names, row count and the size and
+modification time of the source. Later loads of the same, unchanged file open the store
+instead: every column is a read-only memory map and the DataFrame is built on them
+without copying, so only the pages actually touched are read. Any process can open the
+same store by path (DatasetStore(path).column(name)) and the OS shares its pages between
+the GUI and worker processes.
+"""
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+import DataSource
+import Log
+import Profiling
+
+log = Log.get_logger("io")
+
+STORE_SUFFIX = ".csrstore"
+INDEX_FILE = "index.json"
+STORE_FORMAT = "csr-dataset-store"
+# Bump when the layout changes so older stores are reimported
+STORE_VERSION = 1
+
+
+def default_store_dir():
+    return os.path.join(os.path.expanduser("~"), ".csr_app", "datasets")
+
+
+def source_signature(source_path):
+    """What identifies one version of a source file: its absolute path, size and mtime"""
+    stat = os.stat(source_path)
+    return {'path': os.path.abspath(source_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def store_path_for(source_path, store_dir=None):
+    """Store folder for the current version of `source_path` (a new version gets a new folder)"""
+    signature = source_signature(source_path)
+    digest = hashlib.sha256(json.dumps(signature, sort_keys=True).encode()).hexdigest()[:16]
+    name = os.path.basename(source_path)
+    return os.path.join(store_dir or default_store_dir(), f"{name}-{digest}{STORE_SUFFIX}")
+
+
+def is_store(path):
+    """True for a store folder or its index.json"""
+    if os.path.basename(path) == INDEX_FILE:
+        path = os.path.dirname(path)
+    return path.lower().endswith(STORE_SUFFIX) and os.path.isfile(os.path.join(path, INDEX_FILE))
+
+
+class DatasetStore:
+    """
+    A stored dataset: `columns` (names in order), `n_rows` and `source` (signature of the
+    file it was imported from, or None). `path` may be the folder or its index.json.
+    """
+    def __init__(self, path):
+        if os.path.basename(path) == INDEX_FILE:
+            path = os.path.dirname(path)
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE), encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get('format') != STORE_FORMAT or index.get('version') != STORE_VERSION:
+            raise ValueError(f"Not a dataset store of version {STORE_VERSION}: {path}")
+        self.columns = index['columns']
+        self.files = index['files']
+        self.n_rows = index['rows']
+        self.source = index.get('source')
+
+    @classmethod
+    @Profiling.timed("DatasetStore.create")
+    def create(cls, df, path, source=None):
+        """
+        Write `df` as a store at `path` (numeric columns; anything else is coerced, with NaN
+        for what does not parse). The folder appears complete or not at all.
+        """
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=parent, suffix=".tmp")
+        try:
+            files = []
+            for i in range(df.shape[1]):
+                values = df.iloc[:, i]
+                if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+                    values = pd.to_numeric(values, errors='coerce').astype(float)
+                files.append(f"c{i:05d}.npy")
+                np.save(os.path.join(tmp_path, files[-1]), np.ascontiguousarray(values.to_numpy()),
+                        allow_pickle=False)
+            index = {'format': STORE_FORMAT, 'version': STORE_VERSION, 'columns': [str(c) for c in df.columns],
+                     'files': files, 'rows': len(df), 'source': source}
+            with open(os.path.join(tmp_path, INDEX_FILE), "w", encoding="utf-8") as f:
+                json.dump(index, f, indent=1)
+            os.rename(tmp_path, path)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        log.debug('Dataset store written: %s (%s rows x %s columns)', path, len(df), len(df.columns))
+        return cls(path)
+
+    def column(self, name):
+        """Read-only memory map of one column"""
+        return np.load(os.path.join(self.path, self.files[self.columns.index(name)]), mmap_mode='r',
+                       allow_pickle=False)
+
+    @Profiling.timed("DatasetStore.to_frame")
+    def to_frame(self, columns=None):
+        """DataFrame of `columns` (all by default) directly on the memory maps"""
+        columns = self.columns if columns is None else list(columns)
+        missing = [c for c in columns if c not in self.columns]
+        if missing:
+            raise ValueError(f"Columns not found: {missing}")
+        return pd.DataFrame({name: self.column(name) for name in columns}, columns=columns, copy=False)
+
+    def is_current_for(self, source_path):
+        try:
+            return self.source == source_signature(source_path)
+        except OSError:
+            return False
+
+
+def prune_stores(store_dir, keep=16, exclude=()):
+    """Remove all but the `keep` most recently used stores (best-effort; open stores may stay)"""
+    if not os.path.isdir(store_dir):
+        return
+    stores = [os.path.join(store_dir, name) for name in os.listdir(store_dir) if name.endswith(STORE_SUFFIX)]
+    stores = [path for path in stores if path not in exclude]
+    stores.sort(key=os.path.getmtime)
+    for path in stores[:max(0, len(stores) - keep)]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def store_usage(store_dir=None):
+    """(number of stores, bytes on disk) in `store_dir` (default_store_dir by default)"""
+    store_dir = store_dir or default_store_dir()
+    if not os.path.isdir(store_dir):
+        return 0, 0
+    count = size = 0
+    for name in os.listdir(store_dir):
+        if not name.endswith(STORE_SUFFIX):
+            continue
+        count += 1
+        for root, _dirs, files in os.walk(os.path.join(store_dir, name)):
+            size += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return count, size
+
+
+def clear_stores(store_dir=None):
+    """Remove every store in `store_dir` (best-effort; open stores may stay). Returns the bytes freed."""
+    store_dir = store_dir or default_store_dir()
+    _, before = store_usage(store_dir)
+    prune_stores(store_dir, keep=0)
+    return before - store_usage(store_dir)[1]
+
+
+def open_or_import(source_path, store_dir=None, keep=16):
+    """
+    The data of `source_path` as a DataFrame on memory maps: from its store when the file
+    has not changed since it was imported, otherwise loaded once through DataSource and
+    converted. Returns (DataFrame, store).
+    """
+    if is_store(source_path):
+        store = DatasetStore(source_path)
+        return store.to_frame(), store
+    path = store_path_for(source_path, store_dir)
+    if is_store(path):
+        try:
+            store = DatasetStore(path)
+            if store.is_current_for(source_path):
+                os.utime(path)  # Most recently used, for pruning
+                log.debug('Opening dataset store %s', path)
+                return store.to_frame(), store
+        except (OSError, ValueError) as e:
+            log.warning('Ignoring unreadable dataset store %s: %s', path, e)
+        shutil.rmtree(path, ignore_errors=True)
+    signature = source_signature(source_path)
+    store = DatasetStore.create(DataSource.load_table(source_path), path, source=signature)
+    prune_stores(os.path.dirname(path), keep=keep, exclude=(path,))
+    return store.to_frame(), store
@@ -0,0 +1,169 @@
+"""
+Global extremum search over batched CSR evaluation.
+
+Single-start SLSQP easily stops in a local optimum of the comprehensive score (non-smooth
+through its clipping and absolute values) or on product-limited problems. Differential
+evolution scores its whole population with one batched call per generation, handles the
+CSR limits with feasibility rules (feasible beats infeasible, smaller violation beats
+larger) plus a repair step for sum equalities, and finishes with a local polish.
+"""
+import functools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy.optimize import OptimizeResult
+import CSRModel
+import Constraints
+import Log
+import Profiling
+
+log = Log.get_logger("optimize")
+
+# Populations at least this large per worker are worth scoring in worker processes
+PARALLEL_MIN_CHUNK = 5000
+
+
+def _comprehensive_batch(models, objective, X):
+    return CSRModel.make_comprehensive_function(models, objective).batch(X)
+
+
+def comprehensive_batch(result_functions, objective):
+    """Picklable batched comprehensive score, usable with worker processes"""
+    return functools.partial(_comprehensive_batch, CSRModel.outcome_models(result_functions), objective)
+
+
+def differential_evolution(func, bounds, violation=None, repair=None, x0=None, population=None,
+                           generations=300, mutation=(0.5, 1.0), crossover=0.9,
+                           tol=1e-10, patience=40, seed=0):
+    """
+    Minimize `func`, which scores an (n_points, n_factors) array in one call, within `bounds`.
+
+    violation(X) -> per-row constraint violation (0 = feasible); repair(X) -> X nudged
+    towards feasibility. DE/rand/1/bin with dithered mutation; stops after `generations`
+    or when the best value improved by less than `tol` for `patience` generations.
+    Returns a dict with x, fun, violation, nfev and nit.
+    """
+    rng = np.random.default_rng(seed)
+    lower = np.array([low for low, _ in bounds], dtype=float)
+    upper = np.array([high for _, high in bounds], dtype=float)
+    n_factors = len(bounds)
+    n_pop = population or max(30, 15 * n_factors)
+    if violation is None:
+        violation = lambda X: np.zeros(X.shape[0])
+    if repair is None:
+        repair = lambda X: X
+
+    # Stratified start: every factor's range is split into n_pop slices, one sample per slice
+    strata = (rng.permuted(np.tile(np.arange(n_pop), (n_factors, 1)), axis=1).T + rng.random((n_pop, n_factors))) / n_pop
+    X = lower + strata * (upper - lower)
+    if x0 is not None:
+        X[0] = np.clip(x0, lower, upper)
+    X = repair(X)
+    f = func(X)
+    v = violation(X)
+    nfev = n_pop
+
+    def best_index():
+        feasible = v <= 0
+        if feasible.any():
+            return np.flatnonzero(feasible)[np.argmin(f[feasible])]
+        return np.argmin(v)
+
+    idx = best_index()
+    best_v, best_f = v[idx], f[idx]
+    stale = 0
+    rows = np.arange(n_pop)
+    nit = 0
+    for nit in range(1, generations + 1):
+        # Three partners per row, never the row itself
+        r1, r2, r3 = (rows + rng.integers(1, n_pop, (3, n_pop))) % n_pop
+        scale = rng.uniform(*mutation)
+        mutant = X[r1] + scale * (X[r2] - X[r3])
+        cross = rng.random((n_pop, n_factors)) < crossover
+        cross[rows, rng.integers(0, n_factors, n_pop)] = True
+        trial = np.where(cross, mutant, X)
+
+        # Out-of-range genes land between the parent and the violated bound
+        trial = np.where(trial < lower, lower + rng.random(trial.shape) * (X - lower), trial)
+        trial = np.where(trial > upper, upper - rng.random(trial.shape) * (upper - X), trial)
+        trial = repair(trial)
+
+        f_trial = func(trial)
+        v_trial = violation(trial)
+        nfev += n_pop
+        both_feasible = (v_trial <= 0) & (v <= 0)
+        accept = np.where(both_feasible, f_trial <= f, v_trial < v)
+        X[accept], f[accept], v[accept] = trial[accept], f_trial[accept], v_trial[accept]
+
+        idx = best_index()
+        if v[idx] < best_v or (v[idx] <= 0 and best_f - f[idx] > tol * max(1.0, abs(f[idx]))):
+            stale = 0
+        else:
+            stale += 1
+        best_v, best_f = v[idx], f[idx]
+        if stale >= patience:
+            break
+
+    idx = best_index()
+    return {'x': X[idx].copy(), 'fun': f[idx], 'violation': v[idx], 'nfev': nfev, 'nit': nit}
+
+
+@Profiling.timed("GlobalSearch.global_extremum")
+def global_extremum(func, bounds, extremum_type, csr_limits=None, batch_func=None,
+                    normalization=None, x0=None,
+                    population=None, workers=None, seed=0, polish=True):
+    """
+    Global counterpart of CSRModel.find_extremum, with the same arguments for the point
+    function, bounds and extremum type. `batch_func` scores many points at once (falls
+    back to calling `func` per row). The search runs in the scale of `bounds`; CSR limits
+    are stated in original units, so pass the Normalization when searching a fitting scale.
+    With workers > 1 and a large population, batches are split over worker processes
+    (batch_func must then be picklable, e.g. `comprehensive_batch`).
+    Returns a scipy OptimizeResult; `func(res.x)` is the extremum value.
+    """
+    if batch_func is None:
+        batch_func = lambda X: np.array([func(x) for x in X], dtype=float)
+
+    lower = np.array([low for low, _ in bounds], dtype=float)
+    upper = np.array([high for _, high in bounds], dtype=float)
+    limits = Constraints.compile_limits(csr_limits or {}, len(bounds), normalization)
+    repair = None
+    if limits.equality_rows.any():
+        repair = lambda X: limits.repair(X, lower, upper)
+
+    n_pop = population or max(30, 15 * len(bounds))
+    pool = None
+    if workers and workers > 1 and n_pop >= workers * PARALLEL_MIN_CHUNK:
+        pool = ProcessPoolExecutor(max_workers=workers)
+
+    def evaluate(X):
+        Profiling.count_eval("global_search", len(X))
+        if pool is None:
+            return np.asarray(batch_func(X), dtype=float)
+        return np.concatenate(list(pool.map(batch_func, np.array_split(X, workers))))
+
+    try:
+        best = differential_evolution(CSRModel.objective_for(evaluate, extremum_type), bounds,
+                                      violation=limits.violation, repair=repair, x0=x0,
+                                      population=n_pop, seed=seed)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    log.debug('Differential evolution: %s generations, %s evaluations, best %s (violation %s)',
+              best['nit'], best['nfev'], best['fun'], best['violation'])
+
+    x_best, fun_best, violation_best = best['x'], best['fun'], best['violation']
+    nfev = best['nfev']
+    if polish:
+        # Local SLSQP / L-BFGS-B from the best member sharpens the last digits
+        local = CSRModel.find_extremum(func, bounds, x_best, extremum_type, limits.slsqp_constraints())
+        nfev += local.nfev
+        x_local = np.clip(local.x, lower, upper)
+        fun_local = CSRModel.objective_for(func, extremum_type)(x_local)
+        violation_local = limits.violation(x_local)[0]
+        if violation_local <= violation_best and fun_local <= fun_best:
+            x_best, fun_best, violation_best = x_local, fun_local, violation_local
+
+    feasible = violation_best <= 0
+    return OptimizeResult(x=x_best, fun=fun_best, success=bool(feasible), nfev=nfev, nit=best['nit'],
+                          message="Global search converged" if feasible
+                          else f"No point satisfying all limits found (violation {violation_best:.3g})")
@@ -0,0 +1,46 @@
+import os
+import logging
+
+ROOT_LOGGER = "csr"
+
+# Subsystem loggers used across the app; levels can be set per subsystem
+SUBSYSTEMS = ("io", "fit", "optimize", "plot", "coefficients", "oacd", "ui")
+
+LOG_FORMAT = "%(asctime)s %(name)s %(levelname)s: %(message)s"
+
+
+def get_logger(subsystem):
+    """Logger for one subsystem, e.g. get_logger("optimize") -> "csr.optimize" """
+    return logging.getLogger(f"{ROOT_LOGGER}.{subsystem}")
+
+
+def configure(level=None, subsystem_levels=None):
+    """
+    Set up the app's loggers. Quiet (WARNING) by default so debug calls on hot paths
+    return after a single level check.
+
+    level: overall level name or number; defaults to $CSR_LOG_LEVEL or WARNING.
+    subsystem_levels: {"optimize": "DEBUG", ...}; defaults to $CSR_LOG_LEVELS,
+    written as "optimize=DEBUG,plot=INFO".
+    """
+    if level is None:
+        level = os.environ.get("CSR_LOG_LEVEL", "WARNING")
+    if subsystem_levels is None:
+        subsystem_levels = {}
+        for item in os.environ.get("CSR_LOG_LEVELS", "").split(","):
+            if "=" in item:
+                name, sub_level = item.split("=", 1)
+                subsystem_levels[name.strip()] = sub_level.strip()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(handler)
+    root.propagate = False
+
+    for name in SUBSYSTEMS:
+        sub_level = subsystem_levels.get(name)
+        get_logger(name).setLevel(sub_level.upper() if isinstance(sub_level, str) else (sub_level or logging.NOTSET))
+    return root
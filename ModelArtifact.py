@@ -0,0 +1,123 @@
+"""
+Fitted models saved to a file and loaded back without the data.
+
+A model file is an .npz archive (read and written with allow_pickle=False) holding the
+arrays (coefficients per outcome, the bits_array exponent matrix, the factor ranges the
+normalization is rebuilt from, the extremum) and a JSON header with everything else:
+format and version, column names, normalization, objective, polarities, limits and fit
+metrics. Loading it is a few array reads, so the result tabs come back in milliseconds
+and the data file is not needed.
+"""
+import os
+import json
+import tempfile
+import zipfile
+from datetime import datetime
+import numpy as np
+import Log
+import Profiling
+
+log = Log.get_logger("io")
+
+ARTIFACT_SUFFIX = ".csrmodel"
+ARTIFACT_FORMAT = "csr-model"
+# Bump when the layout changes; older files are refused with a clear message
+ARTIFACT_VERSION = 1
+HEADER_KEY = "header"
+
+
+def _plain(value):
+    """JSON-ready copy of `value` (NumPy scalars and arrays become Python numbers and lists)"""
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+@Profiling.timed("ModelArtifact.save")
+def save(path, arrays, info):
+    """
+    Write a model file: `arrays` ({name: array}, None values skipped) and `info` (anything
+    JSON can hold once NumPy values are converted). The file is replaced in one step.
+    """
+    header = dict(_plain(info), format=ARTIFACT_FORMAT, version=ARTIFACT_VERSION,
+                  created=datetime.now().isoformat(timespec='seconds'))
+    stored = {name: np.asarray(value) for name, value in arrays.items() if value is not None}
+    if HEADER_KEY in stored:
+        raise ValueError(f"'{HEADER_KEY}' is reserved for the model file header")
+    stored[HEADER_KEY] = np.array(json.dumps(header))
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **stored)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    log.debug('Model saved to %s (%s arrays)', path, len(stored) - 1)
+
+
+@Profiling.timed("ModelArtifact.load")
+def load(path):
+    """(arrays, info) of a model file; ValueError when it is not a model file of this version"""
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if HEADER_KEY not in data.files:
+                raise ValueError(f"Not a CSR model file: {os.path.basename(path)}")
+            info = json.loads(str(data[HEADER_KEY]))
+            arrays = {name: data[name] for name in data.files if name != HEADER_KEY}
+    except (OSError, EOFError, zipfile.BadZipFile) as e:
+        raise ValueError(f"Could not read model file {os.path.basename(path)}: {str(e)}")
+    except ValueError:
+        # Not an archive at all (np.load would otherwise offer to unpickle it)
+        raise ValueError(f"Not a CSR model file: {os.path.basename(path)}")
+    if info.get('format') != ARTIFACT_FORMAT:
+        raise ValueError(f"Not a CSR model file: {os.path.basename(path)}")
+    if info.get('version') != ARTIFACT_VERSION:
+        raise ValueError(f"Model file version {info.get('version')} is not supported "
+                         f"(this version reads version {ARTIFACT_VERSION})")
+    return arrays, info
+
+
+def pack_extremum_results(results, n_factors, name='extremum_results'):
+    """
+    all_extremum_results ([{'active_factors', 'result': {...}}]) as arrays plus a JSON list:
+    the points go in (n_results, n_factors) arrays `name`_x and `name`_x_normalized, NaN
+    where a result has no point
+    """
+    x = np.full((len(results), n_factors), np.nan)
+    x_normalized = np.full((len(results), n_factors), np.nan)
+    entries = []
+    for i, entry in enumerate(results):
+        result = entry['result']
+        if result.get('x') is not None:
+            x[i] = result['x']
+        if result.get('x_normalized') is not None:
+            x_normalized[i] = result['x_normalized']
+        entries.append({'active_factors': entry['active_factors'],
+                        'value': result.get('value', np.nan),
+                        'active_factors_count': result.get('active_factors_count'),
+                        'has_x': result.get('x') is not None,
+                        'has_x_normalized': result.get('x_normalized') is not None})
+    return {f'{name}_x': x, f'{name}_x_normalized': x_normalized}, entries
+
+
+def unpack_extremum_results(arrays, entries, name='extremum_results'):
+    """Inverse of pack_extremum_results"""
+    results = []
+    for i, entry in enumerate(entries):
+        result = {'x': arrays[f'{name}_x'][i] if entry['has_x'] else None,
+                  'value': entry['value']}
+        if entry['has_x_normalized']:
+            result['x_normalized'] = arrays[f'{name}_x_normalized'][i]
+        if entry.get('active_factors_count') is not None:
+            result['active_factors_count'] = entry['active_factors_count']
+        results.append({'active_factors': entry['active_factors'], 'result': result})
+    return results
@@ -0,0 +1,91 @@
+import numpy as np
+
+NORMALIZATIONS = ("[-1, 1]", "[0, 1]", "No normalization")
+
+
+class Normalization:
+    """
+    Affine map between original factor units and the fitting scale, fixed at fit time.
+
+    x_original = scale * x_scaled + offset, with scale/offset precomputed per factor from
+    the data range ("[-1, 1]": scale = range/2, offset = midpoint; "[0, 1]": scale = range,
+    offset = min; "No normalization": identity). Zero ranges count as 1, so constant
+    factors map to finite values. forward/inverse work on single points or batches and
+    write into `out` when given, so hot loops can reuse one buffer.
+    """
+    def __init__(self, norm_type, x_min=None, x_max=None, n_factors=None):
+        self.norm_type = norm_type if norm_type in ("[-1, 1]", "[0, 1]") else "No normalization"
+        if self.norm_type == "No normalization" or x_min is None or x_max is None:
+            self.norm_type = "No normalization"
+            n = n_factors if n_factors is not None else (len(x_min) if x_min is not None else 0)
+            self.x_min = None
+            self.x_max = None
+            self.scale = np.ones(n)
+            self.offset = np.zeros(n)
+        else:
+            self.x_min = np.asarray(x_min, dtype=float)
+            self.x_max = np.asarray(x_max, dtype=float)
+            range_val = self.x_max - self.x_min
+            range_val = np.where(range_val == 0, 1.0, range_val)
+            if self.norm_type == "[-1, 1]":
+                self.scale = range_val / 2
+                self.offset = self.x_min + self.scale
+            else:
+                self.scale = range_val
+                self.offset = self.x_min.copy()
+        self.inv_scale = 1.0 / self.scale
+
+    @classmethod
+    def fit(cls, X_original, norm_type):
+        """Transform for `norm_type` from the column ranges of X_original"""
+        X_original = np.asarray(X_original, dtype=float)
+        if norm_type not in ("[-1, 1]", "[0, 1]"):
+            return cls("No normalization", n_factors=X_original.shape[1])
+        return cls(norm_type, X_original.min(axis=0), X_original.max(axis=0))
+
+    @property
+    def is_identity(self):
+        return self.norm_type == "No normalization"
+
+    def __len__(self):
+        return len(self.scale)
+
+    @staticmethod
+    def _identity(X, out):
+        if out is None:
+            # A new array, as the scaling branches return: never an alias of the input
+            return np.array(X, dtype=float)
+        out[...] = X
+        return out
+
+    def forward(self, X, out=None):
+        """Original units -> fitting scale"""
+        if self.is_identity:
+            return self._identity(X, out)
+        out = np.subtract(X, self.offset, out=out)
+        return np.multiply(out, self.inv_scale, out=out)
+
+    def inverse(self, X_scaled, out=None):
+        """Fitting scale -> original units"""
+        if self.is_identity:
+            return self._identity(X_scaled, out)
+        out = np.multiply(X_scaled, self.scale, out=out)
+        return np.add(out, self.offset, out=out)
+
+    def jacobian(self, inverse=False):
+        """
+        d(fitting scale)/d(original units) as a diagonal matrix, or the inverse map's
+        d(original)/d(fitting) with inverse=True. Chain rule for an objective f evaluated in
+        the fitting scale: grad_original = jacobian().T @ grad_fitting.
+        """
+        return np.diag(self.scale if inverse else self.inv_scale)
+
+    def search_bounds(self, X_original):
+        """Optimizer bounds and start point in the fitting scale for data X_original"""
+        n_factors = X_original.shape[1]
+        if self.norm_type == "[-1, 1]":
+            return [(-1, 1)] * n_factors, np.zeros(n_factors)
+        if self.norm_type == "[0, 1]":
+            return [(0, 1)] * n_factors, np.full(n_factors, 0.5)
+        bounds = [(X_original[:, i].min(), X_original[:, i].max()) for i in range(n_factors)]
+        return bounds, np.mean(X_original, axis=0)
@@ -2,6 +2,11 @@ import os
 import sys
 import pandas as pd
 import numpy as np
+import Log
+import Profiling
+import Constraints
+
+log = Log.get_logger("oacd")
 
 class OACD:
     def __init__(self):
@@ -68,14 +73,15 @@ class OACD:
 
     def excel_to_python(self, filepath):
         resolved_path = self._resource_path(filepath)
-        print(f"DEBUG: Opening Excel file: {filepath} -> {resolved_path}")
+        log.debug("Opening Excel file: %s -> %s", filepath, resolved_path)
         try:
             df = pd.read_excel(resolved_path, header=None)
             return df
         except Exception as e:
-            print(f"ERROR: Failed to open {resolved_path}: {e}")
+            log.error("Failed to open %s: %s", resolved_path, e)
             raise e    
          
+    @Profiling.timed("OACD.build_table")
     def build_table(self):
         
         # Returns -1 if there table isn't built / error in factor_num
@@ -293,14 +299,15 @@ class OACD:
                 return -2;
         
         # Change the three-level design into the min, max, and average of each factor
-        for factor in range(self.factor_num):
-            min_val = self.factor_extrenum.iloc[factor, 0]
-            max_val = self.factor_extrenum.iloc[factor, 1]
-            avg_val = (min_val + max_val) / 2
-            # Replace both int and float -1, 0, 1
-            self.table.iloc[:, factor] = self.table.iloc[:, factor].map(
-                lambda x: min_val if x == -1 or x == -1.0 else (max_val if x == 1 or x == 1.0 else (avg_val if x == 0 or x == 0.0 else x))
-            )
+        # (as floats: the level tables load as integers and newer pandas refuses lossy assignment)
+        # All factor columns at once: -1, 0 and 1 become min, average and max, anything else stays
+        values = self.table.to_numpy(dtype=float)
+        extrenum = np.asarray(self.factor_extrenum, dtype=float)[:self.factor_num]
+        min_vals, max_vals = extrenum[:, 0], extrenum[:, 1]
+        levels = values[:, :self.factor_num]
+        values[:, :self.factor_num] = np.select([levels == -1, levels == 1, levels == 0],
+                                                [min_vals, max_vals, (min_vals + max_vals) / 2], levels)
+        self.table = pd.DataFrame(values, columns=self.table.columns)
         
         # self.limits = pd.DataFrame({'limits': [None] * self.factor_num})
             
@@ -363,32 +370,26 @@ class OACD:
         """
         return self.limits.loc[self.limits['limits'].eq(limit_name)].index.to_list()
     
+    @Profiling.timed("OACD.normalize_table")
     def normalize_table(self):
         """
         Normalize the table based on imposed limits
         """        
-        # Create the temporary normalized_table
-        normalized_table = self.table.copy()
-        print(self.limits)
-        
-        # Iterate through each entry in table
-        for run in range(self.table.shape[0]):
-            for factor in range(self.table.shape[1]):
-                # Find if the row has a limit applied to it
-                limit_name = self.limits.iloc[factor, 0]
-                if limit_name is not None:
-                    # Apply normalization to the values if they go above the limit
-                    limit = float(self.limits.iloc[factor, 0].split("_")[0])
-                    factors_to_limit = self.find_limit(limit_name)
-                    old_total = self.table.iloc[run, factors_to_limit].sum()
-                    normalized_value = self.table.iloc[run, factor]
-                    if old_total != 0:
-                        normalized_value = limit * (self.table.iloc[run, factor] / old_total)
-                    normalized_table.iloc[run, factor] = normalized_value
-                    
+        log.debug("Limits: %s", self.limits)
+
+        # Each limit rescales its factors so that every run sums to the limit value
+        limit_groups = {}
+        for limit_name in self.limits['limits'].dropna().unique():
+            limit_groups[limit_name] = {'factors': self.find_limit(limit_name),
+                                        'value': float(limit_name.split("_")[0]),
+                                        'type': 'sum_equality'}
+        compiled = Constraints.compile_limits(limit_groups, self.table.shape[1])
+        normalized_table = pd.DataFrame(compiled.scale_to_equalities(self.table.values),
+                                        columns=self.table.columns, index=self.table.index)
+
         # Remove duplicate rows
         normalized_table = normalized_table.drop_duplicates(ignore_index=True)
-        print("normalized")
+        log.debug("Table normalized: %s runs", normalized_table.shape[0])
         self.table = normalized_table
     
 
@@ -0,0 +1,272 @@
+"""
+Pareto fronts for multi-outcome CSR fits.
+
+The comprehensive fit collapses all outcomes into one R²-weighted score and returns a
+single compromise point. Here every outcome is kept as its own objective (its score from
+CSRModel.outcome_score, higher is better) and the non-dominated set is searched under the
+same factor bounds and CSR limits:
+
+1. a weighted-sum sweep over a simplex lattice of outcome weights, each subproblem a
+   local SLSQP / L-BFGS-B solve (optionally spread over worker processes), which lands
+   exactly on the convex parts of the front;
+2. a vectorized evolutionary search (NSGA-II style: constrained non-dominated sorting and
+   crowding distance) seeded with the sweep, which fills in the non-convex parts. Each
+   generation is scored with one batched model evaluation.
+"""
+import math
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import CSRModel
+import Constraints
+import Log
+import Profiling
+
+log = Log.get_logger("optimize")
+
+# Target number of weighted-sum subproblems when the lattice size is picked automatically
+DEFAULT_SWEEP_SIZE = 80
+
+def simplex_weights(n_outcomes, divisions):
+    """All weight vectors with entries i/divisions summing to 1 (the simplex lattice)"""
+    weights = []
+    for combo in itertools.combinations(range(divisions + n_outcomes - 1), n_outcomes - 1):
+        parts = np.diff(np.concatenate(([-1], combo, [divisions + n_outcomes - 1]))) - 1
+        weights.append(parts / divisions)
+    return np.array(weights, dtype=float)
+
+
+def default_divisions(n_outcomes, target=DEFAULT_SWEEP_SIZE):
+    """Finest lattice whose number of weight vectors stays within `target`"""
+    divisions = 1
+    while math.comb(divisions + n_outcomes, n_outcomes - 1) <= target:
+        divisions += 1
+    return divisions
+
+
+def nondominated_mask(F):
+    """Boolean mask of the rows of F (maximize every column) not dominated by another row"""
+    F = np.asarray(F, dtype=float)
+    n_points = F.shape[0]
+    mask = np.ones(n_points, dtype=bool)
+    for i in range(n_points):
+        if not mask[i]:
+            continue
+        dominated_by = np.all(F >= F[i], axis=1) & np.any(F > F[i], axis=1)
+        if dominated_by.any():
+            mask[i] = False
+        else:
+            # Drop everything i dominates so later rows compare against fewer points
+            mask &= ~(np.all(F[i] >= F, axis=1) & np.any(F[i] > F, axis=1))
+            mask[i] = True
+    return mask
+
+
+def _solve_weights(models, objective, bounds, csr_limits, x0, weight_rows):
+    """Weighted-sum subproblems for a block of weight vectors; returns the solutions"""
+    score = CSRModel.outcome_scores(models, objective)
+    constraints = Constraints.compile_limits(csr_limits, len(bounds)).slsqp_constraints()
+    solutions = []
+    for weights in weight_rows:
+        def weighted_score(x, weights=weights):
+            return float(score(x)[0] @ weights)
+
+        res = CSRModel.find_extremum(weighted_score, bounds, x0, 'maximum', constraints)
+        solutions.append(res.x)
+    return np.array(solutions)
+
+
+def weighted_sum_front(result_functions, objective, bounds, csr_limits, divisions=None, workers=None):
+    """
+    Solve max w·scores(x) for every weight vector of a simplex lattice, plus the
+    comprehensive score's R² weights.
+    workers > 1 spreads the subproblems over that many processes.
+    Returns the solutions as an (n_weights, n_factors) array.
+    """
+    models = CSRModel.outcome_models(result_functions)
+    n_outcomes = len(models)
+    weight_rows = simplex_weights(n_outcomes, divisions or default_divisions(n_outcomes))
+    # The comprehensive fit's own R² weights, so its compromise point is always on the front
+    r2_weights = np.array([CSRModel.outcome_weight(f) for f in models.values()])
+    weight_rows = np.vstack([weight_rows, r2_weights / r2_weights.sum()])
+    x0 = np.array([(low + high) / 2 for low, high in bounds])
+
+    if not workers or workers <= 1 or len(weight_rows) < 2 * workers:
+        solutions = _solve_weights(models, objective, bounds, csr_limits, x0, weight_rows)
+    else:
+        blocks = np.array_split(weight_rows, workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_solve_weights, models, objective, bounds, csr_limits, x0, block)
+                       for block in blocks]
+            solutions = np.vstack([future.result() for future in futures])
+    Profiling.count_eval("pareto_front", len(weight_rows))
+    log.debug('Weighted-sum sweep: %s subproblems for %s outcomes', len(weight_rows), n_outcomes)
+    return solutions
+
+
+def _ranks_and_crowding(F, violation):
+    """
+    Constrained non-dominated sorting (feasible beats infeasible, less violation beats more)
+    and crowding distance within each front. Lower rank is better; F is maximized.
+    """
+    n_points = F.shape[0]
+    better = np.all(F[:, None, :] >= F[None, :, :], axis=2) & np.any(F[:, None, :] > F[None, :, :], axis=2)
+    feasible = violation <= 0
+    both_feasible = feasible[:, None] & feasible[None, :]
+    dominates = np.where(both_feasible, better,
+                         (feasible[:, None] & ~feasible[None, :])
+                         | (~feasible[:, None] & ~feasible[None, :] & (violation[:, None] < violation[None, :])))
+
+    ranks = np.full(n_points, -1)
+    dominated_count = dominates.sum(axis=0)
+    current = np.where(dominated_count == 0)[0]
+    rank = 0
+    while current.size:
+        ranks[current] = rank
+        dominated_count = dominated_count - dominates[current].sum(axis=0)
+        dominated_count[ranks >= 0] = -1
+        current = np.where(dominated_count == 0)[0]
+        rank += 1
+    ranks[ranks < 0] = rank
+
+    crowding = np.zeros(n_points)
+    for front_rank in np.unique(ranks):
+        members = np.where(ranks == front_rank)[0]
+        if members.size <= 2:
+            crowding[members] = np.inf
+            continue
+        for k in range(F.shape[1]):
+            order = members[np.argsort(F[members, k])]
+            span = F[order[-1], k] - F[order[0], k]
+            crowding[order[0]] = crowding[order[-1]] = np.inf
+            if span > 0:
+                crowding[order[1:-1]] += (F[order[2:], k] - F[order[:-2], k]) / span
+    return ranks, crowding
+
+
+def _variation(parents, lower, upper, rng, eta_crossover=15.0, eta_mutation=20.0):
+    """SBX crossover and polynomial mutation of a parent array, all rows at once"""
+    n_rows, n_factors = parents.shape
+    span = np.where(upper > lower, upper - lower, 1.0)
+    first, second = parents[0::2], parents[1::2]
+    pairs = min(len(first), len(second))
+    first, second = first[:pairs], second[:pairs]
+
+    u = rng.random((pairs, n_factors))
+    beta = np.where(u <= 0.5, (2 * u) ** (1 / (eta_crossover + 1)),
+                    (1 / (2 * (1 - u))) ** (1 / (eta_crossover + 1)))
+    crossed = rng.random((pairs, n_factors)) < 0.5
+    beta = np.where(crossed, beta, 1.0)
+    child_a = 0.5 * ((1 + beta) * first + (1 - beta) * second)
+    child_b = 0.5 * ((1 - beta) * first + (1 + beta) * second)
+    children = np.vstack([child_a, child_b, parents[2 * pairs:]])[:n_rows]
+
+    mutate = rng.random(children.shape) < 1.0 / n_factors
+    u = rng.random(children.shape)
+    delta = np.where(u < 0.5, (2 * u) ** (1 / (eta_mutation + 1)) - 1,
+                     1 - (2 * (1 - u)) ** (1 / (eta_mutation + 1)))
+    children = children + np.where(mutate, delta * span, 0.0)
+    return np.clip(children, lower, upper)
+
+
+def evolutionary_front(result_functions, objective, bounds, csr_limits, seeds=None,
+                       population=100, generations=100, seed=0):
+    """
+    NSGA-II style search for the non-dominated set. `seeds` (e.g. the weighted-sum
+    solutions) are placed in the initial population; the rest is drawn uniformly.
+    Returns the final population's feasible first front as (X, scores).
+    """
+    score = CSRModel.outcome_scores(result_functions, objective)
+    lower = np.array([low for low, _ in bounds], dtype=float)
+    upper = np.array([high for _, high in bounds], dtype=float)
+    rng = np.random.default_rng(seed)
+
+    X = lower + rng.random((population, len(bounds))) * (upper - lower)
+    if seeds is not None and len(seeds):
+        seeds = np.asarray(seeds, dtype=float)[:population]
+        X[:len(seeds)] = seeds
+    limits = Constraints.compile_limits(csr_limits, len(bounds))
+    X = limits.repair(X, lower, upper)
+    F = score(X)
+    violation = limits.violation(X)
+    Profiling.count_eval("pareto_front", population)
+
+    for _ in range(generations):
+        ranks, crowding = _ranks_and_crowding(F, violation)
+
+        # Binary tournament on (rank, crowding)
+        a, b = rng.integers(0, population, (2, population))
+        a_wins = (ranks[a] < ranks[b]) | ((ranks[a] == ranks[b]) & (crowding[a] >= crowding[b]))
+        parents = X[np.where(a_wins, a, b)]
+
+        children = limits.repair(_variation(parents, lower, upper, rng), lower, upper)
+        children_F = score(children)
+        children_violation = limits.violation(children)
+        Profiling.count_eval("pareto_front", population)
+
+        # Keep the best `population` of parents + children
+        X = np.vstack([X, children])
+        F = np.vstack([F, children_F])
+        violation = np.concatenate([violation, children_violation])
+        ranks, crowding = _ranks_and_crowding(F, violation)
+        keep = np.lexsort((-crowding, ranks))[:population]
+        X, F, violation = X[keep], F[keep], violation[keep]
+
+    ranks, _ = _ranks_and_crowding(F, violation)
+    best = (ranks == 0) & (violation <= 0)
+    return X[best], F[best]
+
+
+@Profiling.timed("Pareto.pareto_front")
+def pareto_front(result_functions, objective, bounds, csr_limits, method="both",
+                 divisions=None, workers=None, population=100, generations=100, seed=0):
+    """
+    Non-dominated set of the fitted outcomes under `bounds` (original scale) and `csr_limits`.
+
+    method: "weighted_sum", "evolutionary" or "both" (sweep, then evolutionary search seeded with it).
+    Returns a dict with, per front point (best comprehensive score first):
+      'x': factor values, 'values': predicted outcome values, 'scores': per-outcome scores,
+      'combined': the comprehensive score, plus 'outcomes' (column names).
+    """
+    if len(result_functions) < 2:
+        raise ValueError("A Pareto front needs at least two fitted outcomes")
+
+    candidates = []
+    if method in ("weighted_sum", "both"):
+        candidates.append(weighted_sum_front(result_functions, objective, bounds, csr_limits,
+                                             divisions=divisions, workers=workers))
+    if method in ("evolutionary", "both"):
+        seeds = candidates[0] if candidates else None
+        X_evo, _ = evolutionary_front(result_functions, objective, bounds, csr_limits, seeds=seeds,
+                                      population=population, generations=generations, seed=seed)
+        candidates.append(X_evo)
+    if not candidates:
+        raise ValueError(f"Unknown Pareto method: {method}")
+
+    X = np.vstack([c for c in candidates if len(c)]) if any(len(c) for c in candidates) else np.empty((0, len(bounds)))
+    lower = np.array([low for low, _ in bounds], dtype=float)
+    upper = np.array([high for _, high in bounds], dtype=float)
+    X = np.clip(X, lower, upper)
+
+    # Only feasible, distinct, non-dominated points make it to the front
+    feasible = Constraints.compile_limits(csr_limits, len(bounds)).violation(X) <= 0
+    X = X[feasible]
+    span = np.where(upper > lower, upper - lower, 1.0)
+    _, unique_idx = np.unique(np.round((X - lower) / span, 6), axis=0, return_index=True)
+    X = X[np.sort(unique_idx)]
+
+    scores = CSRModel.outcome_scores(result_functions, objective)(X)
+    front = nondominated_mask(scores)
+    X, scores = X[front], scores[front]
+
+    weights = np.array([CSRModel.outcome_weight(f) for f in result_functions.values()])
+    combined = scores @ weights / weights.sum()
+    order = np.argsort(-combined)
+    log.debug('Pareto front: %s points from %s candidates', len(order), len(feasible))
+    return {
+        'outcomes': list(result_functions.keys()),
+        'x': X[order],
+        'values': CSRModel.outcome_predictions(result_functions)(X[order]),
+        'scores': scores[order],
+        'combined': combined[order],
+    }
@@ -0,0 +1,106 @@
+"""
+Persistent axes and artists for the result plots.
+
+Rebuilding a figure (clf, new axes, colorbar, legend, spines) costs more than drawing
+the data, and most updates only change the data. A PlotCanvas keeps the axes of the
+current layout, updates named artists in place where matplotlib allows it (scatter
+offsets, line data, text) and replaces the others one by one. Redraws go through
+`draw_idle`, so repeated requests in one event-loop turn cost a single draw.
+"""
+import numpy as np
+
+
+class PlotCanvas:
+    """
+    One figure and its canvas.
+
+    `layout(name, build)` returns the parts (axes, colorbars, ...) of a layout, building
+    them with build(figure) -> dict only when the figure shows another layout. Between
+    `begin()` and `prune()` (or `finish()`) the artists touched through `scatter`, `line`,
+    `text` and `replace` are kept; the others are removed. `shown` is free for the caller
+    to record what the figure currently shows (cleared with the layout).
+    """
+    def __init__(self, figure, canvas):
+        self.figure = figure
+        self.canvas = canvas
+        self.layout_name = None
+        self.parts = {}
+        self.artists = {}
+        self._styles = {}
+        self._touched = set()
+        self.shown = None
+
+    def reset(self, layout_name=None):
+        """Clear the figure and forget its layout and artists"""
+        self.figure.clf()
+        self.layout_name = layout_name
+        self.parts = {}
+        self.artists = {}
+        self._styles = {}
+        self._touched = set()
+        self.shown = None
+
+    def layout(self, layout_name, build):
+        if self.layout_name != layout_name:
+            self.reset(layout_name)
+            self.parts = build(self.figure)
+        return self.parts
+
+    def begin(self):
+        self._touched = set()
+
+    def _reuse(self, name, style):
+        """The stored artist `name` if it was created with the same style, else None"""
+        artist = self.artists.get(name)
+        self._touched.add(name)
+        if artist is not None and self._styles.get(name) == repr(style):
+            return artist
+        return None
+
+    def _store(self, name, artist, style):
+        self.replace(name, artist)
+        self._styles[name] = repr(style)
+        return artist
+
+    def replace(self, name, artist):
+        """Store `artist` under `name`, removing the artist it replaces"""
+        self._touched.add(name)
+        old = self.artists.pop(name, None)
+        self._styles.pop(name, None)
+        if old is not None and old is not artist:
+            old.remove()
+        if artist is not None:
+            self.artists[name] = artist
+        return artist
+
+    def scatter(self, name, ax, x, y, **style):
+        artist = self._reuse(name, style)
+        if artist is None:
+            return self._store(name, ax.scatter(x, y, **style), style)
+        artist.set_offsets(np.column_stack([np.ravel(x), np.ravel(y)]))
+        return artist
+
+    def line(self, name, ax, x, y, *fmt, **style):
+        artist = self._reuse(name, (fmt, style))
+        if artist is None:
+            return self._store(name, ax.plot(x, y, *fmt, **style)[0], (fmt, style))
+        artist.set_data(x, y)
+        return artist
+
+    def text(self, name, ax, x, y, s, **style):
+        artist = self._reuse(name, style)
+        if artist is None:
+            return self._store(name, ax.text(x, y, s, **style), style)
+        artist.set_position((x, y))
+        artist.set_text(s)
+        return artist
+
+    def prune(self):
+        """Remove the artists not touched since `begin`"""
+        for name in [name for name in self.artists if name not in self._touched]:
+            self.replace(name, None)
+
+    def finish(self):
+        """`prune` and schedule one redraw"""
+        self.prune()
+        self.canvas.draw_idle()
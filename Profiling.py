@@ -0,0 +1,113 @@
+import json
+import time
+import functools
+from datetime import datetime
+
+# Bump when the layout of exported reports changes
+REPORT_VERSION = 1
+
+
+class PerfRecorder:
+    """
+    Wall time, call counts and objective-evaluation counts for the app's hot paths.
+
+    Stats accumulate into the current run; `start_run` archives it and begins a new one,
+    so an export holds one entry per fitting run for trend tracking.
+    Times are inclusive: a timed function that calls another timed function counts both.
+    """
+    def __init__(self, enabled=True, max_runs=50):
+        self.enabled = enabled
+        self.max_runs = max_runs
+        self.runs = []
+        self._start_new_run({})
+
+    def _start_new_run(self, metadata):
+        self._current = {
+            'started': datetime.now().isoformat(timespec='seconds'),
+            'metadata': dict(metadata),
+            'stats': {},
+        }
+
+    def _entry(self, name):
+        stats = self._current['stats']
+        entry = stats.get(name)
+        if entry is None:
+            entry = stats[name] = {'calls': 0, 'total_s': 0.0, 'max_s': 0.0, 'evals': 0}
+        return entry
+
+    def start_run(self, **metadata):
+        """Archive the current run (if anything was recorded) and start a new one"""
+        if self._current['stats']:
+            self.runs.append(self._current)
+            del self.runs[:-self.max_runs]
+        self._start_new_run(metadata)
+
+    def record(self, name, elapsed):
+        entry = self._entry(name)
+        entry['calls'] += 1
+        entry['total_s'] += elapsed
+        if elapsed > entry['max_s']:
+            entry['max_s'] = elapsed
+
+    def count_eval(self, name, n=1):
+        """Count objective-function evaluations made on behalf of `name`"""
+        if self.enabled:
+            self._entry(name)['evals'] += n
+
+    def timed(self, name=None):
+        """Decorator recording the wall time of every call under `name` (default: function name)"""
+        def decorator(func):
+            label = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(label, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        self.runs = []
+        self._start_new_run({})
+
+    def current_stats(self):
+        """Stats of the current run, slowest total first, with mean time per call added"""
+        rows = []
+        for name, entry in self._current['stats'].items():
+            row = dict(entry, name=name)
+            row['mean_s'] = entry['total_s'] / entry['calls'] if entry['calls'] else 0.0
+            rows.append(row)
+        rows.sort(key=lambda row: row['total_s'], reverse=True)
+        return rows
+
+    def format_report(self):
+        rows = self.current_stats()
+        if not rows:
+            return "No timings recorded yet."
+        lines = [f"{'Section':<34}{'Calls':>7}{'Total (s)':>11}{'Mean (ms)':>11}{'Evals':>8}"]
+        for row in rows:
+            evals = str(row['evals']) if row['evals'] else "-"
+            lines.append(f"{row['name']:<34}{row['calls']:>7}{row['total_s']:>11.3f}"
+                         f"{row['mean_s'] * 1000:>11.3f}{evals:>8}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        runs = list(self.runs)
+        if self._current['stats']:
+            runs.append(self._current)
+        return {'version': REPORT_VERSION, 'runs': runs}
+
+    def export_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+# Shared recorder used by the app and OACD
+recorder = PerfRecorder()
+timed = recorder.timed
+count_eval = recorder.count_eval
@@ -0,0 +1,127 @@
+import os
+import json
+import hashlib
+import tempfile
+from collections import OrderedDict
+import numpy as np
+
+# Bump when the meaning of cached values changes so stale disk entries are ignored
+CACHE_VERSION = 1
+
+
+def default_cache_dir():
+    return os.path.join(os.path.expanduser("~"), ".csr_app", "cache")
+
+
+def _entry_paths(cache_dir):
+    if not cache_dir or not os.path.isdir(cache_dir):
+        return []
+    return [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".npz")]
+
+
+def disk_usage(cache_dir=None):
+    """(number of entries, bytes on disk) of the disk store in `cache_dir` (default_cache_dir by default)"""
+    paths = _entry_paths(cache_dir or default_cache_dir())
+    return len(paths), sum(os.path.getsize(path) for path in paths)
+
+
+def clear_disk(cache_dir=None):
+    """Remove every entry of the disk store in `cache_dir` (default_cache_dir by default)"""
+    for path in _entry_paths(cache_dir or default_cache_dir()):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class ResultCache:
+    """
+    Content-addressed cache for fitting and optimization results.
+
+    Keys are SHA-256 hashes of the input arrays plus every option that affects the
+    result, so any change to the data or settings produces a different key.
+    Values are flat dicts of NumPy arrays and scalars (None values are dropped).
+    Entries live in an in-memory LRU and, when `cache_dir` is set, in one .npz file per key.
+    """
+    def __init__(self, max_entries=32, cache_dir=None, max_disk_entries=256):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*arrays, **options):
+        digest = hashlib.sha256()
+        digest.update(f"v{CACHE_VERSION}".encode())
+        for arr in arrays:
+            arr = np.ascontiguousarray(arr)
+            digest.update(str(arr.dtype).encode())
+            digest.update(str(arr.shape).encode())
+            digest.update(arr.tobytes())
+        digest.update(json.dumps(options, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def set_cache_dir(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def get(self, key):
+        """Return a copy of the cached value for `key`, or None on a miss"""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        elif self.cache_dir and os.path.exists(self._disk_path(key)):
+            try:
+                with np.load(self._disk_path(key), allow_pickle=False) as data:
+                    value = {name: data[name] for name in data.files}
+                self._remember(key, value)
+            except (OSError, ValueError):
+                value = None  # Corrupt or partially written entry; treat as a miss
+
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {name: (arr.item() if arr.ndim == 0 else arr.copy()) for name, arr in value.items()}
+
+    def put(self, key, value):
+        stored = {name: np.array(v) for name, v in value.items() if v is not None}
+        self._remember(key, stored)
+
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                # Write to a temp file first so readers never see a partial entry
+                fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(f, **stored)
+                os.replace(tmp_path, self._disk_path(key))
+                self._prune_disk()
+            except OSError:
+                pass  # The disk store is best-effort; the memory entry is still valid
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _prune_disk(self):
+        entries = _entry_paths(self.cache_dir)
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self, disk=True):
+        self._entries.clear()
+        if disk and self.cache_dir:
+            clear_disk(self.cache_dir)
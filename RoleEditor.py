@@ -0,0 +1,225 @@
+"""
+Role table for the loaded columns (parameter, outcome or ignored).
+
+Wide files (hundreds of sensor channels) made a frame, label and combobox per column too
+slow to build and too long to scroll through. The RoleEditor is one Treeview with a row
+per column and a fixed set of widgets: a combobox placed over the role cell being edited,
+a context menu for the selected rows, and a bar that assigns a role to every column
+matching a regular expression and/or a kind of data. Loading new columns rewrites the
+rows in place when the columns are the same and otherwise swaps the items, nothing else.
+"""
+import re
+import numpy as np
+import tkinter as tk
+from tkinter import ttk, messagebox
+import Profiling
+
+ROLES = ("parameter", "outcome(+)", "outcome(-)", "ignore")
+
+# Kinds of data a bulk assignment can be limited to (all columns are numeric once loaded)
+COLUMN_KINDS = ("any", "constant", "integer", "continuous")
+
+
+def column_kinds(df, columns):
+    """{column: 'constant' | 'integer' | 'continuous'} for the columns of `df`"""
+    values = df[columns].to_numpy(dtype=float)
+    if not len(values):
+        return {col: 'constant' for col in columns}
+    constant = np.all(values == values[0], axis=0)
+    integer = np.all(values == np.round(values), axis=0)
+    return {col: 'constant' if c else ('integer' if i else 'continuous')
+            for col, c, i in zip(columns, constant, integer)}
+
+
+def default_roles(columns):
+    """The last column is the outcome, the others parameters"""
+    return {col: "outcome(+)" if i == len(columns) - 1 else "parameter" for i, col in enumerate(columns)}
+
+
+def matching_columns(columns, labels=None, kinds=None, pattern="", kind="any"):
+    """
+    The columns whose display label or column id matches `pattern` (regular expression,
+    case-insensitive, searched anywhere; empty matches all) and whose kind is `kind`.
+    Raises re.error for an invalid pattern.
+    """
+    labels = labels or {}
+    kinds = kinds or {}
+    regex = re.compile(pattern, re.IGNORECASE) if pattern else None
+    return [col for col in columns
+            if (kind == "any" or kinds.get(col) == kind)
+            and (regex is None or regex.search(str(labels.get(col, col))) or regex.search(col))]
+
+
+class RoleEditor:
+    """
+    Role per column in `parent`. `roles` maps column -> role in column order; `on_change()`
+    is called after the roles change through the editor.
+    """
+    def __init__(self, parent, height=10, on_change=None, font=None):
+        self.on_change = on_change
+        self.columns = []
+        self.labels = {}
+        self.kinds = {}
+        self.roles = {}
+        self._rows = {}
+
+        # --- Bulk assignment ---
+        bulk_frame = ttk.Frame(parent, style="App.TFrame")
+        bulk_frame.pack(fill='x', pady=(0,5))
+        ttk.Label(bulk_frame, text="Match (regex):").pack(side='left')
+        self.pattern_var = tk.StringVar()
+        pattern_entry = tk.Entry(bulk_frame, textvariable=self.pattern_var, width=14, font=font,
+                                 insertwidth=1, insertontime=500, insertofftime=500)
+        pattern_entry.pack(side='left', padx=(2,6))
+        pattern_entry.bind('<Return>', lambda _event: self.apply_to_matching())
+        ttk.Label(bulk_frame, text="Kind:").pack(side='left')
+        self.kind_combo = ttk.Combobox(bulk_frame, values=COLUMN_KINDS, state="readonly", width=10)
+        self.kind_combo.current(0)
+        self.kind_combo.pack(side='left', padx=(2,6))
+        ttk.Label(bulk_frame, text="Role:").pack(side='left')
+        self.bulk_role_combo = ttk.Combobox(bulk_frame, values=ROLES, state="readonly", width=11)
+        self.bulk_role_combo.current(0)
+        self.bulk_role_combo.pack(side='left', padx=(2,6))
+        bulk_buttons = ttk.Frame(parent, style="App.TFrame")
+        bulk_buttons.pack(fill='x', pady=(0,5))
+        ttk.Button(bulk_buttons, text="Apply to Matching", command=self.apply_to_matching).pack(side='left')
+        ttk.Button(bulk_buttons, text="Apply to Selected", command=self.apply_to_selected).pack(side='left', padx=(5,0))
+        self.summary_label = ttk.Label(bulk_buttons, text="")
+        self.summary_label.pack(side='right')
+
+        # --- One row per column ---
+        table_frame = ttk.Frame(parent, style="App.TFrame")
+        table_frame.pack(fill='both', expand=True)
+        y_scroll = ttk.Scrollbar(table_frame, orient='vertical')
+        y_scroll.pack(side='right', fill='y')
+        self.tree = ttk.Treeview(table_frame, columns=("name", "column", "role"), show='headings',
+                                 selectmode='extended', height=height, yscrollcommand=y_scroll.set)
+        self.tree.heading("name", text="Name")
+        self.tree.heading("column", text="Column")
+        self.tree.heading("role", text="Role")
+        self.tree.column("name", width=200, anchor='w')
+        self.tree.column("column", width=80, anchor='w')
+        self.tree.column("role", width=100, anchor='center')
+        self.tree.pack(fill='both', expand=True)
+        y_scroll.config(command=self.tree.yview)
+
+        # In-place role editor, moved over whichever role cell is double-clicked
+        self.cell_combo = ttk.Combobox(self.tree, values=ROLES, state="readonly")
+        self.cell_combo.bind('<<ComboboxSelected>>', self._commit_cell)
+        self.cell_combo.bind('<FocusOut>', lambda _event: self.cell_combo.place_forget())
+        self.cell_combo.bind('<Escape>', lambda _event: self.cell_combo.place_forget())
+        self._edited = None
+        self.tree.bind('<Double-1>', self._edit_cell)
+
+        # Right click assigns a role to the selected rows
+        self.menu = tk.Menu(self.tree, tearoff=0)
+        for role in ROLES:
+            self.menu.add_command(label=f"Set to {role}", command=lambda role=role: self.set_roles(self.selected(), role))
+        self.tree.bind('<Button-3>', self._show_menu)
+        self.tree.bind('<Button-2>', self._show_menu)
+
+    @Profiling.timed("RoleEditor.set_columns")
+    def set_columns(self, columns, labels=None, kinds=None, keep_roles=False):
+        """
+        Show `columns` with display `labels` and data `kinds` ({column: ...}). Roles start from
+        `default_roles`; `keep_roles` keeps the current role of columns shown before.
+        """
+        columns = list(columns)
+        roles = default_roles(columns)
+        if keep_roles:
+            roles.update({col: role for col, role in self.roles.items() if col in roles})
+        self.labels = dict(labels or {})
+        self.kinds = dict(kinds or {})
+        self.cell_combo.place_forget()
+        if columns != self.columns:
+            # Item ids are the column names, so a new set of columns means new items
+            self.tree.delete(*self.columns)
+            self._rows = {}
+            for col in columns:
+                self._rows[col] = self._row(col, roles[col])
+                self.tree.insert('', 'end', iid=col, values=self._rows[col])
+            self.columns = columns
+            self.roles = roles
+        else:
+            self._update_rows(roles)
+        self._update_summary()
+
+    def _row(self, col, role):
+        return (self.labels.get(col, col), col, role)
+
+    def _update_rows(self, roles):
+        # Only rows whose text changed are touched
+        for col, role in roles.items():
+            self.roles[col] = role
+            row = self._row(col, role)
+            if self._rows.get(col) != row:
+                self.tree.item(col, values=row)
+                self._rows[col] = row
+
+    def _update_summary(self):
+        counts = {role: 0 for role in ROLES}
+        for role in self.roles.values():
+            counts[role] += 1
+        self.summary_label.config(text=f"{counts['parameter']} parameters, "
+                                       f"{counts['outcome(+)'] + counts['outcome(-)']} outcomes, "
+                                       f"{counts['ignore']} ignored")
+
+    def set_roles(self, columns, role):
+        """Give `role` to `columns`; returns how many changed"""
+        changes = {col: role for col in columns if col in self.roles and self.roles[col] != role}
+        if changes:
+            self._update_rows(changes)
+            self._update_summary()
+            if self.on_change is not None:
+                self.on_change()
+        return len(changes)
+
+    def selected(self):
+        return list(self.tree.selection())
+
+    def matching(self):
+        """Columns matched by the bulk bar (raises re.error for an invalid pattern)"""
+        return matching_columns(self.columns, self.labels, self.kinds, self.pattern_var.get().strip(),
+                                self.kind_combo.get())
+
+    def apply_to_matching(self):
+        try:
+            columns = self.matching()
+        except re.error as e:
+            messagebox.showerror("Invalid Pattern", f"Not a valid regular expression: {str(e)}",
+                                    parent=self.tree)
+            return
+        self.set_roles(columns, self.bulk_role_combo.get())
+        # Show what matched
+        self.tree.selection_set(columns)
+        if columns:
+            self.tree.see(columns[0])
+
+    def apply_to_selected(self):
+        self.set_roles(self.selected(), self.bulk_role_combo.get())
+
+    def _edit_cell(self, event):
+        col = self.tree.identify_row(event.y)
+        if not col or self.tree.identify_column(event.x) != '#3':
+            return
+        bbox = self.tree.bbox(col, 'role')
+        if not bbox:
+            return
+        self._edited = col
+        x, y, width, height = bbox
+        self.cell_combo.set(self.roles[col])
+        self.cell_combo.place(x=x, y=y, width=width, height=height)
+        self.cell_combo.focus_set()
+
+    def _commit_cell(self, _event=None):
+        self.cell_combo.place_forget()
+        if self._edited in self.roles:
+            self.set_roles([self._edited], self.cell_combo.get())
+        self._edited = None
+
+    def _show_menu(self, event):
+        col = self.tree.identify_row(event.y)
+        if col and col not in self.tree.selection():
+            self.tree.selection_set(col)
+        if self.tree.selection():
+            self.menu.tk_popup(event.x_root, event.y_root)
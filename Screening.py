@@ -0,0 +1,112 @@
+"""
+Factor screening ahead of the CSR fit.
+
+The full quadratic term set grows with the square of the factor count, so wide data
+(hundreds of historian channels) is ranked first and only the top-k factors go into the
+model. Every method scores a factor on both its main effect and its curvature (the
+centred square), since the extremum CSR looks for is often in the middle of a factor's
+range where a purely linear score sees nothing:
+
+- correlation: the larger of |r(x, y)| and |r((x - mean)^2, y)|, all factors at once
+- mutual information: binned estimate on quantile bins, all factors at once
+- lasso: main-effects-plus-square Lasso (cross-validated penalty), norm of each
+  factor's two coefficients on standardized data
+
+With several outcomes a factor's score is its best score over the outcomes.
+"""
+import numpy as np
+from scipy.stats import rankdata
+import Log
+import Profiling
+
+log = Log.get_logger("fit")
+
+METHODS = ("correlation", "mutual information", "lasso")
+DEFAULT_TOP_K = 12
+
+# Quantile bins per variable for the mutual information estimate
+MI_BINS = 10
+
+
+def _standardize(A):
+    """Columns centred to mean 0 and scaled to unit norm (constant columns stay 0)"""
+    A = A - A.mean(axis=0)
+    norm = np.sqrt((A ** 2).sum(axis=0))
+    return A / np.where(norm > 0, norm, 1.0)
+
+
+def _features(X):
+    """Main effects and centred squares, shape (n_samples, 2 * n_factors)"""
+    centred = X - X.mean(axis=0)
+    return np.hstack([centred, centred ** 2])
+
+
+def correlation_scores(X, y):
+    n_factors = X.shape[1]
+    r = _standardize(_features(X)).T @ _standardize(y[:, None])[:, 0]
+    return np.abs(r).reshape(2, n_factors).max(axis=0)
+
+
+def mutual_information_scores(X, y, bins=MI_BINS):
+    """Mutual information in nats between each factor and y, on quantile bins"""
+    n_samples, n_factors = X.shape
+    bins = max(2, min(bins, n_samples // 5 or 2))
+    # Tied values share a rank and so a bin (a constant factor falls into one bin)
+    x_codes = ((rankdata(X, method='min', axis=0) - 1) * bins // n_samples).astype(np.int64)
+    y_codes = ((rankdata(y, method='min') - 1) * bins // n_samples).astype(np.int64)
+    codes = (np.arange(n_factors) * bins * bins)[None, :] + x_codes * bins + y_codes[:, None]
+    joint = np.bincount(codes.ravel(), minlength=n_factors * bins * bins).reshape(n_factors, bins, bins)
+    joint = joint / n_samples
+    p_x = joint.sum(axis=2, keepdims=True)
+    p_y = joint.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = np.where(joint > 0, joint * np.log(joint / (p_x * p_y)), 0.0)
+    return terms.sum(axis=(1, 2))
+
+
+def lasso_scores(X, y):
+    from sklearn.linear_model import LassoCV
+    n_factors = X.shape[1]
+    features = _standardize(_features(X)) * np.sqrt(len(X))
+    target = _standardize(y[:, None])[:, 0] * np.sqrt(len(X))
+    lasso = LassoCV(cv=min(5, len(X)), random_state=0).fit(features, target)
+    coef = lasso.coef_.reshape(2, n_factors)
+    return np.sqrt((coef ** 2).sum(axis=0))
+
+
+SCORERS = {
+    "correlation": correlation_scores,
+    "mutual information": mutual_information_scores,
+    "lasso": lasso_scores,
+}
+
+
+@Profiling.timed("Screening.screening_scores")
+def screening_scores(X, Y, method="correlation"):
+    """
+    Score of every factor (columns of X) for the outcomes Y (one column per outcome, or
+    1D), higher is more relevant. Returns an array of shape (n_factors,).
+    """
+    X = np.asarray(X, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    if Y.ndim == 1:
+        Y = Y[:, None]
+    if method not in SCORERS:
+        raise ValueError(f"Unknown screening method: {method}")
+    scores = np.max([SCORERS[method](X, Y[:, k]) for k in range(Y.shape[1])], axis=0)
+    log.debug('Screened %s factors by %s', X.shape[1], method)
+    return scores
+
+
+def top_k(scores, k):
+    """Indices (in factor order) of the `k` best scores; ties go to the earlier factor"""
+    order = np.argsort(-np.asarray(scores, dtype=float), kind='stable')
+    return sorted(int(i) for i in order[:k])
+
+
+def ranks(scores):
+    """Rank of every score, 1 for the best"""
+    order = np.argsort(-np.asarray(scores, dtype=float), kind='stable')
+    ranking = np.empty(len(order), dtype=int)
+    ranking[order] = np.arange(1, len(order) + 1)
+    return ranking
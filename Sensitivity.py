@@ -0,0 +1,180 @@
+"""
+Variance-based (Sobol) sensitivity of fitted CSR models.
+
+Factors are taken as independent and uniform over their ranges (CSR limits are not
+applied). A single fitted outcome is a quadratic polynomial, so its first-order, total
+and pairwise indices follow in closed form from the coefficients. Anything else, such as
+the comprehensive score with its clipping and absolute values, is estimated by Saltelli
+sampling (Sobol sequence, Saltelli 2010 first-order and Jansen total estimators) with
+one batched evaluation of all N * (n_factors + 2) points, bootstrap confidence intervals
+and the estimates at increasing sample sizes as a convergence check.
+"""
+import functools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy.stats import qmc
+import CSRModel
+import GlobalSearch
+import Log
+import Profiling
+
+log = Log.get_logger("optimize")
+
+DEFAULT_SAMPLES = 4096
+
+
+def quadratic_indices(coefficients, bits_array, lower, upper):
+    """
+    Closed-form Sobol indices of a CSR model with terms up to second order, for factors
+    uniform on [lower, upper] (in the model's own input scale). Returns None when the
+    model has a term above second order.
+    """
+    lower = np.asarray(lower, dtype=float)
+    upper = np.asarray(upper, dtype=float)
+    n_factors = len(lower)
+    form = CSRModel.quadratic_form(coefficients, bits_array)
+    if form is None:
+        return None
+    _, linear, Q = form
+    quadratic = np.diag(Q)
+    interaction = 2 * (Q - np.diag(quadratic))
+
+    # x = mean + u with u uniform on [-h, h]: the slope in u absorbs the quadratic and
+    # interaction terms evaluated at the mean
+    mean = (lower + upper) / 2
+    half_width = (upper - lower) / 2
+    variance_u = half_width ** 2 / 3
+    slope = linear + 2 * quadratic * mean + interaction @ mean
+    first = slope ** 2 * variance_u + quadratic ** 2 * 4 * half_width ** 4 / 45
+    pairwise = np.triu(interaction ** 2 * np.outer(variance_u, variance_u), k=1)
+    total_variance = first.sum() + pairwise.sum()
+    if total_variance <= 0:
+        zeros = np.zeros(n_factors)
+        return _result(zeros, zeros, zeros, zeros, 0.0, 'analytic', 0, [], True,
+                       second_order=np.zeros((n_factors, n_factors)))
+
+    second_order = pairwise / total_variance
+    first_order = first / total_variance
+    total = first_order + (second_order + second_order.T).sum(axis=1)
+    zeros = np.zeros(n_factors)
+    return _result(first_order, total, zeros, zeros, total_variance, 'analytic', 0, [], True,
+                   second_order=second_order)
+
+
+def _result(first_order, total, first_conf, total_conf, variance, method, n_evaluations,
+            convergence, converged, second_order=None):
+    return {
+        'first_order': first_order,
+        'total': total,
+        'first_order_conf': first_conf,
+        'total_conf': total_conf,
+        'second_order': second_order,
+        'variance': variance,
+        'method': method,
+        'n_evaluations': n_evaluations,
+        'convergence': convergence,
+        'converged': converged,
+    }
+
+
+def _estimates(f_A, f_B, f_AB):
+    """First-order (Saltelli 2010) and total (Jansen) estimates; f_AB has shape (n_factors, N)"""
+    variance = np.var(np.concatenate([f_A, f_B]))
+    if variance <= 0:
+        zeros = np.zeros(f_AB.shape[0])
+        return zeros, zeros, 0.0
+    first_order = np.mean(f_B * (f_AB - f_A), axis=1) / variance
+    total = 0.5 * np.mean((f_A - f_AB) ** 2, axis=1) / variance
+    return first_order, total, variance
+
+
+def saltelli_indices(batch_func, lower, upper, n_samples=DEFAULT_SAMPLES, workers=None,
+                     n_bootstrap=100, tol=0.02, seed=0):
+    """
+    Sampled Sobol indices of `batch_func` (scores an (n_points, n_factors) array in original
+    units) for factors uniform on [lower, upper]. n_samples is rounded up to a power of two.
+    workers > 1 splits large batches over processes (batch_func must then be picklable).
+    The result's 'convergence' lists the estimates at N/8, N/4, N/2 and N; 'converged'
+    means no index moved by more than `tol` over the last doubling.
+    """
+    lower = np.asarray(lower, dtype=float)
+    upper = np.asarray(upper, dtype=float)
+    n_factors = len(lower)
+    n_samples = 1 << max(3, int(np.ceil(np.log2(max(n_samples, 8)))))
+
+    base = qmc.Sobol(2 * n_factors, scramble=True, seed=seed).random(n_samples)
+    A = lower + base[:, :n_factors] * (upper - lower)
+    B = lower + base[:, n_factors:] * (upper - lower)
+    AB = np.repeat(A[None], n_factors, axis=0)
+    for i in range(n_factors):
+        AB[i, :, i] = B[:, i]
+    X = np.vstack([A, B, AB.reshape(-1, n_factors)])
+
+    if workers and workers > 1 and len(X) >= workers * GlobalSearch.PARALLEL_MIN_CHUNK:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            f = np.concatenate(list(pool.map(batch_func, np.array_split(X, workers))))
+    else:
+        f = np.asarray(batch_func(X), dtype=float)
+    Profiling.count_eval("sensitivity", len(X))
+    f_A, f_B = f[:n_samples], f[n_samples:2 * n_samples]
+    f_AB = f[2 * n_samples:].reshape(n_factors, n_samples)
+
+    first_order, total, variance = _estimates(f_A, f_B, f_AB)
+
+    # Bootstrap over the sample rows for confidence half-widths (95%)
+    rng = np.random.default_rng(seed)
+    boot_first = np.empty((n_bootstrap, n_factors))
+    boot_total = np.empty((n_bootstrap, n_factors))
+    for b in range(n_bootstrap):
+        rows = rng.integers(0, n_samples, n_samples)
+        boot_first[b], boot_total[b], _ = _estimates(f_A[rows], f_B[rows], f_AB[:, rows])
+    first_conf = 1.96 * boot_first.std(axis=0)
+    total_conf = 1.96 * boot_total.std(axis=0)
+
+    # Sobol-sequence prefixes of power-of-two length are balanced samples of their own
+    convergence = []
+    for n in (n_samples // 8, n_samples // 4, n_samples // 2, n_samples):
+        s, st, _ = _estimates(f_A[:n], f_B[:n], f_AB[:, :n])
+        convergence.append({'n_samples': n, 'first_order': s, 'total': st})
+    change = max(np.max(np.abs(convergence[-1]['first_order'] - convergence[-2]['first_order'])),
+                 np.max(np.abs(convergence[-1]['total'] - convergence[-2]['total'])))
+    converged = bool(change <= tol)
+    log.debug('Saltelli sampling: %s evaluations, last-doubling change %.4g', len(X), change)
+    return _result(first_order, total, first_conf, total_conf, variance, 'saltelli', len(X),
+                   convergence, converged)
+
+
+def _outcome_values(coefficients, bits_array, normalization, X):
+    return CSRModel.evaluate_csr(normalization.forward(X), coefficients, bits_array)
+
+
+def outcome_batch(func_data):
+    """Picklable batched prediction of one fitted outcome from original-unit points"""
+    return functools.partial(_outcome_values, func_data['coefficients'], func_data['bits_array'],
+                             func_data['normalization'])
+
+
+@Profiling.timed("Sensitivity.outcome_sensitivity")
+def outcome_sensitivity(func_data, lower, upper, method="auto", **sampling_options):
+    """
+    Sobol indices of one fitted outcome (coefficients, bits_array, normalization) over the
+    original-unit ranges [lower, upper]. method: "analytic", "saltelli" or "auto" (analytic
+    when the model allows it). Sampling options go to `saltelli_indices`.
+    """
+    if method in ("auto", "analytic"):
+        normalization = func_data['normalization']
+        result = quadratic_indices(func_data['coefficients'], func_data['bits_array'],
+                                   normalization.forward(np.asarray(lower, dtype=float)),
+                                   normalization.forward(np.asarray(upper, dtype=float)))
+        if result is not None:
+            return result
+        if method == "analytic":
+            raise ValueError("The model has terms above second order; use Saltelli sampling")
+    return saltelli_indices(outcome_batch(func_data), lower, upper, **sampling_options)
+
+
+@Profiling.timed("Sensitivity.comprehensive_sensitivity")
+def comprehensive_sensitivity(result_functions, objective, lower, upper, **sampling_options):
+    """Sampled Sobol indices of the comprehensive score of several fitted outcomes"""
+    return saltelli_indices(GlobalSearch.comprehensive_batch(result_functions, objective),
+                            lower, upper, **sampling_options)
@@ -0,0 +1,147 @@
+"""
+Two-factor slices of a fitted response through a fixed point.
+
+The 3D plot shows one factor pair at a time; the pairs matrix shows every pair. All the
+slice grids of a model and fixed point are stacked into one array of points and scored
+with batched calls, and kept in a small LRU so switching the featured pair (or reopening
+the matrix) reuses them instead of evaluating the model again.
+"""
+from collections import OrderedDict
+import numpy as np
+from ResultCache import ResultCache
+import Log
+import Profiling
+
+log = Log.get_logger("plot")
+
+# Points scored per batch call (bounds the design matrix of high-order, many-factor models)
+SLICE_BATCH = 65536
+
+# Faces drawn per side of a 3D surface; finer grids are drawn with larger strides
+MAX_SURFACE_FACES = 60
+# Grids up to this resolution get face edge lines (they blur into noise on finer grids)
+EDGE_LINE_RESOLUTION = 40
+
+
+def factor_pairs(n_factors):
+    """All (i, j) factor pairs with i < j, in row-major order"""
+    return [(i, j) for i in range(n_factors) for j in range(i + 1, n_factors)]
+
+
+def slice_axes(X_original, resolution=30):
+    """Evenly spaced levels over the data range of every factor, shape (n_factors, resolution)"""
+    X_original = np.asarray(X_original, dtype=float)
+    return np.linspace(X_original.min(axis=0), X_original.max(axis=0), resolution).T
+
+
+def pair_points(axes, fixed_point, pairs):
+    """
+    Grid points of every pair's slice stacked into one array of shape
+    (n_pairs, resolution, resolution, n_factors). Factor i varies along the columns and
+    factor j along the rows (as np.meshgrid), the others stay at `fixed_point`.
+    """
+    pairs = np.asarray(pairs, dtype=int).reshape(-1, 2)
+    resolution = axes.shape[1]
+    points = np.empty((len(pairs), resolution, resolution, axes.shape[0]))
+    points[...] = np.asarray(fixed_point, dtype=float)
+    points[np.arange(len(pairs)), :, :, pairs[:, 0]] = axes[pairs[:, 0]][:, None, :]
+    points[np.arange(len(pairs)), :, :, pairs[:, 1]] = axes[pairs[:, 1]][:, :, None]
+    return points
+
+
+@Profiling.timed("Surfaces.pair_slices")
+def pair_slices(batch_func, X_original, fixed_point, pairs=None, resolution=30):
+    """
+    Slices of `batch_func` (original-unit points -> values) for the factor `pairs` (all
+    pairs by default) through `fixed_point`, over the data range of each factor.
+    Returns {(i, j): (x_grid, y_grid, z_grid)} with grids as CSRModel.surface_grid.
+    """
+    axes = slice_axes(X_original, resolution)
+    if pairs is None:
+        pairs = factor_pairs(axes.shape[0])
+    if not pairs:
+        return {}
+    points = pair_points(axes, fixed_point, pairs).reshape(-1, axes.shape[0])
+    values = np.concatenate([np.asarray(batch_func(points[start:start + SLICE_BATCH]), dtype=float)
+                             for start in range(0, len(points), SLICE_BATCH)])
+    Profiling.count_eval("surface", len(points))
+    values = values.reshape(len(pairs), resolution, resolution)
+    slices = {}
+    for (i, j), z_grid in zip(pairs, values):
+        x_grid, y_grid = np.meshgrid(axes[i], axes[j])
+        slices[(int(i), int(j))] = (x_grid, y_grid, z_grid)
+    return slices
+
+
+def surface_style(resolution):
+    """
+    plot_surface keyword arguments for a resolution x resolution grid, plus the stride for
+    wireframe overlays: thin face edges on coarse grids, no edges or antialiasing on fine
+    ones, and strides that keep the face count bounded.
+    """
+    stride = max(1, int(np.ceil((resolution - 1) / MAX_SURFACE_FACES)))
+    style = {'rstride': stride, 'cstride': stride}
+    if resolution <= EDGE_LINE_RESOLUTION:
+        style.update(edgecolor='#555555', linewidth=0.1, antialiased=True)
+    else:
+        style.update(linewidth=0, antialiased=False)
+    return style, max(1, resolution // 15)
+
+
+class SliceCache:
+    """
+    Pair slices per surface key (model, fixed point, resolution; see `make_key`).
+    A slice stored for (i, j) also answers (j, i), transposed. Keeps the slices of the
+    `max_entries` most recently used keys.
+    """
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def make_key(*arrays, **options):
+        return ResultCache.make_key(*arrays, **options)
+
+    def _slices(self, key):
+        slices = self._entries.get(key)
+        if slices is not None:
+            self._entries.move_to_end(key)
+        return slices
+
+    def get(self, key, pair):
+        """(x_grid, y_grid, z_grid) of `pair` under `key`, or None"""
+        slices = self._slices(key) or {}
+        i, j = pair
+        if (i, j) in slices:
+            return slices[(i, j)]
+        if (j, i) in slices:
+            x_grid, y_grid, z_grid = slices[(j, i)]
+            return y_grid.T, x_grid.T, z_grid.T
+        return None
+
+    def missing(self, key, pairs):
+        """The pairs (either orientation) not cached under `key`"""
+        slices = self._slices(key) or {}
+        return [(i, j) for i, j in pairs if (i, j) not in slices and (j, i) not in slices]
+
+    def put(self, key, slices):
+        self._entries.setdefault(key, {}).update(slices)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def slices(self, batch_func, key, X_original, fixed_point, pairs=None, resolution=30):
+        """
+        Slices of `pairs` (all pairs by default) under `key`; only the uncached ones are
+        evaluated, in one `pair_slices` call.
+        """
+        if pairs is None:
+            pairs = factor_pairs(np.asarray(X_original).shape[1])
+        missing = self.missing(key, pairs)
+        if missing:
+            log.debug('Evaluating %s of %s pair slices', len(missing), len(pairs))
+            self.put(key, pair_slices(batch_func, X_original, fixed_point, missing, resolution))
+        return {pair: self.get(key, pair) for pair in pairs}
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,143 @@
+"""
+Treeview over a large numeric table.
+
+Inserting one Treeview item per row (and formatting every cell) costs seconds for designs
+with thousands of runs. A VirtualTable keeps the rows in a NumPy array and only a pool of
+items as tall as the view: scrolling moves a window over the array and rewrites the
+values of the pooled items, formatting just the rows in view. New data is diffed against
+what the items show, so a changed table only touches the items whose text changed.
+"""
+import numpy as np
+from tkinter import ttk
+import Profiling
+
+# Rows moved per mouse wheel notch
+WHEEL_ROWS = 3
+
+
+class VirtualTable:
+    """
+    Headed table of `data` (2D array) in `parent`, with its own scrollbars.
+
+    `set_data(data, columns)` shows a new table; rows are labelled by number in a leading
+    `row_heading` column. Items are recycled as the view scrolls, so the table has no
+    row selection.
+    """
+    def __init__(self, parent, height=15, column_width=80, value_format='%.4f', row_heading="Run"):
+        self.column_width = column_width
+        self.value_format = value_format
+        self.row_heading = row_heading
+        self.data = np.empty((0, 0))
+        self.columns = []
+        self.first = 0
+        self.rows_in_view = height
+        self._items = []
+        self._shown = []
+
+        x_scroll = ttk.Scrollbar(parent, orient='horizontal')
+        x_scroll.pack(side='bottom', fill='x')
+        self.y_scroll = ttk.Scrollbar(parent, orient='vertical', command=self._scroll_command)
+        self.y_scroll.pack(side='right', fill='y')
+        self.tree = ttk.Treeview(parent, show='headings', selectmode='none', height=height,
+                                 xscrollcommand=x_scroll.set)
+        self.tree.pack(fill='both', expand=True)
+        x_scroll.config(command=self.tree.xview)
+
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<MouseWheel>', lambda e: self.scroll(-WHEEL_ROWS if e.delta > 0 else WHEEL_ROWS) or 'break')
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-WHEEL_ROWS) or 'break')
+        self.tree.bind('<Button-5>', lambda e: self.scroll(WHEEL_ROWS) or 'break')
+        self.tree.bind('<Up>', lambda e: self.scroll(-1, 'units') or 'break')
+        self.tree.bind('<Down>', lambda e: self.scroll(1, 'units') or 'break')
+        self.tree.bind('<Prior>', lambda e: self.scroll(-1, 'pages') or 'break')
+        self.tree.bind('<Next>', lambda e: self.scroll(1, 'pages') or 'break')
+        self.tree.bind('<Home>', lambda e: self.scroll_to(0) or 'break')
+        self.tree.bind('<End>', lambda e: self.scroll_to(len(self.data)) or 'break')
+
+    @Profiling.timed("VirtualTable.set_data")
+    def set_data(self, data, columns=None, keep_position=False):
+        """
+        Show `data` (rows x columns) under `columns` (c1, c2, ... by default). The view goes
+        back to the first row unless `keep_position`.
+        """
+        data = np.asarray(data)
+        if data.ndim != 2:
+            data = data.reshape(len(data), -1)
+        if columns is None:
+            columns = [f"c{i+1}" for i in range(data.shape[1])]
+        columns = [self.row_heading] + [str(col) for col in columns]
+        if columns != self.columns:
+            self._set_columns(columns)
+        self.data = data
+        self.scroll_to(self.first if keep_position else 0)
+        self._fit(self.tree.winfo_height())
+
+    def _set_columns(self, columns):
+        # Changing the columns changes what every item means: start over with a fresh pool
+        self.tree.delete(*self._items)
+        self._items = []
+        self._shown = []
+        self.tree['columns'] = columns
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=self.column_width, anchor='center')
+        self.columns = columns
+
+    def scroll(self, number, what='units'):
+        step = self.rows_in_view if what == 'pages' else 1
+        self.scroll_to(self.first + number * step)
+
+    def scroll_to(self, first):
+        """Show the rows from `first` on (clamped so the view stays full)"""
+        self.first = int(max(0, min(first, len(self.data) - self.rows_in_view)))
+        self._render()
+
+    def _scroll_command(self, action, number, what=None):
+        if action == 'moveto':
+            self.scroll_to(round(float(number) * len(self.data)))
+        else:
+            self.scroll(int(number), what)
+
+    def visible_values(self):
+        """Display values of the rows in view, one tuple per row"""
+        window = self.data[self.first:self.first + self.rows_in_view]
+        if not len(window):
+            return []
+        if window.dtype.kind in 'fiub':
+            cells = np.char.mod(self.value_format, window.astype(float))
+        else:
+            cells = window.astype(str)
+        labels = np.arange(self.first + 1, self.first + len(window) + 1).astype(str).tolist()
+        return [(label,) + tuple(row) for label, row in zip(labels, cells.tolist())]
+
+    def _render(self):
+        rows = self.visible_values()
+        while len(self._items) > len(rows):
+            self.tree.delete(self._items.pop())
+            self._shown.pop()
+        for item, shown, values in zip(self._items, self._shown, rows):
+            if shown != values:
+                self.tree.item(item, values=values)
+        self._shown[:len(rows)] = rows[:len(self._shown)]
+        for values in rows[len(self._items):]:
+            self._items.append(self.tree.insert('', 'end', values=values))
+            self._shown.append(values)
+        total = len(self.data)
+        if total:
+            self.y_scroll.set(self.first / total, (self.first + len(rows)) / total)
+        else:
+            self.y_scroll.set(0, 1)
+
+    def _on_resize(self, event):
+        self._fit(event.height)
+
+    def _fit(self, widget_height):
+        # Size the pool to the rows the widget has room for, measured on the first item
+        # (no bbox until the table is on screen)
+        bbox = self.tree.bbox(self._items[0]) if self._items else None
+        if not bbox:
+            return
+        rows = max(1, (widget_height - bbox[1]) // max(1, bbox[3]))
+        if rows != self.rows_in_view:
+            self.rows_in_view = rows
+            self.scroll_to(self.first)